@@ -6,4 +6,13 @@ It sets up a local web server that receives webhook notifications from TradingVi
 and executes trades in MT5 based on the parameters provided in the alert.
 """
 
-__version__ = '1.0.0'
\ No newline at end of file
+__version__ = '1.0.0'
+
+from app.config import Config as _Config
+
+# MT5_BACKEND=sim swaps in the paper-trading simulator; this has to happen
+# before any app module runs `import MetaTrader5`
+_config = _Config()
+if _config.MT5_BACKEND == 'sim':
+    from app import sim_mt5
+    sim_mt5.install(_config)
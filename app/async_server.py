@@ -0,0 +1,207 @@
+"""
+Production HTTP ingest served from an asyncio event loop.
+
+The Flask path (`app.run(threaded=True)`) is Werkzeug's development server:
+one thread per connection and reloading driven by DEBUG. This server keeps
+connections alive on a single event loop and answers the same /trade,
+/trade/<id>, /health, /positions and /metrics routes through the framework-agnostic
+handlers in app.server, so both modes behave identically.
+
+Anything that may block on MT5 (placing a trade, listing positions) is
+handed off to a bounded thread pool; cheap routes run on the loop itself.
+Enable it with SERVER_MODE=asyncio.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl
+
+from app import metrics, server
+from app.metrics import JSON_PARSE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY = 64 * 1024
+MAX_HEADERS = 100
+
+
+class HTTPError(Exception):
+    """Malformed request; the connection is answered with `status` and closed"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class AsyncServer:
+    """Keep-alive HTTP/1.1 server dispatching to the app.server route handlers"""
+
+    def __init__(self, host, port, workers=32, keepalive_timeout=75.0, max_body=MAX_BODY):
+        self.host = host
+        self.port = port
+        self.keepalive_timeout = keepalive_timeout
+        self.max_body = max_body
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='http-worker')
+
+    def run(self):
+        """Serve until interrupted"""
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        """Listen on host:port and handle connections forever"""
+        srv = await asyncio.start_server(self._handle_connection, self.host, self.port, limit=MAX_BODY)
+        logger.info("ASYNC_SERVER: Listening on %s:%s", self.host, self.port)
+        try:
+            async with srv:
+                await srv.serve_forever()
+        finally:
+            self._pool.shutdown(wait=False)
+
+    # ---------------- Connections ----------------
+    async def _handle_connection(self, reader, writer):
+        peer = writer.get_extra_info('peername')
+        peer_ip = peer[0] if peer else 'unknown'
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader, writer)
+                except HTTPError as e:
+                    await self._write(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                method, path, query, headers, body, keep_alive = request
+                client_ip = headers.get('x-forwarded-for', peer_ip)
+                try:
+                    payload, status, *extra = await self._dispatch(method, path, query, headers, body, client_ip)
+                except Exception as e:
+                    logger.error("ASYNC_SERVER_ERROR: %s %s failed - %s", method, path, e)
+                    payload, status, extra = {"error": f"An unexpected error occurred: {e}"}, 500, ()
+                await self._write(writer, status, payload, keep_alive, head_only=method == 'HEAD',
+                                  headers=extra[0] if extra else None)
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            logger.error("ASYNC_SERVER_ERROR: Connection from %s failed - %s", peer_ip, e)
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader, writer):
+        """Parse one request; None when the client closed or idled out"""
+        try:
+            line = await asyncio.wait_for(reader.readline(), self.keepalive_timeout)
+        except asyncio.TimeoutError:
+            return None
+        except (ValueError, asyncio.LimitOverrunError):
+            raise HTTPError(414, "Request line too long")
+        if not line:
+            return None
+
+        try:
+            method, target, version = line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            try:
+                line = await reader.readline()
+            except (ValueError, asyncio.LimitOverrunError):
+                raise HTTPError(431, "Header line too long")
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HTTPError(431, "Too many headers")
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if 'transfer-encoding' in headers:
+            raise HTTPError(411, "Chunked bodies are not supported, send Content-Length")
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > self.max_body:
+            raise HTTPError(413, "Request body too large")
+
+        body = b''
+        if length:
+            if headers.get('expect', '').lower() == '100-continue':
+                writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+            body = await asyncio.wait_for(reader.readexactly(length), self.keepalive_timeout)
+
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+        path, _, query = target.partition('?')
+        return method.upper(), path, query, headers, body, keep_alive
+
+    # ---------------- Routing ----------------
+    async def _dispatch(self, method, path, query, headers, body, client_ip):
+        """Route a request to its app.server handler; returns (payload, status[, headers])"""
+        loop = asyncio.get_running_loop()
+
+        if path == '/health':
+            if method not in ('GET', 'HEAD'):
+                return {"error": "Method not allowed"}, 405
+            server.log_health_check('%s - "%s /health HTTP/1.1" 200', client_ip, method)
+            return server.health_response()
+
+        logger.info('%s - "%s %s HTTP/1.1"', client_ip, method, path)
+
+        if path == '/trade':
+            if method != 'POST':
+                return {"error": "Method not allowed"}, 405
+            started = time.perf_counter()
+            try:
+                data = json.loads(body) if body else None
+            except ValueError:
+                data = None
+            JSON_PARSE_SECONDS.observe(time.perf_counter() - started)
+            return await loop.run_in_executor(
+                self._pool, server.handle_trade, data, headers.get('idempotency-key'))
+
+        if path.startswith('/trade/'):
+            if method != 'GET':
+                return {"error": "Method not allowed"}, 405
+            return server.trade_status_response(path[len('/trade/'):])
+
+        if path == '/positions':
+            if method != 'GET':
+                return {"error": "Method not allowed"}, 405
+            return await loop.run_in_executor(
+                self._pool, server.positions_response, dict(parse_qsl(query)), headers.get('if-none-match'))
+
+        if path == '/metrics':
+            if method != 'GET':
+                return {"error": "Method not allowed"}, 405
+            return server.metrics_response()
+
+        return {"error": "Not found"}, 404
+
+    @staticmethod
+    async def _write(writer, status, payload, keep_alive, head_only=False, headers=None):
+        # Plain-text payloads (/metrics) are sent as they are, no payload (304) as an empty body,
+        # everything else as JSON
+        if payload is None:
+            body, content_type = b'', None
+        elif isinstance(payload, str):
+            body, content_type = payload.encode(), metrics.CONTENT_TYPE
+        else:
+            body, content_type = json.dumps(payload, default=str).encode(), 'application/json'
+        head = (
+            f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+            + (f"Content-Type: {content_type}\r\n" if content_type else "")
+            + "".join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+            + f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"\r\n"
+        ).encode('latin-1')
+        writer.write(head if head_only else head + body)
+        await writer.drain()
@@ -0,0 +1,178 @@
+"""
+Bulk close engine for MT5 positions.
+
+Positions are grouped by symbol so each symbol needs a single tick snapshot.
+On hedging accounts, opposite positions are paired with TRADE_ACTION_CLOSE_BY,
+which closes two tickets with one request and saves the spread, on symbols
+whose order_mode allows it. A rejected CLOSE_BY falls back to plain deals;
+its result is kept in the report marked 'superseded' and does not count
+against success. A requested volume is allocated to tickets oldest-first
+(FIFO).
+"""
+
+import logging
+import math
+import time
+from collections import defaultdict
+
+import MetaTrader5 as mt5
+
+from app.metrics import MT5_RETCODES
+
+logger = logging.getLogger(__name__)
+
+VOLUME_EPSILON = 1e-9
+
+
+class BulkCloseEngine:
+    """Closes many positions with as few terminal round-trips as possible"""
+
+    def __init__(self, handler, magic=123456):
+        self.handler = handler
+        self.magic = magic
+
+    def close(self, symbol=None, volume=None) -> dict:
+        """
+        Close positions for symbol (or all symbols).
+
+        volume=None closes everything; otherwise that much volume is closed
+        FIFO across the matching tickets. Returns per-ticket results and the
+        total wall time in milliseconds.
+        """
+        started = time.perf_counter()
+        positions = mt5.positions_get(symbol=symbol) if symbol else mt5.positions_get()
+        positions = sorted(positions or (), key=lambda p: (getattr(p, 'time_msc', 0), p.ticket))
+
+        allocations = self.allocate(positions, volume)
+        results = []
+
+        by_symbol = defaultdict(list)
+        for pos, close_volume in allocations:
+            by_symbol[pos.symbol].append((pos, close_volume))
+
+        hedging = volume is None and self._is_hedging()
+        for pos_symbol, items in by_symbol.items():
+            if hedging and self._allows_close_by(pos_symbol):
+                items = self._close_by_pairs(items, results)
+            if items:
+                self._close_with_deals(pos_symbol, items, results)
+
+        # A rejected CLOSE_BY is superseded by the deals that closed its tickets
+        outcomes = [r for r in results if not r.get('superseded')]
+        return {
+            'success': all(r['success'] for r in outcomes),
+            'positions': len(positions),
+            'closed': sum(1 for r in outcomes if r['success']),
+            'orders_sent': len(results),
+            'results': results,
+            'wall_time_ms': round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def allocate(self, positions, volume=None):
+        """Split a close volume FIFO across positions as (position, volume) pairs"""
+        if volume is None:
+            return [(pos, pos.volume) for pos in positions]
+
+        allocations = []
+        remaining = volume
+        for pos in positions:
+            if remaining <= VOLUME_EPSILON:
+                break
+            take = min(pos.volume, remaining)
+            if take < pos.volume:
+                take = self._floor_to_step(pos.symbol, take)
+                if take <= VOLUME_EPSILON:
+                    break
+            allocations.append((pos, take))
+            remaining = round(remaining - take, 8)
+        return allocations
+
+    # ---------------- Internals ----------------
+    def _is_hedging(self) -> bool:
+        info = mt5.account_info()
+        hedging_mode = getattr(mt5, 'ACCOUNT_MARGIN_MODE_RETAIL_HEDGING', 2)
+        return info is not None and getattr(info, 'margin_mode', None) == hedging_mode
+
+    def _allows_close_by(self, symbol) -> bool:
+        profile = self.handler.execution_profile(symbol)
+        return profile is not None and profile.close_by
+
+    def _floor_to_step(self, symbol, volume):
+        profile = self.handler.execution_profile(symbol)
+        step = profile.volume_step if profile else 0.01
+        return round(math.floor(volume / step + VOLUME_EPSILON) * step, 8)
+
+    def _close_by_pairs(self, items, results):
+        """Net opposite tickets with CLOSE_BY; returns the items still open"""
+        buys = [[pos, vol] for pos, vol in items if pos.type == mt5.ORDER_TYPE_BUY]
+        sells = [[pos, vol] for pos, vol in items if pos.type != mt5.ORDER_TYPE_BUY]
+
+        while buys and sells:
+            buy, sell = buys[0], sells[0]
+            request = {
+                "action": mt5.TRADE_ACTION_CLOSE_BY,
+                "position": buy[0].ticket,
+                "position_by": sell[0].ticket,
+                "magic": self.magic,
+                "comment": "Auto-close position",
+            }
+            closed = min(buy[1], sell[1])
+            result = mt5.order_send(request)
+            ok = self._record(results, buy[0], closed, 'close_by', result, by_ticket=sell[0].ticket)
+            if not ok:
+                # Fall back to plain deals for whatever could not be netted
+                results[-1]['superseded'] = True
+                break
+
+            buy[1] = round(buy[1] - closed, 8)
+            sell[1] = round(sell[1] - closed, 8)
+            if buy[1] <= VOLUME_EPSILON:
+                buys.pop(0)
+            if sell[1] <= VOLUME_EPSILON:
+                sells.pop(0)
+
+        return [(pos, vol) for pos, vol in buys + sells]
+
+    def _close_with_deals(self, symbol, items, results):
+        """Close each ticket with an opposite deal priced from one tick snapshot"""
+        profile = self.handler.execution_profile(symbol)
+        tick = self.handler.get_tick(symbol) if profile else None
+        for pos, close_volume in items:
+            if tick is None:
+                reason = 'No tick available' if profile else 'No symbol info available'
+                self._record(results, pos, close_volume, 'close', None, comment=reason)
+                continue
+
+            is_buy = pos.type == mt5.ORDER_TYPE_BUY
+            request = profile.close(pos.ticket, mt5.ORDER_TYPE_SELL if is_buy else mt5.ORDER_TYPE_BUY, close_volume,
+                                    tick.bid if is_buy else tick.ask)
+            result = mt5.order_send(request)
+            if result is not None and result.retcode == mt5.TRADE_RETCODE_INVALID_FILL:
+                self.handler.execution_profiles.discard(symbol)
+            self._record(results, pos, close_volume, 'close', result)
+
+    def _record(self, results, pos, volume, method, result, by_ticket=None, comment=None) -> bool:
+        if comment is None:  # a comment means no order was sent
+            MT5_RETCODES.labels(result.retcode if result is not None else 'none').inc()
+        ok = result is not None and result.retcode == mt5.TRADE_RETCODE_DONE
+        entry = {
+            'ticket': pos.ticket,
+            'symbol': pos.symbol,
+            'type': 'BUY' if pos.type == mt5.ORDER_TYPE_BUY else 'SELL',
+            'volume': volume,
+            'full_close': volume >= pos.volume - VOLUME_EPSILON,
+            'method': method,
+            'success': ok,
+            'retcode': getattr(result, 'retcode', None),
+            'comment': comment or (getattr(result, 'comment', '') if result is not None else str(mt5.last_error())),
+        }
+        if by_ticket is not None:
+            entry['by_ticket'] = by_ticket
+        results.append(entry)
+
+        if ok:
+            self.handler.log_success("CLOSE_SUCCESS: Closed %s of position %s%s", volume, pos.ticket,
+                                     f" by {by_ticket}" if by_ticket else "")
+        else:
+            self.handler.log_error("CLOSE_ERROR: Failed to close position %s - %s", pos.ticket, entry['comment'])
+        return ok
@@ -0,0 +1,187 @@
+"""
+Micro-batching of same-symbol market alerts.
+
+Multi-indicator setups often fire several BUY/SELL alerts on one symbol
+within a few hundred milliseconds. Instead of paying spread and a round
+trip on each, the coalescer holds market signals for `window` seconds from
+the first alert on a symbol, nets their volumes (BUY positive, SELL
+negative) and sends one order for the net, or none if they cancel out.
+Every signal in the batch resolves to the same net result.
+
+Only plain market orders are coalesced; signals with a stop loss or take
+profit carry their own exit levels and are executed individually.
+
+A CLOSE must not overtake entries held in a window: flush(symbol) executes
+the symbol's open batch right away and waits for one that is already being
+executed, so the close is scheduled after them.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+from app.order_result import OrderResult
+from app.signal import Signal
+
+logger = logging.getLogger(__name__)
+
+VOLUME_PRECISION = 8
+
+
+class _Batch:
+    """Market signals for one symbol waiting for the window to close"""
+
+    __slots__ = ('symbol', 'deadline', 'signal_ids', 'net_volume', 'futures', 'done')
+
+    def __init__(self, symbol, deadline):
+        self.symbol = symbol
+        self.deadline = deadline
+        self.signal_ids = []
+        self.net_volume = 0.0
+        self.futures = []
+        self.done = threading.Event()  # set once the batch's order has been executed
+
+
+class SignalCoalescer:
+    """Nets market signals per symbol over a time window and executes one order per batch"""
+
+    def __init__(self, execute, window=0.25):
+        # execute(net_signal, signal_ids) sends the net order and returns its result
+        self.execute = execute
+        self.window = window
+
+        self._batches = {}
+        self._in_flight = []  # batches taken out of _batches whose order is being executed
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+        self.signals = 0
+        self.batches = 0
+        self.orders_sent = 0
+        self.netted_out = 0
+
+    # ---------------- Lifecycle ----------------
+    def start(self):
+        """Start the thread that flushes batches when their window closes"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name='signal-coalescer', daemon=True)
+        self._thread.start()
+        logger.info("COALESCER: Netting market signals over %.0fms windows", self.window * 1000)
+
+    def stop(self):
+        """Flush every open batch and stop the thread"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    # ---------------- Submitting ----------------
+    def submit(self, signal_id, signal) -> Future:
+        """Add a market signal to its symbol's batch; the future resolves to the net result"""
+        volume = -signal.volume if signal.action == 'SELL' else signal.volume
+
+        future = Future()
+        key = signal.symbol.upper()
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("Signal coalescer is not running")
+            batch = self._batches.get(key)
+            if batch is None:
+                batch = self._batches[key] = _Batch(signal.symbol, time.monotonic() + self.window)
+                self._cond.notify_all()
+            batch.signal_ids.append(signal_id)
+            batch.net_volume += volume
+            batch.futures.append(future)
+            self.signals += 1
+        return future
+
+    # ---------------- Flushing ----------------
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    due = [b for b in self._batches.values() if b.deadline <= now or not self._running]
+                    if due or (not self._running and not self._batches):
+                        break
+                    timeout = min(b.deadline for b in self._batches.values()) - now if self._batches else None
+                    self._cond.wait(timeout)
+                for batch in due:
+                    del self._batches[batch.symbol.upper()]
+                self._in_flight.extend(due)
+                if not due:
+                    return
+
+            for batch in due:
+                self._flush(batch)
+
+    def flush(self, symbol=None):
+        """
+        Execute the open batch for symbol (every open batch when None) now,
+        after waiting for batches of that symbol already being executed.
+
+        Called from the thread about to schedule a CLOSE, never from the MT5
+        executor thread, which the batches' orders need.
+        """
+        key = symbol.upper() if symbol else None
+        with self._cond:
+            if key is None:
+                due = list(self._batches.values())
+                self._batches.clear()
+            else:
+                batch = self._batches.pop(key, None)
+                due = [batch] if batch is not None else []
+            executing = [b for b in self._in_flight if key is None or b.symbol.upper() == key]
+            self._in_flight.extend(due)
+
+        for batch in executing:
+            batch.done.wait()
+        for batch in due:
+            logger.info("COALESCER: Flushing %s ahead of a close", batch.symbol)
+            self._flush(batch)
+
+    def _flush(self, batch):
+        """Send the net order for a closed batch and resolve every signal in it"""
+        net = round(batch.net_volume, VOLUME_PRECISION)
+        self.batches += 1
+        try:
+            if net == 0:
+                self.netted_out += 1
+                result = OrderResult(True, comment='Netted out', symbol=batch.symbol, volume=0.0)
+                logger.info("COALESCER: %s %s signals netted to zero, no order sent", batch.symbol, len(batch.signal_ids))
+            else:
+                net_signal = Signal('BUY' if net > 0 else 'SELL', batch.symbol, abs(net))
+                logger.info("COALESCER: %s %s signals -> %s %s", batch.symbol, len(batch.signal_ids), net_signal.action, net_signal.volume)
+                self.orders_sent += 1
+                result = self.execute(net_signal, batch.signal_ids)
+        except Exception as e:
+            logger.error("COALESCER_ERROR: %s batch failed - %s", batch.symbol, e)
+            for future in batch.futures:
+                future.set_exception(e)
+        else:
+            for future in batch.futures:
+                future.set_result(result)
+        finally:
+            with self._cond:
+                self._in_flight.remove(batch)
+            batch.done.set()
+
+    def stats(self) -> dict:
+        """Batching counters"""
+        batches = self.batches
+        return {
+            'window_ms': round(self.window * 1000, 1),
+            'signals': self.signals,
+            'batches': batches,
+            'orders_sent': self.orders_sent,
+            'netted_out': self.netted_out,
+            'avg_batch_size': round(self.signals / batches, 2) if batches else 0.0,
+            'open_batches': len(self._batches),
+        }
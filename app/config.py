@@ -14,9 +14,85 @@ class Config:
         self.MT5_SERVER = os.getenv('MT5_SERVER', '')
         self.MT5_PATH = os.getenv('MT5_PATH', 'C:\\Program Files\\MetaTrader 5\\terminal64.exe')
         
+        # MT5 backend: 'terminal' (MetaTrader5 package) or 'sim' (in-process paper trading, app/sim_mt5.py)
+        self.MT5_BACKEND = os.getenv('MT5_BACKEND', 'terminal').lower()
+        self.SIM_SYMBOLS = int(os.getenv('SIM_SYMBOLS', 1000))
+        self.SIM_ACCOUNT_MODE = os.getenv('SIM_ACCOUNT_MODE', 'hedging').lower()
+        self.SIM_LATENCY_MS = float(os.getenv('SIM_LATENCY_MS', 0))
+        self.SIM_ORDER_LATENCY_MS = float(os.getenv('SIM_ORDER_LATENCY_MS', 0))
+        self.SIM_RETCODES = os.getenv('SIM_RETCODES', '')
+
         # MT5 Symbol Settings
         self.MT5_DEFAULT_SUFFIX = os.getenv('MT5_DEFAULT_SUFFIX', '')
+
+        # Symbol Mapping Cache
+        self.SYMBOL_CACHE_SIZE = int(os.getenv('SYMBOL_CACHE_SIZE', 1024))
+        self.SYMBOL_CACHE_TTL = int(os.getenv('SYMBOL_CACHE_TTL', 86400))
+        self.SYMBOL_CACHE_NEGATIVE_TTL = int(os.getenv('SYMBOL_CACHE_NEGATIVE_TTL', 300))
+        self.SYMBOL_CHECK_INTERVAL = int(os.getenv('SYMBOL_CHECK_INTERVAL', 60))
+        self.SYMBOL_CACHE_DIR = os.getenv('SYMBOL_CACHE_DIR', 'cache')
+        self.SYMBOL_CACHE_FLUSH_INTERVAL = float(os.getenv('SYMBOL_CACHE_FLUSH_INTERVAL', 5))
+        
+        # Symbol tradeability metadata (refresh/max age in seconds; 0 disables the cache) and
+        # comma-separated TradingView symbols selected into Market Watch at startup
+        self.SYMBOL_META_REFRESH = float(os.getenv('SYMBOL_META_REFRESH', 30))
+        self.SYMBOL_META_MAX_AGE = float(os.getenv('SYMBOL_META_MAX_AGE', 120))
+        self.MT5_WATCHLIST = [s.strip() for s in os.getenv('MT5_WATCHLIST', '').split(',') if s.strip()]
         
+        # Local pre-trade checks (volume step/min/max, stops and freeze levels); too-close
+        # SL/TP are rejected, or moved to the minimum distance with PRETRADE_STOPS_MODE=clamp
+        self.PRETRADE_VALIDATION = os.getenv('PRETRADE_VALIDATION', 'True').lower() == 'true'
+        self.PRETRADE_STOPS_MODE = os.getenv('PRETRADE_STOPS_MODE', 'reject').lower()
+
+        # Order requests: max slippage in points (instant/request execution) and the EA magic number;
+        # the filling mode is derived per symbol from its symbol_info
+        self.MT5_DEVIATION = int(os.getenv('MT5_DEVIATION', 20))
+        self.MT5_MAGIC = int(os.getenv('MT5_MAGIC', 123456))
+
+        # Market orders answered with REQUOTE/PRICE_CHANGED/PRICE_OFF are re-priced and sent again,
+        # up to ORDER_RETRY_ATTEMPTS sends in total within ORDER_RETRY_BUDGET_MS (1 disables retries)
+        self.ORDER_RETRY_ATTEMPTS = int(os.getenv('ORDER_RETRY_ATTEMPTS', 3))
+        self.ORDER_RETRY_BUDGET_MS = float(os.getenv('ORDER_RETRY_BUDGET_MS', 300))
+
+        # MT5 Executor (all MetaTrader5 calls run on one thread). Calls are queued in priority
+        # lanes (closes, then pending orders, then entries); a lane passed over MT5_LANE_MAX_SKIPS
+        # times in a row goes next (0 = strict priority)
+        self.MT5_QUEUE_SIZE = int(os.getenv('MT5_QUEUE_SIZE', 100))
+        self.MT5_CALL_TIMEOUT = float(os.getenv('MT5_CALL_TIMEOUT', 30))
+        self.MT5_LANE_MAX_SKIPS = int(os.getenv('MT5_LANE_MAX_SKIPS', 8))
+
+        # Connection supervisor (heartbeat seconds; 0 disables it) and reconnect backoff cap
+        self.MT5_HEARTBEAT_INTERVAL = float(os.getenv('MT5_HEARTBEAT_INTERVAL', 5))
+        self.MT5_HEARTBEAT_TIMEOUT = float(os.getenv('MT5_HEARTBEAT_TIMEOUT', 10))
+        self.MT5_RECONNECT_MAX_BACKOFF = float(os.getenv('MT5_RECONNECT_MAX_BACKOFF', 60))
+
+        # In-memory position book behind /positions (sync seconds; 0 asks the terminal per request)
+        self.POSITION_SYNC_INTERVAL = float(os.getenv('POSITION_SYNC_INTERVAL', 1))
+
+        # Asynchronous /trade mode (202 + status lookup at /trade/<id>)
+        self.ASYNC_TRADE_MODE = os.getenv('ASYNC_TRADE_MODE', 'False').lower() == 'true'
+        self.SIGNAL_STATUS_LIMIT = int(os.getenv('SIGNAL_STATUS_LIMIT', 10000))
+
+        # Write-ahead signal journal (empty path disables it)
+        self.SIGNAL_JOURNAL_PATH = os.getenv('SIGNAL_JOURNAL_PATH', 'journal/signals.jsonl')
+        self.SIGNAL_JOURNAL_FSYNC = os.getenv('SIGNAL_JOURNAL_FSYNC', 'True').lower() == 'true'
+        self.SIGNAL_JOURNAL_TIMEOUT = float(os.getenv('SIGNAL_JOURNAL_TIMEOUT', 2))
+
+        # Duplicate-alert suppression (seconds; 0 disables it)
+        self.IDEMPOTENCY_WINDOW = float(os.getenv('IDEMPOTENCY_WINDOW', 60))
+        self.IDEMPOTENCY_MAX_KEYS = int(os.getenv('IDEMPOTENCY_MAX_KEYS', 100000))
+
+        # Net same-symbol market signals arriving within this many seconds (0 disables it)
+        self.COALESCE_WINDOW = float(os.getenv('COALESCE_WINDOW', 0))
+
+        # Multi-account fan-out (JSON list of accounts, one MT5 terminal each)
+        self.FANOUT_ACCOUNTS_FILE = os.getenv('FANOUT_ACCOUNTS_FILE', '')
+
+        # Quote Cache (opt-in background ticks for traded symbols)
+        self.QUOTE_CACHE_ENABLED = os.getenv('QUOTE_CACHE_ENABLED', 'False').lower() == 'true'
+        self.QUOTE_POLL_INTERVAL = float(os.getenv('QUOTE_POLL_INTERVAL', 0.2))
+        self.QUOTE_MAX_AGE = float(os.getenv('QUOTE_MAX_AGE', 1.0))
+
         # Trading Parameters
         self.DEFAULT_VOLUME = float(os.getenv('DEFAULT_VOLUME', 0.01))
         self.DEFAULT_STOP_LOSS = int(os.getenv('DEFAULT_STOP_LOSS', 100))
@@ -30,6 +106,21 @@ class Config:
         self.SERVER_PORT = int(os.getenv('FLASK_PORT', os.getenv('SERVER_PORT', 5000)))
         self.DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
 
+        # Logging (queued; written by a background listener)
+        self.LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+        self.LOG_FILE = os.getenv('LOG_FILE', 'trading_bot.log')
+        self.LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024))
+        self.LOG_ROTATE_WHEN = os.getenv('LOG_ROTATE_WHEN', '')
+        self.LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 10))
+        self.LOG_COMPRESS = os.getenv('LOG_COMPRESS', 'True').lower() == 'true'
+        self.LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+        self.LOG_HEALTH_SAMPLE = int(os.getenv('LOG_HEALTH_SAMPLE', 60))
+
+        # 'flask' (Werkzeug development server) or 'asyncio' (production ingest)
+        self.SERVER_MODE = os.getenv('SERVER_MODE', 'flask').lower()
+        self.SERVER_WORKERS = int(os.getenv('SERVER_WORKERS', 32))
+        self.SERVER_KEEPALIVE_TIMEOUT = float(os.getenv('SERVER_KEEPALIVE_TIMEOUT', 75))
+
         # --- SECTION ADDED FOR EMAIL ALERTS ---
         # Email Alert Configuration
         self.SENDER_EMAIL = os.getenv('SENDER_EMAIL', '')
@@ -43,17 +134,19 @@ class Config:
         """Validate configuration"""
         errors = []
         
-        if not self.MT5_ACCOUNT:
-            errors.append("MT5_ACCOUNT is required in .env file")
-            
-        if not self.MT5_PASSWORD:
-            errors.append("MT5_PASSWORD is required in .env file")
-            
-        if not self.MT5_SERVER:
-            errors.append("MT5_SERVER is required in .env file")
-            
-        if not os.path.exists(self.MT5_PATH):
-            errors.append(f"MT5_PATH does not exist: {self.MT5_PATH}")
+        # The simulated backend needs no terminal or credentials
+        if self.MT5_BACKEND != 'sim':
+            if not self.MT5_ACCOUNT:
+                errors.append("MT5_ACCOUNT is required in .env file")
+                
+            if not self.MT5_PASSWORD:
+                errors.append("MT5_PASSWORD is required in .env file")
+                
+            if not self.MT5_SERVER:
+                errors.append("MT5_SERVER is required in .env file")
+                
+            if not os.path.exists(self.MT5_PATH):
+                errors.append(f"MT5_PATH does not exist: {self.MT5_PATH}")
             
         if not self.NGROK_AUTH_TOKEN:
             errors.append("NGROK_AUTH_TOKEN is required in .env file")
@@ -78,7 +171,24 @@ MT5 Configuration:
 - Account: {self.MT5_ACCOUNT}
 - Server: {self.MT5_SERVER}
 - Path: {self.MT5_PATH}
+- Backend: {self.MT5_BACKEND if self.MT5_BACKEND != 'sim' else f'sim ({self.SIM_SYMBOLS} symbols, {self.SIM_ACCOUNT_MODE}, {self.SIM_LATENCY_MS}ms/call)'}
 - Symbol Suffix: {self.MT5_DEFAULT_SUFFIX}
+- Symbol Cache: {self.SYMBOL_CACHE_SIZE} entries, TTL {self.SYMBOL_CACHE_TTL}s (negative {self.SYMBOL_CACHE_NEGATIVE_TTL}s)
+- Symbol Cache Dir: {self.SYMBOL_CACHE_DIR or 'Disabled'}
+- Symbol Metadata: {f'Refreshed every {self.SYMBOL_META_REFRESH}s, max age {self.SYMBOL_META_MAX_AGE}s' if self.SYMBOL_META_REFRESH > 0 else 'Disabled'}
+- Watchlist: {', '.join(self.MT5_WATCHLIST) or 'None'}
+- Pre-trade Checks: {f'Enabled, too-close stops {self.PRETRADE_STOPS_MODE}ed' if self.PRETRADE_VALIDATION else 'Disabled'}
+- Orders: deviation {self.MT5_DEVIATION} points, magic {self.MT5_MAGIC}
+- Requote Retries: {f'Up to {self.ORDER_RETRY_ATTEMPTS} sends within {self.ORDER_RETRY_BUDGET_MS}ms' if self.ORDER_RETRY_ATTEMPTS > 1 else 'Disabled'}
+- MT5 Queue: {self.MT5_QUEUE_SIZE} calls, timeout {self.MT5_CALL_TIMEOUT}s, lanes {f'skipped at most {self.MT5_LANE_MAX_SKIPS}x' if self.MT5_LANE_MAX_SKIPS > 0 else 'strict priority'}
+- Heartbeat: {f'Every {self.MT5_HEARTBEAT_INTERVAL}s, reconnect backoff up to {self.MT5_RECONNECT_MAX_BACKOFF}s' if self.MT5_HEARTBEAT_INTERVAL > 0 else 'Disabled'}
+- Position Book: {f'Synced every {self.POSITION_SYNC_INTERVAL}s' if self.POSITION_SYNC_INTERVAL > 0 else 'Disabled'}
+- Async Trade Mode: {self.ASYNC_TRADE_MODE}
+- Signal Journal: {self.SIGNAL_JOURNAL_PATH or 'Disabled'}
+- Coalesce Window: {f'{self.COALESCE_WINDOW}s' if self.COALESCE_WINDOW > 0 else 'Disabled'}
+- Duplicate Window: {f'{self.IDEMPOTENCY_WINDOW}s, {self.IDEMPOTENCY_MAX_KEYS} keys' if self.IDEMPOTENCY_WINDOW > 0 else 'Disabled'}
+- Fan-out Accounts: {self.FANOUT_ACCOUNTS_FILE or 'Disabled'}
+- Quote Cache: {f'Every {self.QUOTE_POLL_INTERVAL}s, max age {self.QUOTE_MAX_AGE}s' if self.QUOTE_CACHE_ENABLED else 'Disabled'}
 
 Trading Parameters:
 - Default Volume: {self.DEFAULT_VOLUME}
@@ -89,6 +199,13 @@ Server Configuration:
 - Host: {self.SERVER_HOST}
 - Port: {self.SERVER_PORT}
 - Debug: {self.DEBUG}
+- Mode: {self.SERVER_MODE}
+
+Logging:
+- Level: {self.LOG_LEVEL}
+- File: {self.LOG_FILE or 'Disabled'}
+- Rotation: {f'every {self.LOG_ROTATE_WHEN}' if self.LOG_ROTATE_WHEN else f'{self.LOG_MAX_BYTES} bytes'}, {self.LOG_BACKUP_COUNT} backups{' (gzip)' if self.LOG_COMPRESS else ''}
+- Health Check Sampling: 1 in {self.LOG_HEALTH_SAMPLE}
 
 {self.get_email_config_str()}
 """
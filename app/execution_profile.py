@@ -0,0 +1,128 @@
+"""
+Per-symbol execution profiles.
+
+Every order used to be sent with ORDER_FILLING_FOK, which brokers that only
+allow IOC or RETURN reject with INVALID_FILL (10030). The filling mode is a
+property of the symbol, so it is derived once from symbol_info.filling_mode
+and the execution mode, together with the price digits and volume step, and
+kept per symbol. Each profile holds prebuilt request templates: building an
+order is a dict copy plus the per-order fields.
+
+The preferred filling is FOK, then IOC, whichever the symbol allows; RETURN
+is used when neither flag is set, which only request and instant execution
+(and exchange execution) accept for market orders.
+"""
+
+import logging
+
+import MetaTrader5 as mt5
+
+logger = logging.getLogger(__name__)
+
+FILLING_NAMES = {
+    mt5.ORDER_FILLING_FOK: 'FOK',
+    mt5.ORDER_FILLING_IOC: 'IOC',
+    mt5.ORDER_FILLING_RETURN: 'RETURN',
+}
+
+ORDER_COMMENT = "TradingView Auto-Signal"
+CLOSE_COMMENT = "Auto-close position"
+
+
+def filling_mode(info) -> int:
+    """ORDER_FILLING_* the symbol accepts for market orders"""
+    allowed = getattr(info, 'filling_mode', 0) or 0
+    if allowed & mt5.SYMBOL_FILLING_FOK:
+        return mt5.ORDER_FILLING_FOK
+    if allowed & mt5.SYMBOL_FILLING_IOC:
+        return mt5.ORDER_FILLING_IOC
+    if getattr(info, 'trade_exemode', None) == mt5.SYMBOL_TRADE_EXECUTION_MARKET:
+        logger.warning("EXECUTION_PROFILE_WARNING: %s allows neither FOK nor IOC under market execution, "
+                       "trying RETURN", info.name)
+    return mt5.ORDER_FILLING_RETURN
+
+
+class ExecutionProfile:
+    """How orders for one symbol are sent: filling mode, rounding and request templates"""
+
+    __slots__ = ('symbol', 'digits', 'volume_step', 'execution', 'filling', 'close_by', '_deal', '_pending', '_close')
+
+    def __init__(self, info, deviation=20, magic=123456):
+        self.symbol = info.name
+        self.digits = info.digits
+        self.volume_step = getattr(info, 'volume_step', 0) or 0.01
+        self.execution = getattr(info, 'trade_exemode', None)
+        self.filling = filling_mode(info)
+        # Whether opposite positions may be netted with TRADE_ACTION_CLOSE_BY
+        self.close_by = bool(getattr(info, 'order_mode', 0) & mt5.SYMBOL_ORDER_CLOSEBY)
+
+        common = {
+            "symbol": self.symbol,
+            "magic": magic,
+            "type_time": mt5.ORDER_TIME_GTC,
+            "type_filling": self.filling,
+        }
+        self._deal = {**common, "action": mt5.TRADE_ACTION_DEAL, "deviation": deviation, "comment": ORDER_COMMENT}
+        self._pending = {**common, "action": mt5.TRADE_ACTION_PENDING, "comment": ORDER_COMMENT}
+        self._close = {**common, "action": mt5.TRADE_ACTION_DEAL, "deviation": deviation, "comment": CLOSE_COMMENT}
+
+    def order(self, order_type, volume, price, sl, tp, pending=False) -> dict:
+        """order_send request for a new market or pending order, prices rounded to the symbol's digits"""
+        request = (self._pending if pending else self._deal).copy()
+        request["type"] = order_type
+        request["volume"] = volume
+        request["price"] = round(price, self.digits) if price else price
+        request["sl"] = round(sl, self.digits) if sl else sl
+        request["tp"] = round(tp, self.digits) if tp else tp
+        return request
+
+    def close(self, ticket, order_type, volume, price) -> dict:
+        """order_send request closing (part of) a position with an opposite deal"""
+        request = self._close.copy()
+        request["position"] = ticket
+        request["type"] = order_type
+        request["volume"] = volume
+        request["price"] = price
+        return request
+
+    def describe(self) -> dict:
+        return {'filling': FILLING_NAMES.get(self.filling, self.filling), 'digits': self.digits,
+                'volume_step': self.volume_step, 'execution': self.execution, 'close_by': self.close_by}
+
+
+class ExecutionProfiles:
+    """ExecutionProfile per symbol, built on first use from symbol_info"""
+
+    def __init__(self, fetch_info, deviation=20, magic=123456):
+        self.fetch_info = fetch_info
+        self.deviation = deviation
+        self.magic = magic
+        self._profiles = {}
+        self.built = 0
+
+    def get(self, symbol, info=None):
+        """Profile for symbol, built from info (or a fetched symbol_info) the first time; None if unknown"""
+        profile = self._profiles.get(symbol)
+        if profile is None:
+            info = info if info is not None else self.fetch_info(symbol)
+            if info is None:
+                return None
+            profile = self._profiles[symbol] = ExecutionProfile(info, self.deviation, self.magic)
+            self.built += 1
+            logger.info("EXECUTION_PROFILE: %s fills %s", symbol, FILLING_NAMES.get(profile.filling, profile.filling))
+        return profile
+
+    def discard(self, symbol):
+        """Rebuild the symbol's profile on its next order (e.g. after INVALID_FILL)"""
+        self._profiles.pop(symbol, None)
+
+    def clear(self):
+        self._profiles.clear()
+
+    def stats(self) -> dict:
+        """Cached profiles with their filling modes"""
+        return {
+            'profiles': len(self._profiles),
+            'built': self.built,
+            'symbols': {symbol: profile.describe() for symbol, profile in list(self._profiles.items())},
+        }
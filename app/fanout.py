@@ -0,0 +1,246 @@
+"""
+Multi-account fan-out through a pool of MT5 worker processes.
+
+The MetaTrader5 module binds one terminal per process, so each account runs
+in its own worker process with its own terminal path and credentials. A
+signal is sent to every worker at once and the per-account results are
+collected afterwards, so the fan-out takes as long as the slowest account
+rather than the sum of all of them.
+
+Accounts are listed in a JSON file (FANOUT_ACCOUNTS_FILE):
+
+    [
+        {"name": "main", "account": 12345678, "password": "...",
+         "server": "Broker-Live", "path": "C:\\\\MT5-A\\\\terminal64.exe"},
+        {"name": "copy", "account": 87654321, "password": "...",
+         "server": "Broker-Live", "path": "C:\\\\MT5-B\\\\terminal64.exe"}
+    ]
+"""
+
+import itertools
+import json
+import logging
+import multiprocessing
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Handler methods a worker is allowed to run
+WORKER_METHODS = {'send_order', 'close_positions', 'bulk_close', 'get_positions', 'get_cache_stats'}
+
+
+def load_accounts(path) -> list:
+    """Read and validate the fan-out accounts file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        accounts = json.load(f)
+
+    if not isinstance(accounts, list) or not accounts:
+        raise ValueError(f"{path} must contain a non-empty JSON list of accounts")
+
+    for i, entry in enumerate(accounts):
+        missing = [key for key in ('account', 'password', 'server', 'path') if not entry.get(key)]
+        if missing:
+            raise ValueError(f"Account #{i + 1} in {path} is missing: {', '.join(missing)}")
+        entry['account'] = int(entry['account'])
+        entry.setdefault('name', str(entry['account']))
+    return accounts
+
+
+def _worker_main(account, conn):
+    """Worker process: own one terminal and run handler calls sent over conn"""
+    from app.config import Config
+    from app.mt5_executor import MT5Executor
+    from app.mt5_handler import MT5Handler
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f'%(asctime)s - [{account["name"]}] %(name)s - %(levelname)s - %(message)s',
+    )
+
+    executor = MT5Executor(name=f'mt5-executor-{account["name"]}')
+    executor.start()
+    handler = MT5Handler.from_config(
+        Config(),
+        account=account['account'],
+        password=account['password'],
+        server=account['server'],
+        path=account['path'],
+    )
+    handler.executor = executor
+    connected = executor.call(handler.connect)
+    conn.send(('ready', connected))
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+
+        request_id, method, args = message
+        started = time.perf_counter()
+        try:
+            if method not in WORKER_METHODS:
+                raise ValueError(f"Unsupported fan-out method: {method}")
+            result, error = executor.call(getattr(handler, method), *args), None
+        except Exception as e:
+            result, error = None, str(e)
+        latency = (time.perf_counter() - started) * 1000
+        conn.send((request_id, result, error, latency))
+
+    executor.call(handler.disconnect)
+    executor.stop()
+
+
+class _Worker:
+    """Parent-side view of one account's worker process"""
+
+    def __init__(self, account, context):
+        self.account = account
+        self.name = account['name']
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(account, child_conn),
+            name=f"mt5-worker-{self.name}",
+            daemon=True,
+        )
+        self.lock = threading.Lock()
+        self.connected = False
+
+    def recv(self, request_id, deadline):
+        """Wait for the response to request_id, dropping late replies to earlier requests"""
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.conn.poll(remaining):
+                raise TimeoutError(f"No response from account '{self.name}'")
+            reply = self.conn.recv()
+            if reply[0] == request_id:
+                return reply
+
+
+class FanoutResult:
+    """Aggregated per-account outcome of one fanned-out call; truthy if every account succeeded"""
+
+    def __init__(self, method, accounts, latency_ms):
+        self.method = method
+        self.accounts = accounts
+        self.latency_ms = latency_ms
+
+    @property
+    def success(self) -> bool:
+        return bool(self.accounts) and all(a['success'] for a in self.accounts)
+
+    def __bool__(self):
+        return self.success
+
+    def to_dict(self) -> dict:
+        return {
+            'method': self.method,
+            'success': self.success,
+            'latency_ms': self.latency_ms,
+            'accounts': self.accounts,
+        }
+
+
+class FanoutPool:
+    """One worker process per account; dispatch() runs a handler call on all of them in parallel"""
+
+    def __init__(self, accounts, timeout=30.0, start_timeout=120.0):
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        context = multiprocessing.get_context('spawn')
+        self.workers = [_Worker(account, context) for account in accounts]
+        self._ids = itertools.count(1)
+        self._id_lock = threading.Lock()
+
+    def start(self) -> bool:
+        """Start every worker and wait for their MT5 logins; True if all connected"""
+        for worker in self.workers:
+            worker.process.start()
+
+        deadline = time.monotonic() + self.start_timeout
+        for worker in self.workers:
+            try:
+                _, worker.connected = worker.recv('ready', deadline)
+            except (TimeoutError, EOFError):
+                worker.connected = False
+            status = "connected" if worker.connected else "FAILED to connect"
+            logger.info("FANOUT: Account '%s' (%s) %s", worker.name, worker.account['account'], status)
+
+        return all(worker.connected for worker in self.workers)
+
+    def stop(self):
+        """Ask every worker to disconnect and exit"""
+        for worker in self.workers:
+            try:
+                with worker.lock:
+                    worker.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        for worker in self.workers:
+            worker.process.join(timeout=10)
+
+    def dispatch(self, method, *args) -> FanoutResult:
+        """Run handler.method(*args) on every account concurrently and aggregate the results"""
+        with self._id_lock:
+            request_id = next(self._ids)
+
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        sent = []
+
+        # Lock workers in a fixed order so concurrent dispatches cannot deadlock
+        for worker in self.workers:
+            worker.lock.acquire()
+        try:
+            for worker in self.workers:
+                try:
+                    worker.conn.send((request_id, method, args))
+                    sent.append((worker, None))
+                except (OSError, ValueError) as e:
+                    sent.append((worker, f"Worker unavailable: {e}"))
+
+            accounts = []
+            for worker, send_error in sent:
+                entry = {'name': worker.name, 'account': worker.account['account']}
+                if send_error:
+                    entry.update(success=False, error=send_error, latency_ms=None)
+                else:
+                    try:
+                        _, result, error, latency = worker.recv(request_id, deadline)
+                        entry.update(
+                            success=error is None and self._succeeded(result),
+                            result=result.to_dict() if hasattr(result, 'to_dict') else result,
+                            error=error,
+                            latency_ms=round(latency, 3),
+                        )
+                    except (TimeoutError, EOFError, OSError) as e:
+                        entry.update(success=False, error=str(e), latency_ms=None)
+                accounts.append(entry)
+        finally:
+            for worker in self.workers:
+                worker.lock.release()
+
+        latency_ms = round((time.perf_counter() - started) * 1000, 3)
+        return FanoutResult(method, accounts, latency_ms)
+
+    def stats(self) -> list:
+        """Process and connection state of every worker"""
+        return [
+            {
+                'name': worker.name,
+                'account': worker.account['account'],
+                'alive': worker.process.is_alive(),
+                'connected': worker.connected,
+            }
+            for worker in self.workers
+        ]
+
+    @staticmethod
+    def _succeeded(result) -> bool:
+        if isinstance(result, dict) and 'success' in result:
+            return bool(result['success'])
+        return bool(result) or result == []
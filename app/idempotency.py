@@ -0,0 +1,126 @@
+"""
+Duplicate-alert suppression for /trade.
+
+TradingView occasionally delivers an alert twice and tunnel retries add
+more. Each signal is identified by a client-supplied ID (Idempotency-Key
+header, or an "id"/"alert_id"/"idempotency_key" field) or, failing that, by
+a hash over symbol, action, volume and alert time. Signals without either
+are never treated as duplicates, since two identical alerts with no alert
+time may be genuinely separate trades.
+
+Seen keys live in a ring of time buckets: each bucket covers window/buckets
+seconds and is cleared wholesale when the ring wraps around to it, so
+lookups touch a fixed number of dicts and memory stays bounded by
+max_keys regardless of the alert rate.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+CLIENT_ID_FIELDS = ('idempotency_key', 'alert_id', 'id')
+ALERT_TIME_FIELDS = ('time', 'timenow', 'alert_time')
+CONTENT_FIELDS = ('symbol', 'action', 'volume')
+
+
+def idempotency_key(data, client_id=None):
+    """Client ID or content hash identifying a signal, or None if it cannot be identified"""
+    if not client_id:
+        client_id = next((data[f] for f in CLIENT_ID_FIELDS if data.get(f)), None)
+    if client_id:
+        return f"id:{client_id}"
+
+    alert_time = next((data[f] for f in ALERT_TIME_FIELDS if data.get(f)), None)
+    if alert_time is None:
+        return None
+    content = '|'.join(str(data.get(f, '')).strip().upper() for f in CONTENT_FIELDS)
+    digest = hashlib.blake2b(f"{content}|{alert_time}".encode(), digest_size=16).hexdigest()
+    return f"hash:{digest}"
+
+
+class _Entry:
+    """Response of the first signal seen with a key; duplicates wait on it while in flight"""
+
+    __slots__ = ('key', 'body', 'status', 'done')
+
+    def __init__(self, key):
+        self.key = key
+        self.body = None
+        self.status = None
+        self.done = threading.Event()
+
+    def wait(self, timeout=None) -> bool:
+        return self.done.wait(timeout)
+
+
+class IdempotencyStore:
+    """Time-windowed set of signal keys kept in a ring of hash buckets"""
+
+    def __init__(self, window=60.0, buckets=12, max_keys=100000, clock=time.monotonic):
+        self.window = window
+        self.width = window / buckets
+        self.max_per_bucket = max(1, max_keys // buckets)
+        self.clock = clock
+
+        self._buckets = [OrderedDict() for _ in range(buckets)]
+        self._epoch = int(clock() // self.width)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _rotate(self):
+        """Clear buckets whose time slot has passed since the last call"""
+        epoch = int(self.clock() // self.width)
+        elapsed = epoch - self._epoch
+        if elapsed > 0:
+            n = len(self._buckets)
+            for step in range(1, min(elapsed, n) + 1):
+                self._buckets[(self._epoch + step) % n].clear()
+            self._epoch = epoch
+        return self._buckets[epoch % len(self._buckets)]
+
+    def begin(self, key):
+        """Return (entry, duplicate); a new key is registered as in flight"""
+        with self._lock:
+            current = self._rotate()
+            for bucket in self._buckets:
+                entry = bucket.get(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry, True
+
+            self.misses += 1
+            if len(current) >= self.max_per_bucket:
+                current.popitem(last=False)
+                self.evictions += 1
+            entry = current[key] = _Entry(key)
+            return entry, False
+
+    def complete(self, entry, body, status):
+        """Store the response of the first signal and release waiting duplicates"""
+        entry.body, entry.status = body, status
+        entry.done.set()
+
+    def release(self, entry, body, status):
+        """Answer waiting duplicates but forget the key so a retry is executed"""
+        with self._lock:
+            for bucket in self._buckets:
+                if bucket.get(entry.key) is entry:
+                    del bucket[entry.key]
+        self.complete(entry, body, status)
+
+    def stats(self) -> dict:
+        """Size and duplicate counters"""
+        with self._lock:
+            self._rotate()
+            size = sum(len(bucket) for bucket in self._buckets)
+        return {
+            'window': self.window,
+            'keys': size,
+            'duplicates': self.hits,
+            'unique': self.misses,
+            'evictions': self.evictions,
+        }
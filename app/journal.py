@@ -0,0 +1,238 @@
+"""
+Append-only write-ahead journal for incoming signals.
+
+Every signal is written to the journal before it reaches MT5, marked as
+executing when it is handed to the MT5 executor and closed with its result
+afterwards. The executing mark is queued without waiting; the executor waits
+for it (wait_committed) just before running the signal, by which time the
+mark has usually been committed with others while the signal sat in the
+queue. The MT5 thread therefore rarely waits on disk. A single writer
+thread group-commits records: whatever has queued up while the previous
+fsync was running is written and fsynced together, so at burst rates the
+cost of one fsync is shared by the whole batch.
+
+A batch only counts as committed once its write and fsync succeeded. A
+failed write is rolled back to the last good offset and retried with
+backoff, and nobody waits for it longer than commit_timeout: the waiter gets
+a JournalError and the server rejects the signal instead of executing it
+unjournaled.
+
+After a crash, pending_signals() finds signals that never got a result.
+Signals that were journaled but never started are safe to replay; signals
+that started without a result are ambiguous (the order may or may not have
+reached the broker) and are only replayed on request. A signal that was
+still queued for the executor counts as started. See
+scripts/replay_journal.py.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SIGNAL = 'signal'
+EXECUTING = 'executing'
+RESULT = 'result'
+
+RETRY_DELAY_MIN = 0.05
+RETRY_DELAY_MAX = 1.0
+
+
+class JournalError(Exception):
+    """Raised when a record could not be committed to disk in time"""
+
+
+class SignalJournal:
+    """Group-committing JSON-lines journal"""
+
+    def __init__(self, path, max_batch=512, fsync=True, commit_timeout=2.0):
+        self.path = path
+        self.max_batch = max_batch
+        self.fsync = fsync
+        self.commit_timeout = commit_timeout
+
+        self._file = None
+        self._pending = []
+        self._next_seq = 0
+        self._committed_seq = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+        self.records = 0
+        self.batches = 0
+        self.commit_time = 0.0
+        self.write_errors = 0
+
+    # ---------------- Lifecycle ----------------
+    def open(self):
+        """Open the journal for appending and start the writer thread"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, 'ab')
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='signal-journal', daemon=True)
+        self._thread.start()
+        logger.info("SIGNAL_JOURNAL: Writing to %s", self.path)
+        return self
+
+    def close(self):
+        """Commit everything still pending and close the file"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    # ---------------- Appending ----------------
+    def append(self, record, wait=True):
+        """Queue a record; with wait=True return only once it is on disk (JournalError after commit_timeout)"""
+        line = (json.dumps(record, separators=(',', ':'), default=str) + '\n').encode('utf-8')
+        with self._cond:
+            if self._closed or self._thread is None:
+                raise RuntimeError("Signal journal is not open")
+            self._next_seq += 1
+            seq = self._next_seq
+            self._pending.append(line)
+            self._cond.notify_all()
+        if wait:
+            self.wait_committed(seq)
+        return seq
+
+    def wait_committed(self, seq, timeout=None):
+        """Block until the record with sequence number seq is on disk; JournalError once timeout runs out"""
+        timeout = self.commit_timeout if timeout is None else timeout
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._committed_seq >= seq, timeout):
+                raise JournalError(f"Signal journal could not commit record {seq} within {timeout}s")
+
+    def log_signal(self, signal_id, method, args):
+        """Durably record an incoming signal before it is executed"""
+        # Signals are stored as plain dicts so a replay can parse them again
+        args = [arg.to_dict() if hasattr(arg, 'to_dict') else arg for arg in args]
+        self.append({'type': SIGNAL, 'id': signal_id, 'ts': time.time(), 'method': method, 'args': args})
+
+    def log_executing(self, signal_id, wait=True):
+        """Record that execution is about to start; returns the record's sequence number"""
+        return self.append({'type': EXECUTING, 'id': signal_id, 'ts': time.time()}, wait=wait)
+
+    def log_result(self, signal_id, fields, replayed=False):
+        """Record the outcome of a signal"""
+        record = {'type': RESULT, 'id': signal_id, 'ts': time.time(), **fields}
+        if replayed:
+            record['replayed'] = True
+        self.append(record, wait=False)
+
+    # ---------------- Writer ----------------
+    def _run(self):
+        retry_delay = 0.0
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending and self._closed:
+                    return
+                batch = self._pending[:self.max_batch]
+                del self._pending[:len(batch)]
+
+            started = time.perf_counter()
+            committed = self._write(batch)
+
+            with self._cond:
+                if committed:
+                    self._committed_seq += len(batch)
+                    self.records += len(batch)
+                    self.batches += 1
+                    self.commit_time += time.perf_counter() - started
+                    retry_delay = 0.0
+                    self._cond.notify_all()
+                    continue
+                # Not on disk: keep the records first in line and try again
+                self._pending[:0] = batch
+                self.write_errors += 1
+                if self._closed:
+                    logger.error("SIGNAL_JOURNAL_ERROR: Closing with %s uncommitted records", len(self._pending))
+                    return
+                retry_delay = min(max(retry_delay * 2, RETRY_DELAY_MIN), RETRY_DELAY_MAX)
+                self._cond.wait(retry_delay)
+
+    def _write(self, batch) -> bool:
+        """Write and fsync one batch; on failure roll the file back to where the batch started"""
+        offset = None
+        try:
+            if self._file is None:
+                self._file = open(self.path, 'ab')
+            offset = self._file.tell()
+            self._file.writelines(batch)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            return True
+        except OSError as e:
+            logger.error("SIGNAL_JOURNAL_ERROR: Failed to write %s records - %s", len(batch), e)
+            self._rollback(offset)
+            return False
+
+    def _rollback(self, offset):
+        """Drop a partly written batch so a retry does not follow a torn line"""
+        try:
+            self._file.close()
+        except (OSError, AttributeError):
+            pass
+        self._file = None
+        if offset is None:
+            return
+        try:
+            with open(self.path, 'r+b') as f:
+                f.truncate(offset)
+        except OSError as e:
+            logger.error("SIGNAL_JOURNAL_ERROR: Failed to roll back %s - %s", self.path, e)
+
+    def stats(self) -> dict:
+        """Batching and commit-latency metrics"""
+        batches = self.batches
+        return {
+            'records': self.records,
+            'batches': batches,
+            'avg_batch_size': round(self.records / batches, 2) if batches else 0.0,
+            'avg_commit_ms': round(self.commit_time / batches * 1000, 3) if batches else 0.0,
+            'pending': len(self._pending),
+            'write_errors': self.write_errors,
+        }
+
+
+def read_journal(path):
+    """Yield journal records, skipping a torn final line"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.warning("SIGNAL_JOURNAL_WARNING: Skipping unreadable record in %s", path)
+
+
+def pending_signals(path):
+    """
+    Signals without a result record, in arrival order.
+
+    Each entry is the original signal record plus 'started': True when an
+    'executing' mark was written (the outcome is then unknown).
+    """
+    signals = {}
+    for record in read_journal(path):
+        kind = record.get('type')
+        if kind == SIGNAL:
+            signals[record['id']] = dict(record, started=False)
+        elif kind == EXECUTING and record.get('id') in signals:
+            signals[record['id']]['started'] = True
+        elif kind == RESULT:
+            signals.pop(record.get('id'), None)
+    return list(signals.values())
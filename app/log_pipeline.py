@@ -0,0 +1,178 @@
+"""
+Non-blocking logging pipeline.
+
+Every logger writes into a bounded in-memory queue through a QueueHandler;
+a single listener thread formats the records and writes them to the sinks:
+
+- the console, where log_success/log_error style colors are applied
+- a log file rotated by size (LOG_MAX_BYTES) or time (LOG_ROTATE_WHEN),
+  with rotated files gzip-compressed on a background thread
+
+Callers only pay for building a LogRecord, merging its %-style arguments
+into the message and a queue put; records below the level are dropped
+before any of that. Line layout, colors and timestamps are rendered on the
+listener thread. High-frequency lines such as /health checks
+go through a sampling filter that drops them before they are queued.
+"""
+
+import atexit
+import gzip
+import itertools
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+import threading
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Logger used for /health request lines, sampled by LOG_HEALTH_SAMPLE
+HEALTH_LOGGER = 'app.health'
+
+RESET = '\033[0m'
+
+_listener = None
+_queue_handler = None
+_lock = threading.Lock()
+
+
+class ColorFormatter(logging.Formatter):
+    """Console formatter: colors the message of records logged with extra={'color': ...}"""
+
+    def formatMessage(self, record):
+        color = getattr(record, 'color', None)
+        if not color:
+            return super().formatMessage(record)
+        # The same record goes on to the file sink, so restore the plain message
+        message = record.message
+        record.message = f"{color}{message}{RESET}"
+        try:
+            return super().formatMessage(record)
+        finally:
+            record.message = message
+
+
+class SampleFilter(logging.Filter):
+    """Let one record in every `rate` through"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = max(1, rate)
+        self._count = itertools.count()
+
+    def filter(self, record):
+        return next(self._count) % self.rate == 0
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves line formatting to the listener and never blocks the caller"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The stock prepare() formats the whole line here, on the caller's thread.
+        # Only the message is merged now, since its arguments may be mutated
+        # before the listener gets to them, and tracebacks must not outlive the frame.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _gzip_rotator(source, dest):
+    """Rename the finished log aside and compress it without holding up the listener"""
+    pending = dest + '.tmp'
+    os.replace(source, pending)
+
+    def compress():
+        try:
+            with open(pending, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out)
+            os.remove(pending)
+        except OSError as e:
+            sys.stderr.write(f"LOG_ROTATE_ERROR: Failed to compress {pending} - {e}\n")
+
+    threading.Thread(target=compress, name='log-compress').start()
+
+
+def _file_handler(config):
+    directory = os.path.dirname(config.LOG_FILE)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if config.LOG_ROTATE_WHEN:
+        handler = logging.handlers.TimedRotatingFileHandler(
+            config.LOG_FILE, when=config.LOG_ROTATE_WHEN, backupCount=config.LOG_BACKUP_COUNT,
+            encoding='utf-8', delay=True,
+        )
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            config.LOG_FILE, maxBytes=config.LOG_MAX_BYTES, backupCount=config.LOG_BACKUP_COUNT,
+            encoding='utf-8', delay=True,
+        )
+    if config.LOG_COMPRESS:
+        handler.namer = lambda name: name + '.gz'
+        handler.rotator = _gzip_rotator
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    return handler
+
+
+def configure_logging(config, log_to_file=True):
+    """Route all logging through the queue and start the listener; safe to call more than once"""
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(ColorFormatter(LOG_FORMAT))
+        handlers = [console]
+        if log_to_file and config.LOG_FILE:
+            handlers.append(_file_handler(config))
+
+        queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=config.LOG_QUEUE_SIZE))
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(config.LOG_LEVEL.upper())
+
+        if config.LOG_HEALTH_SAMPLE > 1:
+            logging.getLogger(HEALTH_LOGGER).addFilter(SampleFilter(config.LOG_HEALTH_SAMPLE))
+
+        _listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+        _queue_handler = queue_handler
+        _listener.start()
+        atexit.register(stop_logging)
+        return _listener
+
+
+def stop_logging():
+    """Flush queued records to the sinks and stop the listener"""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def logging_stats() -> dict:
+    """Queue depth and records dropped because the queue was full"""
+    if _queue_handler is None:
+        return {}
+    return {'queued': _queue_handler.queue.qsize(), 'dropped': _queue_handler.dropped}
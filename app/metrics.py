@@ -0,0 +1,242 @@
+"""
+In-process metrics exported in the Prometheus text format at /metrics.
+
+Histograms use a fixed set of bucket bounds and a plain list of counts, so
+recording a sample costs a bisect and two increments. Counters and
+histograms are updated without locks: under the GIL a concurrent increment
+can very rarely be lost, which is an acceptable error for monitoring and
+keeps locks off the order path.
+
+State that already lives elsewhere (cache hit counts, queue depths) is not
+duplicated here. Register a collector that reads it when /metrics is
+scraped instead.
+"""
+
+import math
+import threading
+from bisect import bisect_left
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds, from 50 us (cache hits) up to 10 s (a terminal that stopped answering)
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class _Metric:
+    """Metric family: one child per combination of label values"""
+
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def labels(self, *values):
+        """Child for these label values; bind it once and reuse it on hot paths"""
+        values = tuple(str(v) for v in values)
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def collect(self):
+        """Text exposition lines for this family"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._sample_lines(values, child))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonic counter"""
+
+    type_name = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        """Increment the unlabelled counter"""
+        self._children[()].inc(amount)
+
+    def _sample_lines(self, values, child):
+        yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class _HistogramChild:
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; buckets are exported cumulatively as Prometheus expects"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, registry=None):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value):
+        """Record a sample on the unlabelled histogram"""
+        self._children[()].observe(value)
+
+    def _sample_lines(self, values, child):
+        counts = list(child.counts)
+        cumulative = 0
+        for bound, count in zip(self.bounds + (math.inf,), counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, [('le', _format_value(float(bound)))])
+            yield f"{self.name}_bucket{labels} {cumulative}"
+        labels = _format_labels(self.labelnames, values)
+        yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+        yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    """Metric families plus scrape-time collectors"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if any(m.name == metric.name for m in self._metrics):
+                raise ValueError(f"Duplicate metric: {metric.name}")
+            self._metrics.append(metric)
+
+    def add_collector(self, collect):
+        """
+        Register collect(), called on every scrape.
+
+        It yields (name, type, help, samples) tuples, where samples is a list
+        of (labels dict, value) pairs.
+        """
+        with self._lock:
+            self._collectors.append(collect)
+
+    def remove_collector(self, collect):
+        with self._lock:
+            if collect in self._collectors:
+                self._collectors.remove(collect)
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        for collect in collectors:
+            for name, type_name, documentation, samples in collect():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {type_name}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+# ---------------- Webhook Stages ----------------
+STAGE_SECONDS = Histogram(
+    'tvbridge_stage_seconds', 'Time spent in each stage of handling a webhook', ['stage'])
+REQUEST_SECONDS = STAGE_SECONDS.labels('request')
+JSON_PARSE_SECONDS = STAGE_SECONDS.labels('json_parse')
+VERIFY_SYMBOL_SECONDS = STAGE_SECONDS.labels('verify_symbol')
+SYMBOL_TICK_SECONDS = STAGE_SECONDS.labels('symbol_info_tick')
+ORDER_SEND_SECONDS = STAGE_SECONDS.labels('order_send')
+
+EXECUTOR_WAIT_SECONDS = Histogram(
+    'tvbridge_mt5_queue_wait_seconds', 'Time MT5 calls waited for the executor thread, by priority lane', ['lane'])
+
+MAP_SYMBOL_SECONDS = Histogram(
+    'tvbridge_map_symbol_seconds', 'Symbol mapping time by cache result and winning strategy',
+    ['cache', 'strategy'])
+MAP_SYMBOL_CACHE_HIT_SECONDS = MAP_SYMBOL_SECONDS.labels('hit', 'cache')
+
+MT5_RETCODES = Counter(
+    'tvbridge_mt5_retcodes_total', 'order_send results by MT5 retcode (none when it returned None)',
+    ['retcode'])
+
+ORDER_RETRIES = Counter(
+    'tvbridge_order_retries_total', 'Market orders sent again, by the retcode that triggered the retry',
+    ['retcode'])
+
+ORDER_ATTEMPTS = Histogram(
+    'tvbridge_order_attempts', 'order_send calls per market order, including retries', buckets=(1, 2, 3, 5, 10))
+
+# Points between the first quoted price and the fill; favourable fills land in the first bucket
+ORDER_SLIPPAGE_POINTS = Histogram(
+    'tvbridge_order_slippage_points', 'Adverse slippage of filled market orders in points',
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500))
+
+PRETRADE_REJECTIONS = Counter(
+    'tvbridge_pretrade_rejections_total', 'Orders rejected locally before order_send, by rule', ['reason'])
+
+TRADE_RESPONSES = Counter(
+    'tvbridge_trade_responses_total', '/trade responses by HTTP status', ['status'])
+
+
+def render() -> str:
+    """The default registry in Prometheus text format"""
+    return REGISTRY.render()
@@ -0,0 +1,285 @@
+"""
+Single-owner executor for MetaTrader5 calls.
+
+The MetaTrader5 module is process-global and not safe to drive from several
+threads at once. MT5Executor runs every submitted call on one dedicated
+thread, takes work through a bounded queue and rejects new work immediately
+when the queue is full instead of letting requests pile up.
+
+Work is queued in priority lanes rather than first-come first-served, so a
+CLOSE never waits behind a burst of new entries:
+
+- control: connecting, heartbeats, live lookups (short, and everything
+  else depends on them)
+- close: CLOSE signals
+- pending: pending orders
+- entry: new market orders
+- background: quote, symbol metadata and position book polling
+
+The highest non-empty lane goes first. To bound starvation, a waiting lane
+that has been passed over max_skips times in a row is served next
+(max_skips=0 is strict priority), unless its next call would then overtake
+an earlier call on the same symbol. Only entry-side lanes count against
+max_queue; control and close work is admitted up to max_queue calls of its
+own, so a full queue of entries can never lock out an exit on another
+symbol.
+
+Priority never reorders work on the same symbol, though. Calls submitted
+with an ordering key (the signal's symbol, or ANY_KEY for "every symbol")
+are queued right behind the last queued call with a matching key in a
+lower lane. A CLOSE for a symbol therefore still runs after an entry on that
+symbol that was queued before it, while overtaking entries on other symbols.
+Such a call joins the lower lane and counts against that lane's limits.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from app.metrics import EXECUTOR_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Highest priority first
+LANES = ('control', 'close', 'pending', 'entry', 'background')
+DEFAULT_LANE = 'control'
+# Lanes admitted even while entries fill the shared queue
+RESERVED_LANES = ('control', 'close')
+# Ordering key that matches every other key (e.g. a close of all positions)
+ANY_KEY = '*'
+
+
+class _Lane:
+    """Queued work items of one priority plus its counters"""
+
+    __slots__ = ('name', 'items', 'skipped', 'completed', 'total_wait', 'max_wait', 'wait_metric')
+
+    def __init__(self, name):
+        self.name = name
+        self.items = deque()
+        self.skipped = 0  # times passed over in a row while non-empty
+        self.completed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.wait_metric = EXECUTOR_WAIT_SECONDS.labels(name)
+
+
+class ExecutorBusy(Exception):
+    """Raised when the MT5 work queue is full"""
+
+
+class MT5Executor:
+    """Runs MT5 work items one at a time on a dedicated thread"""
+
+    def __init__(self, max_queue=100, name='mt5-executor', max_skips=8):
+        self.max_queue = max_queue
+        self.name = name
+        self.max_skips = max_skips
+        self._lanes = [_Lane(lane) for lane in LANES]
+        self._by_name = {lane.name: lane for lane in self._lanes}
+        self._shared_depth = 0  # queued items in lanes outside RESERVED_LANES
+        self._ready = threading.Condition()
+        self._stopping = False
+        self._thread = None
+        self._stats_lock = threading.Lock()
+
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.max_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    # ---------------- Lifecycle ----------------
+    def start(self):
+        """Start the worker thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        logger.info("MT5_EXECUTOR: Started with queue size %s, lanes %s", self.max_queue, ', '.join(LANES))
+
+    def stop(self, timeout=5.0):
+        """Finish queued work and stop the worker thread"""
+        if not self._thread:
+            return
+        with self._ready:
+            self._stopping = True
+            self._ready.notify()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def in_executor_thread(self) -> bool:
+        """True when called from the worker thread itself"""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    # ---------------- Submitting Work ----------------
+    def submit(self, fn, *args, lane=DEFAULT_LANE, key=None, **kwargs) -> Future:
+        """
+        Queue fn(*args, **kwargs) in a priority lane and return its Future; raises ExecutorBusy when full.
+
+        With an ordering key, the call never overtakes an earlier queued call with a matching key.
+        """
+        queued = self._by_name[lane]
+        future = Future()
+        with self._ready:
+            target, position = self._ordered_slot(queued, key) if key is not None else (queued, None)
+            # Admission follows the lane the call actually joins
+            reserved = target.name in RESERVED_LANES
+            if len(target.items) >= self.max_queue or (not reserved and self._shared_depth >= self.max_queue):
+                full = True
+            else:
+                full = False
+                item = (future, fn, args, kwargs, time.perf_counter(), key)
+                if position is None:
+                    target.items.append(item)
+                else:
+                    target.items.insert(position, item)
+                if not reserved:
+                    self._shared_depth += 1
+                depth = self.depth()
+                self._ready.notify()
+        if full:
+            with self._stats_lock:
+                self.rejected += 1
+            raise ExecutorBusy(f"MT5 queue is full ({self.max_queue} pending calls)")
+
+        with self._stats_lock:
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, depth)
+        return future
+
+    def _ordered_slot(self, lane, key):
+        """
+        (lane, index) at which a call with key keeps FIFO order with matching calls
+        queued in lower lanes; index None appends. The caller holds _ready.
+        """
+        below = self._lanes[self._lanes.index(lane) + 1:]
+        for lower in reversed(below):
+            for index in range(len(lower.items) - 1, -1, -1):
+                queued_key = lower.items[index][5]
+                if queued_key is not None and (queued_key == key or ANY_KEY in (key, queued_key)):
+                    return lower, index + 1
+        return lane, None
+
+    def depth(self) -> int:
+        """Calls waiting in all lanes"""
+        return sum(len(lane.items) for lane in self._lanes)
+
+    def call(self, fn, *args, timeout=None, lane=DEFAULT_LANE, key=None, **kwargs):
+        """
+        Run fn on the worker thread and wait for its result.
+
+        Calls made from the worker thread run inline. If the result is not
+        ready within timeout, a call that has not started yet is cancelled
+        and FutureTimeout is raised.
+        """
+        if self.in_executor_thread():
+            return fn(*args, **kwargs)
+
+        future = self.submit(fn, *args, lane=lane, key=key, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            future.cancel()
+            with self._stats_lock:
+                self.timed_out += 1
+            raise
+
+    # ---------------- Worker ----------------
+    def _next(self):
+        """Pop the next work item by lane priority and fairness; the caller holds _ready"""
+        waiting = [lane for lane in self._lanes if lane.items]
+        chosen = next((lane for lane in waiting if lane.skipped >= self.max_skips and not self._blocked(lane)),
+                      waiting[0])
+        for lane in waiting:
+            if lane is not chosen and lane.skipped < self.max_skips:
+                lane.skipped += 1
+        chosen.skipped = 0
+        if chosen.name not in RESERVED_LANES:
+            self._shared_depth -= 1
+        return chosen, chosen.items.popleft()
+
+    def _blocked(self, lane) -> bool:
+        """
+        True when lane's next call has a matching key queued in a higher lane.
+        Such a call was queued earlier (see _ordered_slot), so jumping the lane
+        ahead for fairness would run the two out of order. The caller holds _ready.
+        """
+        key = lane.items[0][5]
+        if key is None:
+            return False
+        for higher in self._lanes[:self._lanes.index(lane)]:
+            for item in higher.items:
+                if item[5] is not None and (item[5] == key or ANY_KEY in (key, item[5])):
+                    return True
+        return False
+
+    def _run(self):
+        while True:
+            with self._ready:
+                while not self._stopping and not self.depth():
+                    self._ready.wait()
+                if not self.depth():
+                    break
+                lane, item = self._next()
+
+            future, fn, args, kwargs, enqueued_at, _ = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            started = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+                failed = True
+            else:
+                future.set_result(result)
+                failed = False
+            finished = time.perf_counter()
+
+            wait = started - enqueued_at
+            lane.wait_metric.observe(wait)
+            with self._stats_lock:
+                self.completed += 1
+                self.failed += failed
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                self.total_run += finished - started
+                lane.completed += 1
+                lane.total_wait += wait
+                lane.max_wait = max(lane.max_wait, wait)
+
+    def stats(self) -> dict:
+        """Queue depth and wait-time metrics"""
+        with self._stats_lock:
+            completed = self.completed
+            return {
+                'queue_depth': self.depth(),
+                'max_queue': self.max_queue,
+                'max_depth_seen': self.max_depth,
+                'submitted': self.submitted,
+                'rejected': self.rejected,
+                'completed': completed,
+                'failed': self.failed,
+                'timed_out': self.timed_out,
+                'avg_wait_ms': round(self.total_wait / completed * 1000, 3) if completed else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3),
+                'avg_run_ms': round(self.total_run / completed * 1000, 3) if completed else 0.0,
+                'lanes': {
+                    lane.name: {
+                        'queue_depth': len(lane.items),
+                        'completed': lane.completed,
+                        'avg_wait_ms': round(lane.total_wait / lane.completed * 1000, 3) if lane.completed else 0.0,
+                        'max_wait_ms': round(lane.max_wait * 1000, 3),
+                    }
+                    for lane in self._lanes
+                },
+            }
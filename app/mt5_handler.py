@@ -2,6 +2,21 @@ import MetaTrader5 as mt5
 import logging
 from difflib import get_close_matches
 import re
+import time
+from app.bulk_close import BulkCloseEngine
+from app.execution_profile import ExecutionProfiles
+from app.metrics import (
+    MAP_SYMBOL_CACHE_HIT_SECONDS, MAP_SYMBOL_SECONDS, MT5_RETCODES, ORDER_ATTEMPTS, ORDER_RETRIES, ORDER_SEND_SECONDS,
+    ORDER_SLIPPAGE_POINTS, PRETRADE_REJECTIONS, SYMBOL_TICK_SECONDS, VERIFY_SYMBOL_SECONDS,
+)
+from app.order_result import OrderResult
+from app.pretrade import PreTradeError, check_order
+from app.quote_cache import QuoteCache
+from app.retry_policy import RetryPolicy
+from app.signal import Signal, parse_signal
+from app.symbol_cache import SymbolCache, SymbolCacheStore
+from app.symbol_index import SymbolIndex
+from app.symbol_meta import SymbolMetaCache
 
 # ANSI Color codes for terminal output
 class Colors:
@@ -18,76 +33,333 @@ class Colors:
 
 logger = logging.getLogger(__name__)
 
+# Canonical signal action -> MT5 order type
+ORDER_TYPES = {
+    'BUY': mt5.ORDER_TYPE_BUY,
+    'SELL': mt5.ORDER_TYPE_SELL,
+    'BUY_LIMIT': mt5.ORDER_TYPE_BUY_LIMIT,
+    'SELL_LIMIT': mt5.ORDER_TYPE_SELL_LIMIT,
+    'BUY_STOP': mt5.ORDER_TYPE_BUY_STOP,
+    'SELL_STOP': mt5.ORDER_TYPE_SELL_STOP,
+}
+
+# Symbol trade modes that accept no new positions
+NO_ENTRY_TRADE_MODES = (mt5.SYMBOL_TRADE_MODE_DISABLED, mt5.SYMBOL_TRADE_MODE_CLOSEONLY)
+
 
 class MT5Handler:
-    def __init__(self, account, password, server, path):
+    def __init__(self, account, password, server, path,
+                 symbol_cache_size=1024, symbol_cache_ttl=86400,
+                 symbol_cache_negative_ttl=300, symbol_check_interval=60,
+                 symbol_cache_dir=None, symbol_cache_flush_interval=5.0,
+                 quote_cache=False, quote_poll_interval=0.2, quote_max_age=1.0,
+                 symbol_meta_refresh=30.0, symbol_meta_max_age=120.0, watchlist=(),
+                 pretrade_validation=True, pretrade_clamp_stops=False, deviation=20, magic=123456,
+                 retry_attempts=3, retry_budget=0.3):
         self.account = account
         self.password = password
         self.server = server
         self.path = path
         self.connected = False
-        self.symbol_cache = {}  # Cache to speed up repeated lookups
+        self.executor = None  # MT5Executor that owns mt5.* calls, set by the server before connect()
+        self.supervisor = None  # ConnectionSupervisor watching this terminal, set by the server
+        # Cache to speed up repeated lookups
+        self.symbol_cache = SymbolCache(
+            max_size=symbol_cache_size,
+            ttl=symbol_cache_ttl,
+            negative_ttl=symbol_cache_negative_ttl,
+        )
         self.broker_symbols = []  # Cache broker symbols list
+        self.symbol_index = None  # Lookup structures built from broker_symbols
+        self.symbol_check_interval = symbol_check_interval
+        self._symbols_total = None  # mt5.symbols_total() when broker_symbols was cached
+        self._symbols_checked_at = 0.0
+        # Mappings persisted by a previous run, validated lazily on first use
+        self.symbol_store = (
+            SymbolCacheStore(symbol_cache_dir, server, account, symbol_cache_flush_interval)
+            if symbol_cache_dir else None
+        )
+        self._warm_mappings = {}
+        # Filling mode, rounding and request templates per symbol
+        self.execution_profiles = ExecutionProfiles(self._symbol_info, deviation=deviation, magic=magic)
+        self.close_engine = BulkCloseEngine(self, magic=magic)
+        # Opt-in background quotes for actively traded symbols
+        self.quote_cache = (
+            QuoteCache(self._poll_tick, poll_interval=quote_poll_interval, max_age=quote_max_age)
+            if quote_cache else None
+        )
+        # Tradeability metadata for verify_symbol, refreshed in the background
+        self.symbol_meta = (
+            SymbolMetaCache(self._poll_symbol_info, refresh_interval=symbol_meta_refresh, max_age=symbol_meta_max_age)
+            if symbol_meta_refresh else None
+        )
+        # TradingView symbols selected into Market Watch at connect
+        self.watchlist = list(watchlist)
+        # Check volume, prices and stops locally before order_send
+        self.pretrade_validation = pretrade_validation
+        self.pretrade_clamp_stops = pretrade_clamp_stops
+        # Requoted market orders are re-priced and sent again within these bounds
+        self.retry_policy = RetryPolicy(max_attempts=retry_attempts, budget=retry_budget)
+
+    @classmethod
+    def from_config(cls, config, account=None, password=None, server=None, path=None):
+        """Build a handler from Config, optionally overriding the account credentials"""
+        return cls(
+            account=config.MT5_ACCOUNT if account is None else account,
+            password=config.MT5_PASSWORD if password is None else password,
+            server=config.MT5_SERVER if server is None else server,
+            path=config.MT5_PATH if path is None else path,
+            symbol_cache_size=config.SYMBOL_CACHE_SIZE,
+            symbol_cache_ttl=config.SYMBOL_CACHE_TTL,
+            symbol_cache_negative_ttl=config.SYMBOL_CACHE_NEGATIVE_TTL,
+            symbol_check_interval=config.SYMBOL_CHECK_INTERVAL,
+            symbol_cache_dir=config.SYMBOL_CACHE_DIR,
+            symbol_cache_flush_interval=config.SYMBOL_CACHE_FLUSH_INTERVAL,
+            quote_cache=config.QUOTE_CACHE_ENABLED,
+            quote_poll_interval=config.QUOTE_POLL_INTERVAL,
+            quote_max_age=config.QUOTE_MAX_AGE,
+            symbol_meta_refresh=config.SYMBOL_META_REFRESH,
+            symbol_meta_max_age=config.SYMBOL_META_MAX_AGE,
+            watchlist=config.MT5_WATCHLIST,
+            pretrade_validation=config.PRETRADE_VALIDATION,
+            pretrade_clamp_stops=config.PRETRADE_STOPS_MODE == 'clamp',
+            deviation=config.MT5_DEVIATION,
+            magic=config.MT5_MAGIC,
+            retry_attempts=config.ORDER_RETRY_ATTEMPTS,
+            retry_budget=config.ORDER_RETRY_BUDGET_MS / 1000,
+        )
 
     # ---------------- Colored Logging Methods ----------------
-    def log_success(self, message):
+    # Colors are attached to the record and only applied by the console sink
+    def log_success(self, message, *args):
         """Log success messages in GREEN"""
-        colored_message = f"{Colors.GREEN}{message}{Colors.RESET}"
-        logger.info(colored_message)
+        logger.info(message, *args, extra={'color': Colors.GREEN})
         
-    def log_health_check(self, message):
+    def log_health_check(self, message, *args):
         """Log health check messages in ORANGE"""
-        colored_message = f"{Colors.ORANGE}{message}{Colors.RESET}"
-        logger.info(colored_message)
+        logger.info(message, *args, extra={'color': Colors.ORANGE})
         
-    def log_error(self, message):
+    def log_error(self, message, *args):
         """Log error messages in RED"""
-        colored_message = f"{Colors.RED}{message}{Colors.RESET}"
-        logger.error(colored_message)
+        logger.error(message, *args, extra={'color': Colors.RED})
         
-    def log_warning(self, message):
+    def log_warning(self, message, *args):
         """Log warning messages in YELLOW"""
-        colored_message = f"{Colors.YELLOW}{message}{Colors.RESET}"
-        logger.warning(colored_message)
+        logger.warning(message, *args, extra={'color': Colors.YELLOW})
 
     # ---------------- MT5 Connection ----------------
     def connect(self):
         """Connect to MT5 using provided credentials"""
         try:
             if not mt5.initialize(self.path):
-                self.log_error(f"Failed to initialize MT5: {mt5.last_error()}")
+                self.log_error("Failed to initialize MT5: %s", mt5.last_error())
                 return False
 
             if not mt5.login(self.account, self.password, self.server):
-                self.log_error(f"Failed to login to MT5: {mt5.last_error()}")
+                self.log_error("Failed to login to MT5: %s", mt5.last_error())
                 return False
 
             self.connected = True
             # Cache broker symbols on connection
             self._cache_broker_symbols()
+            self._load_symbol_store()
+            self.prewarm_watchlist()
+            if self.executor is not None:
+                if self.quote_cache:
+                    self.quote_cache.start()
+                if self.symbol_meta:
+                    self.symbol_meta.start()
+            elif self.quote_cache or self.symbol_meta:
+                # Pollers would call mt5.* alongside the caller's thread; the caches
+                # still fill and expire on demand without them
+                logger.info("MT5_HANDLER: No executor, background quote and symbol polling disabled")
             self.log_success("SUCCESS: Connected to MT5")
             return True
 
         except Exception as e:
-            self.log_error(f"Error connecting to MT5: {e}")
+            self.log_error("Error connecting to MT5: %s", e)
+            return False
+
+    def reconnect(self):
+        """Re-initialize the terminal and log in again, keeping the symbol and mapping caches"""
+        self.connected = False
+        try:
+            mt5.shutdown()
+            if not mt5.initialize(self.path):
+                self.log_error("RECONNECT_ERROR: Failed to initialize MT5: %s", mt5.last_error())
+                return False
+
+            if not mt5.login(self.account, self.password, self.server):
+                self.log_error("RECONNECT_ERROR: Failed to login to MT5: %s", mt5.last_error())
+                return False
+
+            self.resync_symbols()
+            # A restarted terminal may have lost its Market Watch
+            self.prewarm_watchlist()
+            self.connected = True
+            self.log_success("SUCCESS: Reconnected to MT5")
+            return True
+
+        except Exception as e:
+            self.log_error("RECONNECT_ERROR: %s", e)
             return False
 
+    def heartbeat(self):
+        """Probe the terminal and account; None when healthy, otherwise the reason it is not"""
+        terminal = mt5.terminal_info()
+        if terminal is None:
+            return f"terminal_info failed: {mt5.last_error()}"
+        if not terminal.connected:
+            return "terminal is not connected to the trade server"
+
+        account = mt5.account_info()
+        if account is None:
+            return f"account_info failed: {mt5.last_error()}"
+        if self.account and account.login != self.account:
+            return f"logged in to account {account.login}, expected {self.account}"
+        return None
+
     def disconnect(self):
         """Disconnect from MT5"""
         mt5.shutdown()
         self.connected = False
+        if self.symbol_store:
+            self.symbol_store.stop()
+        if self.quote_cache:
+            self.quote_cache.stop()
+        if self.symbol_meta:
+            self.symbol_meta.stop()
+        self._warm_mappings = {}
+        self.execution_profiles.clear()
         self.broker_symbols = []
+        self.symbol_index = None
+        self._symbols_total = None
+        self.symbol_cache.clear()
         logger.info("DISCONNECTED: MT5 connection closed")
 
     def _cache_broker_symbols(self):
         """Cache all available broker symbols"""
         try:
-            symbols = mt5.symbols_get()
-            self.broker_symbols = [s.name for s in symbols] if symbols else []
-            logger.info(f"SYMBOL_CACHE: Cached {len(self.broker_symbols)} broker symbols")
+            self._set_broker_symbols(mt5.symbols_get() or [])
+            logger.info("SYMBOL_CACHE: Cached %s broker symbols", len(self.broker_symbols))
         except Exception as e:
-            self.log_error(f"SYMBOL_CACHE_ERROR: Failed to cache symbols - {e}")
+            self.log_error("SYMBOL_CACHE_ERROR: Failed to cache symbols - %s", e)
             self.broker_symbols = []
+            self.symbol_index = None
+            self._symbols_total = None
+
+    def _set_broker_symbols(self, symbols):
+        """Replace the cached broker symbols and rebuild their lookup index"""
+        self._symbols_total = len(symbols)
+        self._symbols_checked_at = time.monotonic()
+        self.broker_symbols = [s.name for s in symbols]
+        self.symbol_index = SymbolIndex(
+            self.broker_symbols,
+            self.normalize,
+            descriptions=[getattr(s, 'description', '') for s in symbols],
+        )
+
+    def resync_symbols(self, total=None):
+        """
+        Bring the cached broker symbols up to date without starting over.
+
+        Nothing is fetched while the broker's symbol count is unchanged, so a
+        rename that keeps the count is only picked up after a reconnect with
+        a different count or a restart. When the count changed, the new list
+        is diffed against the cached one: the index absorbs the additions and
+        removals incrementally (see SymbolIndex.with_changes), and only
+        affected mappings are dropped - negative entries, mappings to removed
+        symbols and keys an added symbol now matches exactly, ignoring case or
+        once normalized. MT5 has no delta call, so the list itself is still
+        one symbols_get().
+        """
+        if not self.broker_symbols:
+            self._cache_broker_symbols()
+            return
+
+        total = mt5.symbols_total() if total is None else total
+        self._symbols_checked_at = time.monotonic()
+        if not total or total == self._symbols_total:
+            return
+
+        symbols = mt5.symbols_get()
+        if symbols is None:
+            self.log_error("SYMBOL_CACHE_ERROR: Failed to re-sync symbols - %s", mt5.last_error())
+            return
+
+        self._symbols_total = len(symbols)
+        known = self.symbol_index.exact
+        current = {s.name for s in symbols}
+        added = [s for s in symbols if s.name not in known]
+        removed = set(self.broker_symbols) - current
+        if not added and not removed:
+            return
+
+        self.broker_symbols = [name for name in self.broker_symbols if name not in removed]
+        self.broker_symbols.extend(s.name for s in added)
+        self.symbol_index = self.symbol_index.with_changes(
+            [(s.name, getattr(s, 'description', '')) for s in added], removed)
+
+        added_names = {s.name for s in added}
+        added_upper = {name.upper() for name in added_names}
+        added_normalized = {self.normalize(name) for name in added_names}
+
+        def shadowed(key):
+            return key in added_names or key.upper() in added_upper or self.normalize(key) in added_normalized
+
+        dropped = self.symbol_cache.invalidate(removed, stale_key=shadowed if added else None)
+        # Persisted mappings are tried before every strategy, so they go too
+        for key in dropped + [key for key in self._warm_mappings if added and shadowed(key)]:
+            self._warm_mappings.pop(key, None)
+            if self.symbol_store:
+                self.symbol_store.discard(key)
+        logger.info("SYMBOL_CACHE: Re-synced broker symbols, %s added, %s removed, %s cached mappings dropped",
+                    len(added), len(removed), len(dropped))
+
+    def _load_symbol_store(self):
+        """Load persisted mappings for this server/account and start batched saving"""
+        if not self.symbol_store:
+            return
+        self._warm_mappings = self.symbol_store.load()
+        self.symbol_store.start()
+        logger.info("SYMBOL_CACHE: Loaded %s persisted mappings from %s", len(self._warm_mappings), self.symbol_store.path)
+
+    def _cache_mapping(self, symbol, mapped):
+        """Cache a resolved mapping and queue it for persistence"""
+        self._warm_mappings.pop(symbol, None)
+        self.symbol_cache.put(symbol, mapped)
+        if self.symbol_store:
+            self.symbol_store.record(symbol, mapped)
+
+    def _warm_mapping(self, symbol):
+        """Persisted mapping for symbol if it still names a broker symbol"""
+        mapped = self._warm_mappings.pop(symbol, None)
+        if mapped is None:
+            return None
+        if mapped in self.symbol_index:
+            self.symbol_cache.put(symbol, mapped)
+            return mapped
+        self.symbol_store.discard(symbol)
+        return None
+
+    def _check_symbols_changed(self):
+        """Re-sync broker symbols and affected mappings when the broker's symbol count changes"""
+        if not self.symbol_check_interval or self._symbols_total is None:
+            return
+        now = time.monotonic()
+        if now - self._symbols_checked_at < self.symbol_check_interval:
+            return
+        self._symbols_checked_at = now
+
+        try:
+            total = mt5.symbols_total()
+        except Exception as e:
+            self.log_error("SYMBOL_CACHE_ERROR: Failed to check symbol count - %s", e)
+            return
+
+        if total and total != self._symbols_total:
+            logger.info("SYMBOL_CACHE: Broker symbol count changed %s -> %s, refreshing", self._symbols_total, total)
+            self.resync_symbols(total)
 
     # ---------------- Enhanced Symbol Mapping ----------------
     def map_symbol(self, symbol: str) -> str:
@@ -99,84 +371,103 @@ class MT5Handler:
             self.log_error("SYMBOL_MAP_ERROR: Empty symbol provided")
             return symbol
 
+        started = time.perf_counter()
         symbol = symbol.strip()
-        logger.info(f"SYMBOL_MAPPING: '{symbol}'")
+        logger.info("SYMBOL_MAPPING: '%s'", symbol)
         
+        self._check_symbols_changed()
+
         # Check cache first
-        if symbol in self.symbol_cache:
-            cached_symbol = self.symbol_cache[symbol]
-            logger.info(f"RESULT: Using cached '{symbol}' -> '{cached_symbol}'")
+        cached_symbol = self.symbol_cache.get(symbol)
+        if cached_symbol is not None:
+            logger.info("RESULT: Using cached '%s' -> '%s'", symbol, cached_symbol)
+            MAP_SYMBOL_CACHE_HIT_SECONDS.observe(time.perf_counter() - started)
             return cached_symbol
 
+        mapped, strategy = self._resolve_symbol(symbol)
+        MAP_SYMBOL_SECONDS.labels('miss', strategy).observe(time.perf_counter() - started)
+        return mapped
+
+    def _resolve_symbol(self, symbol: str):
+        """Run the mapping strategies for a cache miss; returns (mapped symbol, winning strategy)"""
         # Refresh broker symbols if empty
         if not self.broker_symbols:
             self._cache_broker_symbols()
 
         if not self.broker_symbols:
             self.log_warning("SYMBOL_MAP_WARNING: No broker symbols available")
-            self.symbol_cache[symbol] = symbol
-            return symbol
+            self.symbol_cache.put(symbol, symbol, negative=True)
+            return symbol, 'unavailable'
+
+        index = self.symbol_index
 
         # Strategy 1: Exact match
-        if symbol in self.broker_symbols:
-            self.symbol_cache[symbol] = symbol
-            logger.info(f"RESULT: Exact match '{symbol}' -> '{symbol}'")
-            return symbol
+        if symbol in index:
+            self._cache_mapping(symbol, symbol)
+            logger.info("RESULT: Exact match '%s' -> '%s'", symbol, symbol)
+            return symbol, 'exact'
 
         # Strategy 2: Case-insensitive match
-        for s in self.broker_symbols:
-            if s.upper() == symbol.upper():
-                self.symbol_cache[symbol] = s
-                logger.info(f"RESULT: Case match '{symbol}' -> '{s}'")
-                return s
+        s = index.case_match(symbol)
+        if s is not None:
+            self._cache_mapping(symbol, s)
+            logger.info("RESULT: Case match '%s' -> '%s'", symbol, s)
+            return s, 'case'
 
         # Strategy 3: Normalized match (remove common suffixes/prefixes)
         normalized_symbol = self.normalize(symbol)
-        for s in self.broker_symbols:
-            if self.normalize(s) == normalized_symbol:
-                self.symbol_cache[symbol] = s
-                logger.info(f"RESULT: Normalized match '{symbol}' -> '{s}' (normalized: '{normalized_symbol}')")
-                return s
+        s = index.normalized_match(normalized_symbol)
+        if s is not None:
+            self._cache_mapping(symbol, s)
+            logger.info("RESULT: Normalized match '%s' -> '%s' (normalized: '%s')", symbol, s, normalized_symbol)
+            return s, 'normalized'
+
+        # Warm start: mapping resolved by a previous run, behind the direct lookups
+        # so a broker symbol that now matches exactly is never shadowed by it
+        s = self._warm_mapping(symbol)
+        if s is not None:
+            logger.info("RESULT: Persisted match '%s' -> '%s'", symbol, s)
+            return s, 'persisted'
 
         # Strategy 4: Startswith match (handles suffixes like XAUUSD -> XAUUSDm)
-        for s in self.broker_symbols:
-            if s.upper().startswith(symbol.upper()):
-                self.symbol_cache[symbol] = s
-                logger.info(f"RESULT: Prefix match '{symbol}' -> '{s}'")
-                return s
+        s = index.prefix_match(symbol)
+        if s is not None:
+            self._cache_mapping(symbol, s)
+            logger.info("RESULT: Prefix match '%s' -> '%s'", symbol, s)
+            return s, 'prefix'
 
         # Strategy 5: Contains match (e.g. BTCUSD -> BTCUSD.pro)
-        for s in self.broker_symbols:
-            if symbol.upper() in s.upper():
-                self.symbol_cache[symbol] = s
-                logger.info(f"RESULT: Contains match '{symbol}' -> '{s}'")
-                return s
+        s = index.contains_match(symbol)
+        if s is not None:
+            self._cache_mapping(symbol, s)
+            logger.info("RESULT: Contains match '%s' -> '%s'", symbol, s)
+            return s, 'contains'
 
         # Strategy 6: Fuzzy matching (similarity-based)
-        fuzzy_match = self.fuzzy_map(symbol, self.broker_symbols)
+        fuzzy_match = self.fuzzy_map(symbol)
         if fuzzy_match:
-            self.symbol_cache[symbol] = fuzzy_match
-            logger.info(f"RESULT: Fuzzy match '{symbol}' -> '{fuzzy_match}'")
-            return fuzzy_match
+            self._cache_mapping(symbol, fuzzy_match)
+            logger.info("RESULT: Fuzzy match '%s' -> '%s'", symbol, fuzzy_match)
+            return fuzzy_match, 'fuzzy'
 
         # Strategy 7: Description-based matching
         desc_match = self.description_match(symbol)
         if desc_match:
-            self.symbol_cache[symbol] = desc_match
-            logger.info(f"RESULT: Description match '{symbol}' -> '{desc_match}'")
-            return desc_match
+            self._cache_mapping(symbol, desc_match)
+            logger.info("RESULT: Description match '%s' -> '%s'", symbol, desc_match)
+            return desc_match, 'description'
 
         # Strategy 8: Common symbol transformations
         transformed_match = self.transform_symbol(symbol)
-        if transformed_match and transformed_match in self.broker_symbols:
-            self.symbol_cache[symbol] = transformed_match
-            logger.info(f"RESULT: Transform match '{symbol}' -> '{transformed_match}'")
-            return transformed_match
+        if transformed_match and transformed_match in index:
+            self._cache_mapping(symbol, transformed_match)
+            logger.info("RESULT: Transform match '%s' -> '%s'", symbol, transformed_match)
+            return transformed_match, 'transform'
 
         # Strategy 9: Fallback - use original symbol
-        self.log_warning(f"RESULT: No mapping found for '{symbol}', using as-is")
-        self.symbol_cache[symbol] = symbol
-        return symbol
+        self.log_warning("RESULT: No mapping found for '%s', using as-is", symbol)
+        self.symbol_cache.put(symbol, symbol, negative=True)
+        return symbol, 'none'
 
     def normalize(self, s: str) -> str:
         """Remove common suffixes/prefixes and normalize the symbol"""
@@ -207,40 +498,33 @@ class MT5Handler:
         
         return normalized
 
-    def fuzzy_map(self, symbol: str, broker_symbols: list) -> str:
+    def fuzzy_map(self, symbol: str, broker_symbols: list = None) -> str:
         """Use fuzzy matching to find the closest symbol"""
         try:
+            # Cached broker symbols go through the trigram index
+            if broker_symbols is None or broker_symbols is self.broker_symbols:
+                if self.symbol_index is None:
+                    return None
+                return self.symbol_index.fuzzy_match(symbol, n=3, cutoff=0.6)
+
             # Get close matches with different cutoff values
-            matches = get_close_matches(
-                symbol.upper(), 
-                [s.upper() for s in broker_symbols], 
-                n=3, 
-                cutoff=0.6
-            )
-            
-            if matches:
-                # Find the actual symbol name from broker_symbols
-                for match in matches:
-                    for s in broker_symbols:
-                        if s.upper() == match:
-                            return s
-            return None
+            originals = {}
+            for s in broker_symbols:
+                originals.setdefault(s.upper(), s)
+            matches = get_close_matches(symbol.upper(), list(originals), n=3, cutoff=0.6)
+
+            # Find the actual symbol name from broker_symbols
+            return originals[matches[0]] if matches else None
         except Exception as e:
-            self.log_error(f"FUZZY_MATCH_ERROR: {e}")
+            self.log_error("FUZZY_MATCH_ERROR: %s", e)
             return None
 
     def description_match(self, symbol: str) -> str:
-        """Try to match symbol using MT5 symbol descriptions"""
+        """Try to match symbol using the cached MT5 symbol descriptions"""
         try:
-            for s in self.broker_symbols:
-                info = mt5.symbol_info(s)
-                if info and hasattr(info, 'description') and info.description:
-                    desc = info.description.upper()
-                    if symbol.upper() in desc or desc in symbol.upper():
-                        return s
-            return None
+            return self.symbol_index.description_match(symbol)
         except Exception as e:
-            self.log_error(f"DESCRIPTION_MATCH_ERROR: {e}")
+            self.log_error("DESCRIPTION_MATCH_ERROR: %s", e)
             return None
 
     def transform_symbol(self, symbol: str) -> str:
@@ -267,7 +551,7 @@ class MT5Handler:
         # Check if we have predefined transformations
         if symbol.upper() in transformations:
             for variant in transformations[symbol.upper()]:
-                if variant in self.broker_symbols:
+                if variant in self.symbol_index:
                     return variant
         
         # Try common variations
@@ -283,7 +567,7 @@ class MT5Handler:
         ]
         
         for variant in variations:
-            if variant in self.broker_symbols:
+            if variant in self.symbol_index:
                 return variant
         
         return None
@@ -309,178 +593,319 @@ class MT5Handler:
                 }
             return None
         except Exception as e:
-            self.log_error(f"SYMBOL_INFO_ERROR: {e}")
+            self.log_error("SYMBOL_INFO_ERROR: %s", e)
             return None
 
+    def _background_call(self, fn, *args):
+        """MT5 call made by a background thread, serialized through the executor behind all trading work"""
+        if self.executor is not None:
+            return self.executor.call(fn, *args, timeout=5.0, lane='background')
+        return fn(*args)
+
+    def _poll_tick(self, symbol: str):
+        """Tick fetch used by the quote poller"""
+        return self._background_call(mt5.symbol_info_tick, symbol)
+
+    def _poll_symbol_info(self, symbol: str):
+        """symbol_info fetch used by the metadata refresher; None while disconnected"""
+        if not self.connected:
+            return None
+        return self._background_call(mt5.symbol_info, symbol)
+
+    def prewarm_watchlist(self):
+        """Map every watchlist symbol and select it into Market Watch ahead of the first order"""
+        if not self.watchlist:
+            return
+        ready, selected = 0, 0
+        for symbol in self.watchlist:
+            mapped = self.map_symbol(symbol)
+            info = mt5.symbol_info(mapped)
+            if info is None:
+                self.log_warning("MARKET_WATCH_WARNING: Watchlist symbol '%s' not found", symbol)
+                continue
+            if not info.visible:
+                if not mt5.symbol_select(mapped, True):
+                    self.log_warning("MARKET_WATCH_WARNING: Could not add %s to Market Watch", mapped)
+                    continue
+                selected += 1
+                info = mt5.symbol_info(mapped) or info
+            if self.symbol_meta:
+                self.symbol_meta.put(mapped, info)
+            ready += 1
+        logger.info("MARKET_WATCH: %s/%s watchlist symbols ready (%s newly selected)", ready, len(self.watchlist), selected)
+
+    def get_tick(self, symbol: str):
+        """Latest tick for symbol, from the quote cache when it is fresh enough"""
+        started = time.perf_counter()
+        if self.quote_cache is None:
+            tick = mt5.symbol_info_tick(symbol)
+        else:
+            self.quote_cache.track(symbol)
+            tick = self.quote_cache.get(symbol)
+            if tick is None:
+                tick = mt5.symbol_info_tick(symbol)
+                self.quote_cache.update(symbol, tick)
+        SYMBOL_TICK_SECONDS.observe(time.perf_counter() - started)
+        return tick
+
     # ---------------- Trading with Colored Output ----------------
     def send_order(self, signal: dict):
-        """Send order to MT5 based on TradingView signal"""
+        """Send order to MT5 based on TradingView signal; returns an OrderResult"""
         if not self.connected:
             self.log_error("TRADE_ERROR: MT5 is not connected")
-            return False
+            return OrderResult.failed("MT5 is not connected")
 
         try:
-            logger.info("NEW WEBHOOK RECEIVED")
-            logger.info("=" * 60)
-            
-            # Log the incoming webhook data
-            logger.info(f"{signal}")
-            
-            action = signal.get("action")
-            original_symbol = signal.get("symbol")
-            volume = float(signal.get("volume", 0.1))
-            price = float(signal.get("price", 0.0))
-            sl = float(signal.get("stop_loss", 0.0))
-            tp = float(signal.get("take_profit", 0.0))
+            # One line per order; formatted later by the log listener, not here
+            logger.info("NEW ORDER: %s", signal)
+
+            # Journal replays hand in plain dicts; the server passes parsed Signals
+            if not isinstance(signal, Signal):
+                signal = parse_signal(signal)
+
+            action, _, original_symbol, volume, price, sl, tp = signal
 
             # Use enhanced symbol mapping
             mapped_symbol = self.map_symbol(original_symbol)
             
             # Verify symbol exists and is tradeable
-            if not self.verify_symbol(mapped_symbol):
-                self.log_error(f"SYMBOL_ERROR: Symbol '{mapped_symbol}' is not tradeable")
-                return False
+            info = self.tradeable_info(mapped_symbol)
+            if info is None:
+                self.log_error("SYMBOL_ERROR: Symbol '%s' is not tradeable", mapped_symbol)
+                return OrderResult.failed(f"Symbol '{mapped_symbol}' is not tradeable", symbol=mapped_symbol)
 
             # Convert action to MT5 order type
-            order_type = None
-            if action == "BUY" or action == "Long":
-                order_type = mt5.ORDER_TYPE_BUY
-            elif action == "SELL" or action == "Short":
-                order_type = mt5.ORDER_TYPE_SELL
-            elif action == "BUY_LIMIT":
-                order_type = mt5.ORDER_TYPE_BUY_LIMIT
-            elif action == "SELL_LIMIT":
-                order_type = mt5.ORDER_TYPE_SELL_LIMIT
-            elif action == "BUY_STOP":
-                order_type = mt5.ORDER_TYPE_BUY_STOP
-            elif action == "SELL_STOP":
-                order_type = mt5.ORDER_TYPE_SELL_STOP
-            else:
-                self.log_error(f"UNSUPPORTED ACTION: {action}")
-                return False
-
-            # Get current market price if not provided
-            if price <= 0:
-                tick = mt5.symbol_info_tick(mapped_symbol)
+            order_type = ORDER_TYPES.get(action)
+            if order_type is None:
+                self.log_error("UNSUPPORTED ACTION: %s", action)
+                return OrderResult.failed(f"Unsupported action: {action}", symbol=mapped_symbol)
+
+            # Market orders are priced from the current tick; pending orders need it for the local checks
+            tick = None
+            if signal.is_market or self.pretrade_validation:
+                tick = self.get_tick(mapped_symbol)
                 if tick is None:
-                    self.log_error(f"PRICE ERROR: Cannot get price for {mapped_symbol}")
-                    return False
+                    self.log_error("PRICE ERROR: Cannot get price for %s", mapped_symbol)
+                    return OrderResult.failed(f"Cannot get price for {mapped_symbol}", symbol=mapped_symbol)
                 
+            if signal.is_market:
                 if order_type == mt5.ORDER_TYPE_BUY:
                     price = tick.ask
                 else:
                     price = tick.bid
 
-            # Build order request
-            request = {
-                "action": mt5.TRADE_ACTION_DEAL
-                if order_type in [mt5.ORDER_TYPE_BUY, mt5.ORDER_TYPE_SELL]
-                else mt5.TRADE_ACTION_PENDING,
-                "symbol": mapped_symbol,
-                "volume": volume,
-                "type": order_type,
-                "price": price,
-                "sl": sl,
-                "tp": tp,
-                "deviation": 20,
-                "magic": 123456,
-                "comment": "TradingView Auto-Signal",
-                "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_FOK,
-            }
-
-            logger.info("SENDING ORDER TO MT5...")
+            # Volume, prices and stops against the symbol's rules, without a round trip
+            if self.pretrade_validation:
+                try:
+                    checked = check_order(action, signal.is_market, volume, price, sl, tp, info, tick.bid, tick.ask,
+                                          clamp_stops=self.pretrade_clamp_stops)
+                except PreTradeError as e:
+                    PRETRADE_REJECTIONS.labels(e.reason).inc()
+                    self.log_error("PRETRADE_REJECTED: %s", e)
+                    return OrderResult.failed(str(e), symbol=mapped_symbol, volume=volume, price=price)
+                if checked.adjustments:
+                    self.log_warning("PRETRADE_ADJUSTED: %s %s", mapped_symbol, ', '.join(checked.adjustments))
+                volume, price, sl, tp = checked.volume, checked.price, checked.sl, checked.tp
+
+            # Build order request from the symbol's template
+            profile = self.execution_profiles.get(mapped_symbol, info)
+            request = profile.order(order_type, volume, price, sl, tp, pending=not signal.is_market)
+
+            logger.debug("SENDING ORDER TO MT5: %s", request)
             
-            result = mt5.order_send(request)
+            # Only market orders are re-priced and retried; a pending order's price is the signal's
+            result, attempts = self._order_send(request, retry=signal.is_market)
+            if signal.is_market:
+                ORDER_ATTEMPTS.observe(attempts)
+            if result is None:
+                self.log_error("ORDER FAILED (Error: %s)", mt5.last_error())
+                # No answer at all usually means the terminal went away: probe it now
+                if self.supervisor is not None:
+                    self.supervisor.check_now()
+                return OrderResult.failed(str(mt5.last_error()), symbol=mapped_symbol, volume=volume, price=price,
+                                          attempts=attempts)
 
             if result.retcode != mt5.TRADE_RETCODE_DONE:
-                self.log_error(f"ORDER FAILED (Error: {result.retcode}, {result.comment})")
-                return False
+                self.log_error("ORDER FAILED (Error: %s, %s)", result.retcode, result.comment)
+                if result.retcode == mt5.TRADE_RETCODE_INVALID_FILL:
+                    # The broker changed the symbol's filling modes: derive them again next time
+                    self.execution_profiles.discard(mapped_symbol)
+                    if self.symbol_meta:
+                        self.symbol_meta.discard(mapped_symbol)
+                if self.symbol_meta:
+                    if result.retcode == mt5.TRADE_RETCODE_MARKET_CLOSED:
+                        self.symbol_meta.mark_closed(mapped_symbol)
+                    elif result.retcode in (mt5.TRADE_RETCODE_TRADE_DISABLED, mt5.TRADE_RETCODE_CLOSE_ONLY):
+                        self.symbol_meta.discard(mapped_symbol)
+                return OrderResult.failed(
+                    f"Order rejected: {result.comment}", retcode=result.retcode, comment=result.comment,
+                    symbol=mapped_symbol, volume=volume, price=request["price"], attempts=attempts,
+                )
 
             # SUCCESS message in GREEN color
-            self.log_success(f"SUCCESS (Ticket: {result.order})")
-            logger.info("=" * 60)
+            self.log_success("SUCCESS (Ticket: %s)%s", result.order, f" after {attempts} attempts" if attempts > 1 else "")
+
+            fill = getattr(result, 'price', 0) or request["price"]
+            slippage = None
+            if signal.is_market and price:
+                # Against the price the order was first sent at; positive is worse for us
+                slippage = round((fill - price) / info.point * (1 if order_type == mt5.ORDER_TYPE_BUY else -1), 1)
+                ORDER_SLIPPAGE_POINTS.observe(slippage)
             
-            return True
+            return OrderResult(
+                True, retcode=result.retcode, ticket=result.order, comment=result.comment,
+                symbol=mapped_symbol, volume=getattr(result, 'volume', volume) or volume,
+                price=fill, attempts=attempts, slippage=slippage,
+            )
 
         except Exception as e:
-            self.log_error(f"EXCEPTION ERROR: {e}")
-            logger.info("=" * 60)
-            return False
+            self.log_error("EXCEPTION ERROR: %s", e)
+            return OrderResult.failed(str(e))
+
+    def _order_send(self, request, retry=False):
+        """
+        order_send, repeated while the retry policy allows it; returns (result, attempts).
+
+        Each retry re-prices the request from a fresh tick (never the quote
+        cache, which may still hold the price that was just refused).
+        """
+        started = time.perf_counter()
+        attempts = 0
+        while True:
+            attempts += 1
+            sent = time.perf_counter()
+            result = mt5.order_send(request)
+            ORDER_SEND_SECONDS.observe(time.perf_counter() - sent)
+            MT5_RETCODES.labels(result.retcode if result is not None else 'none').inc()
+            if not retry or result is None or not self.retry_policy.should_retry(result.retcode, attempts, started):
+                return result, attempts
+
+            symbol = request["symbol"]
+            tick = mt5.symbol_info_tick(symbol)
+            if tick is None:
+                return result, attempts
+            if self.quote_cache:
+                self.quote_cache.update(symbol, tick)
+            ORDER_RETRIES.labels(result.retcode).inc()
+            request["price"] = tick.ask if request["type"] == mt5.ORDER_TYPE_BUY else tick.bid
+            self.log_warning("ORDER_RETRY: %s (%s), resending %s at %s", result.retcode, result.comment, symbol,
+                             request["price"])
+
+    def execution_profile(self, symbol: str):
+        """ExecutionProfile for a broker symbol, or None if the terminal does not know it"""
+        return self.execution_profiles.get(symbol)
+
+    def _symbol_info(self, symbol):
+        """symbol_info from the metadata cache, else from the terminal"""
+        info = self.symbol_meta.get(symbol) if self.symbol_meta else None
+        return info if info is not None else mt5.symbol_info(symbol)
 
     def verify_symbol(self, symbol: str) -> bool:
         """Verify that a symbol exists and is tradeable"""
+        return self.tradeable_info(symbol) is not None
+
+    def tradeable_info(self, symbol: str):
+        """symbol_info of a tradeable symbol (cached when possible), or None if it cannot be traded"""
+        started = time.perf_counter()
         try:
-            info = mt5.symbol_info(symbol)
+            return self._verify_symbol(symbol)
+        finally:
+            VERIFY_SYMBOL_SECONDS.observe(time.perf_counter() - started)
+
+    def _verify_symbol(self, symbol: str):
+        try:
+            meta = self.symbol_meta
+            info = meta.get(symbol) if meta else None
             if info is None:
-                return False
+                info = mt5.symbol_info(symbol)
+                if info is None:
+                    return None
+                if meta:
+                    meta.put(symbol, info)
             
             # Check if symbol is visible in Market Watch
             if not info.visible:
                 # Try to make it visible
                 if not mt5.symbol_select(symbol, True):
-                    self.log_warning(f"SYMBOL_WARNING: Could not add {symbol} to Market Watch")
-                    return False
+                    self.log_warning("SYMBOL_WARNING: Could not add %s to Market Watch", symbol)
+                    return None
+                info = mt5.symbol_info(symbol) or info
+                if meta:
+                    meta.put(symbol, info)
+
+            if info.trade_mode in NO_ENTRY_TRADE_MODES:
+                self.log_warning("SYMBOL_WARNING: Trading %s is disabled or close-only", symbol)
+                return None
+
+            if meta and meta.is_closed(symbol):
+                self.log_warning("SYMBOL_WARNING: Market for %s is closed", symbol)
+                return None
             
-            return True
+            return info
         except Exception as e:
-            self.log_error(f"SYMBOL_VERIFY_ERROR: {e}")
-            return False
+            self.log_error("SYMBOL_VERIFY_ERROR: %s", e)
+            return None
 
     # ---------------- Utility ----------------
-    def close_positions(self, symbol=None):
-        """Close all open positions (or for one symbol)"""
+    def close_positions(self, symbol=None, volume=None):
+        """Close all open positions (or for one symbol); True if every close succeeded"""
+        report = self.bulk_close(symbol, volume)
+        return report is not None and report['success']
+
+    def bulk_close(self, symbol=None, volume=None):
+        """
+        Close positions through the bulk close engine.
+
+        volume=None closes everything, otherwise that volume is closed FIFO.
+        Returns the per-ticket report, or None if an exception occurred.
+        """
         try:
             # Map the symbol if provided
             if symbol:
                 symbol = self.map_symbol(symbol)
                 
-            logger.info(f"CLOSE_REQUEST: Closing positions for symbol '{symbol}'" if symbol else "CLOSE_REQUEST: Closing all positions")
-            
-            positions = mt5.positions_get(symbol=symbol)
-            if not positions:
-                logger.info("CLOSE_INFO: No positions to close")
-                return True
-
-            logger.info(f"CLOSE_INFO: Found {len(positions)} positions to close")
+            if symbol:
+                logger.info("CLOSE_REQUEST: Closing positions for symbol '%s'", symbol)
+            else:
+                logger.info("CLOSE_REQUEST: Closing all positions")
 
-            for pos in positions:
-                order_type = (
-                    mt5.ORDER_TYPE_SELL if pos.type == mt5.ORDER_TYPE_BUY else mt5.ORDER_TYPE_BUY
-                )
-                price = (
-                    mt5.symbol_info_tick(pos.symbol).bid
-                    if order_type == mt5.ORDER_TYPE_SELL
-                    else mt5.symbol_info_tick(pos.symbol).ask
-                )
+            report = self.close_engine.close(symbol, volume)
+            if not report['positions']:
+                logger.info("CLOSE_INFO: No positions to close")
+            else:
+                logger.info("CLOSE_INFO: %s/%s close orders succeeded for %s positions in %s ms", report['closed'], report['orders_sent'], report['positions'], report['wall_time_ms'])
+            return report
 
-                logger.info(f"CLOSE_SETUP: Position {pos.ticket} - Symbol={pos.symbol}, Volume={pos.volume}, Type={'BUY' if pos.type == 0 else 'SELL'}")
-
-                request = {
-                    "action": mt5.TRADE_ACTION_DEAL,
-                    "symbol": pos.symbol,
-                    "volume": pos.volume,
-                    "type": order_type,
-                    "position": pos.ticket,
-                    "price": price,
-                    "deviation": 20,
-                    "magic": 123456,
-                    "comment": "Auto-close position",
-                    "type_time": mt5.ORDER_TIME_GTC,
-                    "type_filling": mt5.ORDER_FILLING_FOK,
-                }
+        except Exception as e:
+            self.log_error("CLOSE_ERROR: Exception occurred - %s", e)
+            return None
 
-                result = mt5.order_send(request)
-                if result.retcode != mt5.TRADE_RETCODE_DONE:
-                    self.log_error(f"CLOSE_ERROR: Failed to close position {pos.ticket} - {result.comment}")
-                else:
-                    self.log_success(f"CLOSE_SUCCESS: Closed position {pos.ticket}")
+    def get_positions(self) -> list:
+        """Open positions as plain dicts"""
+        return self.position_snapshot() or []
 
-            return True
+    def position_snapshot(self):
+        """Open positions as plain dicts, or None when the terminal could not be asked"""
+        if not self.connected:
+            return None
+        positions = mt5.positions_get()
+        if positions is None:
+            return None
 
-        except Exception as e:
-            self.log_error(f"CLOSE_ERROR: Exception occurred - {e}")
-            return False
+        return [
+            {
+                "ticket": pos.ticket,
+                "symbol": pos.symbol,
+                "type": "BUY" if pos.type == 0 else "SELL",
+                "volume": pos.volume,
+                "profit": pos.profit,
+                "open_price": pos.price_open,
+                "sl": pos.sl,
+                "tp": pos.tp,
+                "magic": pos.magic,
+            }
+            for pos in positions
+        ]
 
     def clear_symbol_cache(self):
         """Clear the symbol mapping cache (useful for debugging)"""
@@ -492,5 +917,6 @@ class MT5Handler:
         return {
             'cached_mappings': len(self.symbol_cache),
             'broker_symbols_count': len(self.broker_symbols),
-            'cache_contents': dict(self.symbol_cache)
+            'cache_contents': dict(self.symbol_cache.items()),
+            **self.symbol_cache.stats(),
         }
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""
+Outcome of a single order sent through MT5Handler.send_order.
+
+OrderResult is truthy only when the order was accepted, so callers that
+treated send_order's old boolean return keep working unchanged.
+"""
+
+
+class OrderResult:
+    """Success flag plus the MT5 retcode, ticket and fill details of one order"""
+
+    __slots__ = ('success', 'retcode', 'ticket', 'comment', 'symbol', 'volume', 'price', 'error',
+                 'attempts', 'slippage')
+
+    def __init__(self, success, retcode=None, ticket=None, comment='', symbol=None,
+                 volume=None, price=None, error=None, attempts=None, slippage=None):
+        self.success = success
+        self.retcode = retcode
+        self.ticket = ticket
+        self.comment = comment
+        self.symbol = symbol
+        self.volume = volume
+        self.price = price
+        self.error = error
+        self.attempts = attempts  # order_send calls, including requote retries
+        self.slippage = slippage  # points between the first quoted and the fill price, positive = worse
+
+    @classmethod
+    def failed(cls, error, **fields):
+        """Order rejected before or by MT5"""
+        return cls(False, error=error, **fields)
+
+    def __bool__(self):
+        return bool(self.success)
+
+    def __repr__(self):
+        return (f"OrderResult(success={self.success}, retcode={self.retcode}, "
+                f"ticket={self.ticket}, symbol={self.symbol!r}, attempts={self.attempts}, error={self.error!r})")
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
@@ -0,0 +1,180 @@
+"""
+In-memory book of open positions for /positions.
+
+A background thread pulls the terminal's positions every interval and diffs
+them by ticket against the book. The version only moves when a ticket was
+opened or closed or one of its identifying fields changed (symbol, side,
+volume, open price, sl, tp, magic). Floating profit moves on nearly every
+sync, so it only moves the revision, which counts every change to the
+snapshot. Reads are served from the current snapshot without touching the
+terminal.
+
+Each representation gets an ETag covering everything in it: pages without
+profit are tagged with the version alone, so pollers that only care about
+the positions themselves get 304 Not Modified across profit updates, while
+pages with profit are tagged with the version and the revision.
+
+After an order or close the server calls touch() so the book re-syncs right
+away instead of waiting for the next interval.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Position fields that move the book's version; profit is deliberately not one of them
+IDENTITY_FIELDS = ('symbol', 'type', 'volume', 'open_price', 'sl', 'tp', 'magic')
+
+
+def format_etag(version, revision=None) -> str:
+    """Weak ETag for a page without profit (version only) or with it (version and revision)"""
+    return f'W/"{version}"' if revision is None else f'W/"{version}.{revision}"'
+
+
+def _identity(position) -> tuple:
+    return tuple(position.get(field) for field in IDENTITY_FIELDS)
+
+
+def page_positions(positions, symbol=None, magic=None, offset=0, limit=None, profit=True) -> dict:
+    """Filter positions by symbol (case-insensitive) and magic, then cut one page, optionally without profit"""
+    if symbol:
+        symbol = symbol.upper()
+        positions = [p for p in positions if p['symbol'].upper() == symbol]
+    if magic is not None:
+        positions = [p for p in positions if p['magic'] == magic]
+
+    page = positions[offset:offset + limit] if limit is not None else positions[offset:]
+    if not profit:
+        page = [{k: v for k, v in p.items() if k != 'profit'} for p in page]
+    return {"positions": list(page), "total": len(positions), "offset": offset, "limit": limit}
+
+
+class PositionBook:
+    """Ticket-keyed snapshot of open positions kept current by a sync thread"""
+
+    def __init__(self, fetch_positions, interval=1.0):
+        self.fetch_positions = fetch_positions
+        self.interval = interval
+
+        self._positions = {}  # ticket -> position dict
+        self._view = (0, 0, ())  # (version, revision, positions ordered by ticket), swapped as one on change
+        self.synced_at = None  # wall time of the last successful sync
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.syncs = 0
+        self.sync_errors = 0
+        self.opened = 0
+        self.closed = 0
+        self.changed = 0
+
+    @property
+    def version(self) -> int:
+        return self._view[0]
+
+    @property
+    def revision(self) -> int:
+        return self._view[1]
+
+    def etag(self, profit=True) -> str:
+        """ETag of the current snapshot's pages with or without profit"""
+        version, revision, _ = self._view
+        return format_etag(version, revision if profit else None)
+
+    # ---------------- Lifecycle ----------------
+    def start(self):
+        """Start the sync thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='position-book', daemon=True)
+        self._thread.start()
+        logger.info("POSITION_BOOK: Syncing every %ss", self.interval)
+
+    def stop(self):
+        """Stop the sync thread"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def touch(self):
+        """Re-sync as soon as possible (positions were just changed by us)"""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sync()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    # ---------------- Syncing ----------------
+    def sync(self) -> bool:
+        """Fetch positions once and apply them; False when the terminal could not be read"""
+        try:
+            positions = self.fetch_positions()
+        except Exception as e:
+            positions = None
+            logger.warning("POSITION_BOOK_WARNING: Sync failed - %s", e)
+        if positions is None:
+            self.sync_errors += 1
+            return False
+        self.apply(positions)
+        return True
+
+    def apply(self, positions):
+        """Diff a full position list against the book by ticket"""
+        incoming = {p['ticket']: p for p in positions}
+        with self._lock:
+            current = self._positions
+            opened = incoming.keys() - current.keys()
+            closed = current.keys() - incoming.keys()
+            common = incoming.keys() & current.keys()
+            changed = [t for t in common if _identity(incoming[t]) != _identity(current[t])]
+            repriced = not changed and any(incoming[t] != current[t] for t in common)
+
+            if opened or closed or changed or repriced:
+                version, revision, _ = self._view
+                version = version + 1 if opened or closed or changed else version
+                self._positions = incoming
+                self._view = (version, revision + 1, tuple(incoming[t] for t in sorted(incoming)))
+                self.opened += len(opened)
+                self.closed += len(closed)
+                self.changed += len(changed)
+            self.synced_at = time.time()
+            self.syncs += 1
+
+    # ---------------- Reading ----------------
+    def query(self, symbol=None, magic=None, offset=0, limit=None, profit=True) -> tuple:
+        """Filtered page of the current snapshot and the ETag matching it"""
+        version, revision, snapshot = self._view
+        page = page_positions(snapshot, symbol, magic, offset, limit, profit)
+        page["version"] = version
+        if profit:
+            page["revision"] = revision
+        return page, format_etag(version, revision if profit else None)
+
+    @property
+    def age(self):
+        """Seconds since the last successful sync, or None before the first"""
+        synced_at = self.synced_at
+        return round(time.time() - synced_at, 3) if synced_at else None
+
+    def stats(self) -> dict:
+        """Book size and sync counters"""
+        return {
+            'positions': len(self._view[2]),
+            'version': self.version,
+            'revision': self.revision,
+            'age_s': self.age,
+            'syncs': self.syncs,
+            'sync_errors': self.sync_errors,
+            'opened': self.opened,
+            'closed': self.closed,
+            'changed': self.changed,
+        }
@@ -0,0 +1,137 @@
+"""
+Local pre-trade checks against the symbol's trading rules.
+
+Orders that break volume_min/volume_step/volume_max or trade_stops_level
+are otherwise only discovered after a full order_send round
+trip fails with INVALID_VOLUME (10014), INVALID_STOPS (10016) or
+INVALID_PRICE (10015). check_order applies the same rules locally, from the
+cached symbol_info, in microseconds:
+
+- volume is rounded down to volume_step and must stay within min/max
+- prices, SL and TP are rounded to the tick size and digits
+- pending prices must be at least the stops level away from the market
+- SL/TP must be on the right side of the reference price (bid for buys and
+  ask for sells on market orders, the order price on pending orders) and at
+  least the stops level away; too-close stops are rejected, or moved out to
+  the minimum distance when clamp_stops is set
+
+The freeze level is not applied: it limits modifying orders and positions
+that already exist, not placing new ones.
+"""
+
+import math
+from collections import namedtuple
+
+# symbol_info.trade_mode values (same numbers as the MetaTrader5 constants)
+TRADE_MODE_LONGONLY = 1
+TRADE_MODE_SHORTONLY = 2
+
+# Tolerance for float noise when comparing against the step or a price level
+EPSILON = 1e-9
+
+CheckedOrder = namedtuple('CheckedOrder', ['volume', 'price', 'sl', 'tp', 'adjustments'])
+
+
+class PreTradeError(ValueError):
+    """Order breaks the symbol's trading rules; the message is safe to return to the client"""
+
+    def __init__(self, reason, message):
+        super().__init__(message)
+        self.reason = reason  # volume, price, stops or trade_mode (metrics label)
+
+
+def normalize_volume(volume: float, info) -> float:
+    """volume rounded down to the symbol's volume_step; raises PreTradeError outside min/max"""
+    step = info.volume_step
+    if step > 0:
+        volume = round(math.floor(volume / step + EPSILON) * step, 8)
+    if volume < info.volume_min - EPSILON:
+        raise PreTradeError('volume', f"Volume {volume} is below the minimum {info.volume_min} for {info.name}")
+    if info.volume_max and volume > info.volume_max + EPSILON:
+        raise PreTradeError('volume', f"Volume {volume} is above the maximum {info.volume_max} for {info.name}")
+    return volume
+
+
+def round_price(price: float, info, direction=0) -> float:
+    """price on the symbol's tick grid: nearest tick, or the next one down (-1) / up (+1)"""
+    if not price:
+        return price
+    tick = getattr(info, 'trade_tick_size', 0) or info.point
+    if tick > 0:
+        ticks = price / tick
+        if direction < 0:
+            ticks = math.floor(ticks + EPSILON)
+        elif direction > 0:
+            ticks = math.ceil(ticks - EPSILON)
+        else:
+            ticks = round(ticks)
+        price = ticks * tick
+    return round(price, info.digits)
+
+
+def check_order(action: str, is_market: bool, volume: float, price: float, sl: float, tp: float,
+                info, bid: float, ask: float, clamp_stops=False) -> CheckedOrder:
+    """
+    Validate and normalize one order; returns a CheckedOrder or raises PreTradeError.
+
+    action is the canonical signal action (BUY, SELL_LIMIT, ...) and price
+    is the fill price for market orders or the order price for pending ones.
+    """
+    is_buy = action.startswith('BUY')
+    adjustments = []
+
+    trade_mode = info.trade_mode
+    if (trade_mode == TRADE_MODE_LONGONLY and not is_buy) or (trade_mode == TRADE_MODE_SHORTONLY and is_buy):
+        allowed = 'long' if trade_mode == TRADE_MODE_LONGONLY else 'short'
+        raise PreTradeError('trade_mode', f"{info.name} only allows {allowed} positions")
+
+    checked_volume = normalize_volume(volume, info)
+    if checked_volume != volume:
+        adjustments.append(f"volume {volume} -> {checked_volume}")
+
+    if is_market and not sl and not tp:
+        # Market fills are priced from the tick, already on the grid: nothing else to check
+        return CheckedOrder(checked_volume, price, sl, tp, adjustments)
+
+    distance = info.trade_stops_level * info.point
+    if is_market:
+        checked_price = price
+        reference = bid if is_buy else ask
+    else:
+        checked_price = round_price(price, info)
+        if checked_price != price:
+            adjustments.append(f"price {price} -> {checked_price}")
+        reference = checked_price
+        valid = {
+            'BUY_LIMIT': checked_price <= ask - distance + EPSILON,
+            'SELL_LIMIT': checked_price >= bid + distance - EPSILON,
+            'BUY_STOP': checked_price >= ask + distance - EPSILON,
+            'SELL_STOP': checked_price <= bid - distance + EPSILON,
+        }[action]
+        if not valid or checked_price <= 0:
+            raise PreTradeError('price', f"{action} price {checked_price} is on the wrong side of the market "
+                                         f"or closer than {distance:g} to it (bid {bid}, ask {ask})")
+
+    # Buys: SL below and TP above the reference; sells the other way round
+    side = -1 if is_buy else 1
+    checked_sl = _check_stop('sl', sl, reference, side, distance, info, clamp_stops, adjustments)
+    checked_tp = _check_stop('tp', tp, reference, -side, distance, info, clamp_stops, adjustments)
+    return CheckedOrder(checked_volume, checked_price, checked_sl, checked_tp, adjustments)
+
+
+def _check_stop(name, level, reference, side, distance, info, clamp, adjustments):
+    """SL/TP rounded to the tick grid; side is -1 when it must sit below the reference, +1 above"""
+    if not level:
+        return level
+    rounded = round_price(level, info)
+    if (rounded - reference) * side <= 0:
+        raise PreTradeError('stops', f"{name.upper()} {level} is on the wrong side of the price {reference}")
+
+    if abs(rounded - reference) < distance - EPSILON:
+        if not clamp:
+            raise PreTradeError('stops', f"{name.upper()} {level} is closer than {distance:g} to the price {reference} "
+                                         f"(stops level {info.trade_stops_level} points)")
+        rounded = round_price(reference + side * distance, info, direction=side)
+    if rounded != level:
+        adjustments.append(f"{name} {level} -> {rounded}")
+    return rounded
@@ -0,0 +1,105 @@
+"""
+Background quote cache for actively traded symbols.
+
+A poller thread refreshes the last tick of every tracked symbol so market
+orders can be priced from memory. Quotes older than max_age are treated as
+missing and the caller falls back to a live symbol_info_tick call.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class QuoteCache:
+    """Last-tick cache filled by a background poller"""
+
+    def __init__(self, fetch_tick, poll_interval=0.2, max_age=1.0, idle_timeout=3600, max_symbols=64):
+        self.fetch_tick = fetch_tick
+        self.poll_interval = poll_interval
+        self.max_age = max_age
+        self.idle_timeout = idle_timeout
+        self.max_symbols = max_symbols
+
+        self._quotes = {}  # symbol -> (tick, received_at)
+        self._tracked = {}  # symbol -> last time it was traded
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.hits = 0
+        self.stale = 0
+
+    def track(self, symbol):
+        """Start (or keep) polling a symbol that is being traded"""
+        now = time.monotonic()
+        with self._lock:
+            if symbol not in self._tracked and len(self._tracked) >= self.max_symbols:
+                oldest = min(self._tracked, key=self._tracked.get)
+                del self._tracked[oldest]
+                self._quotes.pop(oldest, None)
+            self._tracked[symbol] = now
+
+    def get(self, symbol, max_age=None):
+        """Cached tick for symbol if it is fresher than max_age, else None"""
+        max_age = self.max_age if max_age is None else max_age
+        entry = self._quotes.get(symbol)
+        if entry is None or time.monotonic() - entry[1] > max_age:
+            self.stale += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def update(self, symbol, tick):
+        """Store a tick fetched outside the poller (e.g. a live fallback)"""
+        if tick is not None:
+            self._quotes[symbol] = (tick, time.monotonic())
+
+    def start(self):
+        """Start the background poller"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='quote-cache', daemon=True)
+        self._thread.start()
+        logger.info("QUOTE_CACHE: Polling every %ss, max age %ss", self.poll_interval, self.max_age)
+
+    def stop(self):
+        """Stop the poller and drop cached quotes"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+        with self._lock:
+            self._quotes.clear()
+
+    def stats(self) -> dict:
+        """Counters for monitoring"""
+        return {
+            'tracked_symbols': len(self._tracked),
+            'cached_quotes': len(self._quotes),
+            'hits': self.hits,
+            'stale': self.stale,
+        }
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self.poll()
+
+    def poll(self):
+        """Refresh every tracked symbol once and forget idle ones"""
+        now = time.monotonic()
+        with self._lock:
+            for symbol, last_used in list(self._tracked.items()):
+                if now - last_used > self.idle_timeout:
+                    del self._tracked[symbol]
+                    self._quotes.pop(symbol, None)
+            symbols = list(self._tracked)
+
+        for symbol in symbols:
+            try:
+                self.update(symbol, self.fetch_tick(symbol))
+            except Exception as e:
+                logger.warning("QUOTE_CACHE_WARNING: Failed to poll %s - %s", symbol, e)
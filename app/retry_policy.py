@@ -0,0 +1,37 @@
+"""
+Bounded fast retries for market orders the broker re-priced.
+
+REQUOTE (10004), PRICE_CHANGED (10020) and PRICE_OFF (10021) mean the price
+moved between the tick and order_send, not that the order is wrong. Such an
+order is sent again right away at a price from a fresh tick, up to
+max_attempts sends in total and only while the first send is less than
+budget seconds ago, so a fast market cannot turn one alert into a long
+chase. Every other retcode is final.
+"""
+
+import time
+
+import MetaTrader5 as mt5
+
+RETRYABLE_RETCODES = frozenset((
+    mt5.TRADE_RETCODE_REQUOTE,
+    mt5.TRADE_RETCODE_PRICE_CHANGED,
+    mt5.TRADE_RETCODE_PRICE_OFF,
+))
+
+
+class RetryPolicy:
+    """Which order_send results to retry, how often and for how long"""
+
+    def __init__(self, max_attempts=3, budget=0.3, retcodes=RETRYABLE_RETCODES):
+        self.max_attempts = max(1, max_attempts)
+        self.budget = budget
+        self.retcodes = frozenset(retcodes)
+
+    def should_retry(self, retcode, attempts, started) -> bool:
+        """True if a send that returned retcode may be repeated; started is the first send's perf_counter"""
+        return (
+            retcode in self.retcodes
+            and attempts < self.max_attempts
+            and time.perf_counter() - started < self.budget
+        )
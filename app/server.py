@@ -1,7 +1,21 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 import logging
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
 from app.mt5_handler import MT5Handler
+from app.mt5_executor import ANY_KEY, DEFAULT_LANE, MT5Executor, ExecutorBusy
+from app.fanout import FanoutPool, FanoutResult, load_accounts
+from app.signal_status import SignalStatusStore, EXECUTING, FAILED, result_fields
+from app.journal import JournalError, SignalJournal
+from app.idempotency import IdempotencyStore, idempotency_key
+from app.coalescer import SignalCoalescer
+from app.position_book import PositionBook, page_positions
+from app.supervisor import ConnectionSupervisor
+from app.signal import SignalError, parse_signal
 from app.config import Config
+from app.log_pipeline import HEALTH_LOGGER, logging_stats
+from app import metrics
+from app.metrics import JSON_PARSE_SECONDS, REQUEST_SECONDS, TRADE_RESPONSES
 
 # ANSI Color codes for terminal output
 class Colors:
@@ -18,168 +32,591 @@ class Colors:
 
 # Setup logging
 logger = logging.getLogger(__name__)
+health_logger = logging.getLogger(HEALTH_LOGGER)
 
 app = Flask(__name__)
 
 # Initialize the MT5 handler - will be set in initialize_mt5()
 mt5_handler = None
 
-def log_health_check(message):
-    """Log health check messages in ORANGE"""
-    colored_message = f"{Colors.ORANGE}{message}{Colors.RESET}"
-    logger.info(colored_message)
+# Single thread that owns every MetaTrader5 call - started in initialize_mt5()
+mt5_executor = None
+mt5_call_timeout = 30.0
 
-def log_success(message):
+# Worker process per account when FANOUT_ACCOUNTS_FILE is set - started in initialize_mt5()
+fanout_pool = None
+
+# Asynchronous /trade mode: accept with 202 and report progress at /trade/<id>
+async_trade_mode = False
+signal_status = SignalStatusStore()
+
+# Write-ahead journal of incoming signals - opened in initialize_mt5()
+signal_journal = None
+
+# Duplicate-alert suppression - created in initialize_mt5() when IDEMPOTENCY_WINDOW > 0
+idempotency = None
+
+# Nets same-symbol market signals over a short window - started in initialize_mt5() when COALESCE_WINDOW > 0
+coalescer = None
+
+# Heartbeat + circuit breaker for the terminal - started in initialize_mt5() when MT5_HEARTBEAT_INTERVAL > 0
+supervisor = None
+
+# Open positions kept in memory for /positions - started in initialize_mt5() when POSITION_SYNC_INTERVAL > 0
+position_book = None
+
+# Largest page /positions returns with ?limit=
+MAX_POSITIONS_PAGE = 1000
+
+# Statuses for which the signal never reached MT5, so a duplicate is allowed to retry it
+RETRYABLE_STATUS = (400, 503)
+
+# Colors are attached to the record and only applied by the console sink
+def log_health_check(message, *args):
+    """Log health check messages in ORANGE (sampled, see LOG_HEALTH_SAMPLE)"""
+    health_logger.info(message, *args, extra={'color': Colors.ORANGE})
+
+def log_success(message, *args):
     """Log success messages in GREEN"""  
-    colored_message = f"{Colors.GREEN}{message}{Colors.RESET}"
-    logger.info(colored_message)
+    logger.info(message, *args, extra={'color': Colors.GREEN})
 
-def log_error(message):
+def log_error(message, *args):
     """Log error messages in RED"""
-    colored_message = f"{Colors.RED}{message}{Colors.RESET}"
-    logger.error(colored_message)
+    logger.error(message, *args, extra={'color': Colors.RED})
+
+def run_mt5(fn, *args, lane=DEFAULT_LANE, key=None, **kwargs):
+    """Run an MT5 call on the executor thread and wait for its result."""
+    if mt5_executor is None:
+        return fn(*args, **kwargs)
+    return mt5_executor.call(fn, *args, timeout=mt5_call_timeout, lane=lane, key=key, **kwargs)
+
+def signal_lane(method, args):
+    """Executor lane for a handler call: closes first, then pending orders, then new entries."""
+    if method in ('bulk_close', 'close_positions'):
+        return 'close'
+    if method == 'send_order':
+        return 'entry' if args[0].is_market else 'pending'
+    return DEFAULT_LANE
+
+def signal_key(method, args):
+    """Executor ordering key for a handler call: its symbol, so a close never overtakes an earlier entry on it."""
+    if method in ('bulk_close', 'close_positions'):
+        return args[0].upper() if args and args[0] else ANY_KEY
+    if method == 'send_order':
+        return args[0].symbol.upper()
+    return None
+
+def execute(method, *args):
+    """Run an MT5Handler method locally, or on every account in fan-out mode."""
+    if fanout_pool is not None:
+        return fanout_pool.dispatch(method, *args)
+    try:
+        return run_mt5(getattr(mt5_handler, method), *args, lane=signal_lane(method, args),
+                       key=signal_key(method, args))
+    finally:
+        # Orders and closes change positions: let the book catch up now
+        if position_book is not None:
+            position_book.touch()
+
+def with_fanout(body, result):
+    """Attach per-account results to a response body in fan-out mode."""
+    if isinstance(result, FanoutResult):
+        body["fanout"] = result.to_dict()
+    return body
+
+def journal_signal(method, *args):
+    """Assign a signal ID and durably journal the signal before it is executed."""
+    signal_id = signal_status.new_id()
+    if signal_journal is not None:
+        try:
+            signal_journal.log_signal(signal_id, method, args)
+        except JournalError:
+            # Closes the record in case the disk recovers and writes it late, so it is never replayed
+            signal_journal.log_result(signal_id, {"success": False, "error": "Signal journal unavailable"})
+            raise
+    return signal_id
+
+def mark_executing(signal_id):
+    """Queue the journal's executing mark for a signal about to be handed to the executor."""
+    if signal_journal is None:
+        return None
+    return signal_journal.log_executing(signal_id, wait=False)
+
+def run_signal(signal_id, method, args, executing_seq=None):
+    """Execute a journaled signal once its executing mark is on disk, then record its outcome."""
+    if executing_seq is not None:
+        try:
+            signal_journal.wait_committed(executing_seq)
+        except JournalError as e:
+            signal_journal.log_result(signal_id, {"success": False, "error": str(e)})
+            raise
+    result = execute(method, *args)
+    if signal_journal is not None:
+        signal_journal.log_result(signal_id, result_fields(result))
+    return result
+
+def dispatch_signal(signal_id, method, *args):
+    """Execute a journaled signal on the executor thread and wait for its result."""
+    executing_seq = mark_executing(signal_id)
+    try:
+        return run_mt5(run_signal, signal_id, method, args, executing_seq, lane=signal_lane(method, args),
+                       key=signal_key(method, args))
+    except ExecutorBusy as e:
+        if signal_journal is not None:
+            signal_journal.log_result(signal_id, {"success": False, "error": str(e)})
+        raise
+
+def run_net_order(net_signal, signal_ids):
+    """Execute a coalesced net order, marking every signal in the batch as executing."""
+    executing_seq = None
+    for signal_id in signal_ids:
+        signal_status.update(signal_id, EXECUTING)
+        executing_seq = mark_executing(signal_id)
+    # One commit covers the whole batch's marks
+    if executing_seq is not None:
+        signal_journal.wait_committed(executing_seq)
+    return execute('send_order', net_signal)
+
+def _record_coalesced(signal_id, future):
+    """Record the net result of a coalesced batch for one of its signals."""
+    error = future.exception()
+    if error is not None:
+        fields = {"success": False, "error": str(error)}
+        signal_status.update(signal_id, FAILED, error=str(error))
+    else:
+        fields = result_fields(future.result())
+        signal_status.complete(signal_id, future.result())
+    if signal_journal is not None:
+        signal_journal.log_result(signal_id, fields)
+
+def coalesce_signal(signal_id, signal):
+    """Hand a journaled market signal to the coalescer; the future resolves to the batch's net result."""
+    future = coalescer.submit(signal_id, signal)
+    future.add_done_callback(lambda f: _record_coalesced(signal_id, f))
+    return future
+
+def _run_signal(signal_id, method, args, executing_seq=None):
+    """Execute an accepted signal on the executor thread and record its outcome."""
+    signal_status.update(signal_id, EXECUTING)
+    try:
+        result = run_signal(signal_id, method, args, executing_seq)
+    except Exception as e:
+        log_error("SIGNAL_ERROR: Signal %s failed - %s", signal_id, e)
+        signal_status.update(signal_id, FAILED, error=str(e))
+        return
+    signal_status.complete(signal_id, result)
+
+def accept_signal(signal_id, method, *args, action, symbol, coalesce=False):
+    """Queue a journaled signal and answer 202 with its ID (asynchronous mode)."""
+    signal_status.add(signal_id, action, symbol)
+    if coalesce:
+        coalesce_signal(signal_id, *args)
+    else:
+        executing_seq = mark_executing(signal_id)
+        try:
+            mt5_executor.submit(_run_signal, signal_id, method, args, executing_seq, lane=signal_lane(method, args),
+                                key=signal_key(method, args))
+        except ExecutorBusy as e:
+            signal_status.update(signal_id, FAILED, error="MT5 queue is full")
+            if signal_journal is not None:
+                signal_journal.log_result(signal_id, {"success": False, "error": str(e)})
+            raise
+
+    logger.info("SIGNAL_ACCEPTED: %s %s %s", signal_id, action, symbol)
+    return {
+        "status": "accepted",
+        "signal_id": signal_id,
+        "status_url": f"/trade/{signal_id}"
+    }, 202
 
 def initialize_mt5():
     """Function to be called from main.py to connect to MT5."""
-    global mt5_handler
+    global mt5_handler, mt5_executor, mt5_call_timeout, fanout_pool, async_trade_mode, signal_status, signal_journal, idempotency, coalescer, supervisor, position_book
     
     # Load configuration
     config = Config()
+
+    # Start the executor before anything touches MetaTrader5
+    mt5_executor = MT5Executor(max_queue=config.MT5_QUEUE_SIZE, max_skips=config.MT5_LANE_MAX_SKIPS)
+    mt5_executor.start()
+    mt5_call_timeout = config.MT5_CALL_TIMEOUT
+
+    async_trade_mode = config.ASYNC_TRADE_MODE
+    signal_status = SignalStatusStore(max_entries=config.SIGNAL_STATUS_LIMIT)
+
+    if config.SIGNAL_JOURNAL_PATH:
+        signal_journal = SignalJournal(config.SIGNAL_JOURNAL_PATH, fsync=config.SIGNAL_JOURNAL_FSYNC,
+                                       commit_timeout=config.SIGNAL_JOURNAL_TIMEOUT).open()
+
+    if config.IDEMPOTENCY_WINDOW > 0:
+        idempotency = IdempotencyStore(window=config.IDEMPOTENCY_WINDOW, max_keys=config.IDEMPOTENCY_MAX_KEYS)
+
+    if config.COALESCE_WINDOW > 0:
+        coalescer = SignalCoalescer(run_net_order, window=config.COALESCE_WINDOW)
+        coalescer.start()
+
+    # Fan-out mode: every account runs in its own worker process
+    if config.FANOUT_ACCOUNTS_FILE:
+        accounts = load_accounts(config.FANOUT_ACCOUNTS_FILE)
+        logger.info("FANOUT: Starting %s account workers", len(accounts))
+        fanout_pool = FanoutPool(accounts, timeout=config.MT5_CALL_TIMEOUT)
+        return fanout_pool.start()
     
     # Create MT5 handler with proper arguments
-    mt5_handler = MT5Handler(
-        account=config.MT5_ACCOUNT,
-        password=config.MT5_PASSWORD,
-        server=config.MT5_SERVER,
-        path=config.MT5_PATH
-    )
+    mt5_handler = MT5Handler.from_config(config)
+    mt5_handler.executor = mt5_executor
     
     # Connect to MT5
-    return mt5_handler.connect()
-
-@app.route('/trade', methods=['POST'])
-def webhook():
-    """Main webhook endpoint to process trading signals."""
-    try:
-        # Check if MT5 handler is initialized
-        if mt5_handler is None:
-            return jsonify({"error": "MT5 handler not initialized"}), 500
-            
-        data = request.get_json()
-        if not data:
-            return jsonify({"error": "Invalid JSON"}), 400
+    if not run_mt5(mt5_handler.connect):
+        return False
 
-        logger.info(f"Received webhook: {data}")
+    if config.MT5_HEARTBEAT_INTERVAL > 0:
+        supervisor = ConnectionSupervisor(
+            mt5_handler,
+            executor=mt5_executor,
+            interval=config.MT5_HEARTBEAT_INTERVAL,
+            timeout=config.MT5_HEARTBEAT_TIMEOUT,
+            backoff_max=config.MT5_RECONNECT_MAX_BACKOFF,
+        )
+        mt5_handler.supervisor = supervisor
+        supervisor.start()
 
-        action = data.get('action', '').upper()
-        symbol = data.get('symbol')
-        volume = data.get('volume')
+    if config.POSITION_SYNC_INTERVAL > 0:
+        # Syncs queue behind trading work; the book's age shows how far behind it is
+        position_book = PositionBook(lambda: run_mt5(mt5_handler.position_snapshot, lane='background'),
+                                     interval=config.POSITION_SYNC_INTERVAL)
+        position_book.start()
+    return True
 
-        # Validate required fields
-        if not symbol:
-            return jsonify({"error": "Missing required field: symbol"}), 400
-            
-        if not volume:
-            return jsonify({"error": "Missing required field: volume"}), 400
-
-        # --- Handle flexible tp/sl key names ---
-        tp = data.get('tp') or data.get('take_profit')
-        sl = data.get('sl') or data.get('stop_loss')
-
-        # Convert tp/sl to float if provided
-        if tp:
-            try:
-                tp = float(tp)
-            except ValueError:
-                return jsonify({"error": "Invalid take_profit/tp value"}), 400
-                
-        if sl:
-            try:
-                sl = float(sl)
-            except ValueError:
-                return jsonify({"error": "Invalid stop_loss/sl value"}), 400
-
-        # Convert volume to float
+def process_trade(data):
+    """Validate and execute a trading signal; returns (response body, HTTP status)."""
+    try:
         try:
-            volume = float(volume)
-        except ValueError:
-            return jsonify({"error": "Invalid volume value"}), 400
+            signal = parse_signal(data)
+        except SignalError as e:
+            log_error("SIGNAL_REJECTED: %s", e)
+            return {"error": str(e)}, 400
+
+        # Circuit open: the terminal is down, answer now instead of queueing doomed work
+        if supervisor is not None and not supervisor.available:
+            return {"error": "MT5 is disconnected, reconnecting"}, 503
+
+        symbol = signal.symbol
 
         # --- Market Orders ---
-        if action in ['BUY', 'SELL', 'LONG', 'SHORT']:
-            trade_action = 'BUY' if action in ['BUY', 'LONG'] else 'SELL'
-            
-            # Create signal dictionary for MT5Handler
-            signal = {
-                "symbol": symbol,
-                "action": trade_action,
-                "volume": volume
-            }
-            
-            # Add optional fields
-            if tp:
-                signal["take_profit"] = tp
-            if sl:
-                signal["stop_loss"] = sl
+        if signal.is_market:
+            signal_id = journal_signal('send_order', signal)
 
-            result = mt5_handler.send_order(signal)
+            # Plain market orders can be netted with other alerts on the same symbol
+            coalesce = coalescer is not None and not signal.take_profit and not signal.stop_loss
+            if async_trade_mode:
+                return accept_signal(signal_id, 'send_order', signal, action=signal.action, symbol=symbol,
+                                     coalesce=coalesce)
+
+            if coalesce:
+                result = coalesce_signal(signal_id, signal).result(timeout=coalescer.window + mt5_call_timeout)
+            else:
+                result = dispatch_signal(signal_id, 'send_order', signal)
 
             if result:
-                return jsonify({"status": "success", "message": "Market order placed"}), 200
+                return with_fanout({"status": "success", "message": "Market order placed"}, result), 200
             else:
-                return jsonify({"status": "error", "message": "Failed to place market order"}), 500
+                return with_fanout({"status": "error", "message": "Failed to place market order"}, result), 500
 
         # --- Pending Orders (LIMIT and STOP) ---
-        elif action in ['BUY_LIMIT', 'SELL_LIMIT', 'BUY_STOP', 'SELL_STOP']:
-            price = data.get('price')
+        elif signal.is_pending:
+            signal_id = journal_signal('send_order', signal)
+            if async_trade_mode:
+                return accept_signal(signal_id, 'send_order', signal, action=signal.action, symbol=symbol)
 
-            if not price:
-                return jsonify({"error": "Missing required field for pending order: price"}), 400
-            
-            try:
-                price = float(price)
-            except ValueError:
-                return jsonify({"error": "Invalid price value"}), 400
-            
-            # Create signal dictionary for MT5Handler
-            signal = {
-                "symbol": symbol,
-                "action": action,
-                "volume": volume,
-                "price": price
-            }
-            
-            # Add optional fields
-            if tp:
-                signal["take_profit"] = tp
-            if sl:
-                signal["stop_loss"] = sl
-            
-            result = mt5_handler.send_order(signal)
+            result = dispatch_signal(signal_id, 'send_order', signal)
             
             if result:
-                return jsonify({"status": "success", "message": "Pending order placed"}), 200
+                return with_fanout({"status": "success", "message": "Pending order placed"}, result), 200
             else:
-                return jsonify({"status": "error", "message": "Failed to place pending order"}), 500
+                return with_fanout({"status": "error", "message": "Failed to place pending order"}, result), 500
         
         # --- Close Order ---
-        elif action == 'CLOSE':
-            result = mt5_handler.close_positions(symbol)
-            if result:
-                return jsonify({"status": "success", "message": "Close order executed"}), 200
+        else:
+            volume = signal.volume
+            # Entries still held in a coalescing window go first
+            if coalescer is not None:
+                coalescer.flush(symbol)
+            signal_id = journal_signal('bulk_close', symbol, volume)
+            if async_trade_mode:
+                return accept_signal(signal_id, 'bulk_close', symbol, volume, action='CLOSE', symbol=symbol)
+
+            report = dispatch_signal(signal_id, 'bulk_close', symbol, volume)
+            if isinstance(report, FanoutResult):
+                ok, body = report.success, with_fanout({}, report)
             else:
-                return jsonify({"status": "error", "message": "Failed to close position"}), 500
+                ok, body = bool(report and report['success']), {"close": report}
+            if ok:
+                return {"status": "success", "message": "Close order executed", **body}, 200
+            else:
+                return {"status": "error", "message": "Failed to close position", **body}, 500
 
-        # --- Unknown Action ---
-        else:
-            error_msg = f"Unknown or unsupported action: '{data.get('action')}'"
-            log_error(error_msg)
-            return jsonify({"error": error_msg}), 400
+    except ExecutorBusy as e:
+        log_error("MT5_BUSY: %s", e)
+        return {"error": "MT5 is busy, try again later"}, 503
+
+    except JournalError as e:
+        log_error("SIGNAL_JOURNAL_ERROR: %s", e)
+        return {"error": "Signal journal unavailable, signal not executed"}, 503
+
+    except FutureTimeout:
+        log_error("MT5_TIMEOUT: Order was not executed in time")
+        return {"error": "Timed out waiting for MT5"}, 504
 
     except Exception as e:
         error_msg = f"An unexpected error occurred: {e}"
         log_error(error_msg)
-        return jsonify({"error": error_msg}), 500
+        return {"error": error_msg}, 500
+
+def handle_trade(data, client_id=None):
+    """Run a /trade request body through duplicate suppression and execution; returns (body, status)."""
+    started = time.perf_counter()
+    body, status = _handle_trade(data, client_id)
+    REQUEST_SECONDS.observe(time.perf_counter() - started)
+    TRADE_RESPONSES.labels(status).inc()
+    return body, status
+
+def _handle_trade(data, client_id):
+    # Check if MT5 handler is initialized
+    if mt5_handler is None and fanout_pool is None:
+        return {"error": "MT5 handler not initialized"}, 500
+
+    if not data or not isinstance(data, dict):
+        return {"error": "Invalid JSON"}, 400
+
+    logger.info("Received webhook: %s", data)
+
+    key = idempotency_key(data, client_id) if idempotency else None
+    if key is None:
+        return process_trade(data)
+
+    entry, duplicate = idempotency.begin(key)
+    if duplicate:
+        if not entry.wait(mt5_call_timeout):
+            logger.warning("DUPLICATE_SIGNAL: %s is still being executed", key)
+            return {"error": "Duplicate of a signal that is still being executed"}, 409
+        logger.warning("DUPLICATE_SIGNAL: %s suppressed, returning the original result", key)
+        return {**entry.body, "duplicate": True}, entry.status
+
+    body, status = None, 500
+    try:
+        body, status = process_trade(data)
+    finally:
+        # Nothing reached MT5 for rejected or queue-full signals: let a retry through
+        if body is None or status in RETRYABLE_STATUS:
+            idempotency.release(entry, body or {"error": "Signal was not processed"}, status)
+        else:
+            idempotency.complete(entry, body, status)
+    return body, status
+
+def trade_status_response(signal_id):
+    """Status record of an asynchronously accepted signal; returns (body, status)."""
+    record = signal_status.get(signal_id)
+    if record is None:
+        return {"error": f"Unknown signal ID: {signal_id}"}, 404
+    return record, 200
+
+def health_response():
+    """Connection, queue and pipeline state for /health; returns (body, status)."""
+    if fanout_pool is not None:
+        workers = fanout_pool.stats()
+        mt5_status = all(w["alive"] and w["connected"] for w in workers)
+    else:
+        mt5_status = mt5_handler.connected if mt5_handler else False
+    response = {
+        "status": "ok", 
+        "mt5_connected": mt5_status
+    }
+    if supervisor is not None:
+        response["mt5_supervisor"] = supervisor.stats()
+        if response["mt5_supervisor"]["state"] != "closed":
+            response["status"] = "degraded"
+    if mt5_executor is not None:
+        response["mt5_queue"] = mt5_executor.stats()
+    if position_book is not None:
+        response["position_book"] = position_book.stats()
+    if mt5_handler is not None and mt5_handler.symbol_meta is not None:
+        response["symbol_meta"] = mt5_handler.symbol_meta.stats()
+    if mt5_handler is not None:
+        response["execution_profiles"] = mt5_handler.execution_profiles.stats()
+    if fanout_pool is not None:
+        response["fanout_workers"] = workers
+    if signal_journal is not None:
+        response["signal_journal"] = signal_journal.stats()
+    if idempotency is not None:
+        response["idempotency"] = idempotency.stats()
+    if coalescer is not None:
+        response["coalescer"] = coalescer.stats()
+    log_queue = logging_stats()
+    if log_queue:
+        response["log_queue"] = log_queue
+    return response, 200
+
+def collect_runtime_metrics():
+    """Scrape-time gauges and counters read from the components' own stats()"""
+    if fanout_pool is not None:
+        connected = all(w["alive"] and w["connected"] for w in fanout_pool.stats())
+    else:
+        connected = bool(mt5_handler and mt5_handler.connected)
+    yield 'tvbridge_mt5_connected', 'gauge', 'Whether MT5 is connected', [({}, int(connected))]
+
+    if supervisor is not None:
+        stats = supervisor.stats()
+        yield 'tvbridge_mt5_heartbeat_seconds', 'gauge', 'Latency of the last terminal heartbeat', [
+            ({}, (stats['heartbeat_ms'] or 0.0) / 1000),
+        ]
+        yield 'tvbridge_mt5_circuit_open', 'gauge', 'Whether the terminal circuit breaker is open', [
+            ({}, int(stats['state'] != 'closed')),
+        ]
+        yield 'tvbridge_mt5_reconnects_total', 'counter', 'Successful reconnects to the terminal', [({}, stats['reconnects'])]
+        yield 'tvbridge_mt5_circuit_rejected_total', 'counter', 'Trades rejected while the circuit was open', [
+            ({}, stats['rejected_requests']),
+        ]
+
+    if position_book is not None:
+        stats = position_book.stats()
+        yield 'tvbridge_position_book_positions', 'gauge', 'Open positions in the in-memory book', [({}, stats['positions'])]
+        yield 'tvbridge_position_book_syncs_total', 'counter', 'Position book syncs by outcome', [
+            ({'outcome': 'ok'}, stats['syncs']), ({'outcome': 'error'}, stats['sync_errors']),
+        ]
+
+    if mt5_executor is not None:
+        stats = mt5_executor.stats()
+        yield 'tvbridge_mt5_queue_depth', 'gauge', 'Calls waiting for the MT5 executor thread', [({}, stats['queue_depth'])]
+        yield 'tvbridge_mt5_lane_depth', 'gauge', 'Calls waiting for the MT5 executor thread, by priority lane', [
+            ({'lane': lane}, lane_stats['queue_depth']) for lane, lane_stats in stats['lanes'].items()
+        ]
+        yield 'tvbridge_mt5_calls_total', 'counter', 'MT5 executor calls by outcome', [
+            ({'outcome': outcome}, stats[outcome]) for outcome in ('completed', 'failed', 'rejected', 'timed_out')
+        ]
+
+    if mt5_handler is not None:
+        stats = mt5_handler.symbol_cache.stats()
+        yield 'tvbridge_symbol_cache_lookups_total', 'counter', 'Symbol mapping cache lookups by result', [
+            ({'result': 'hit'}, stats['hits']), ({'result': 'miss'}, stats['misses']),
+        ]
+        yield 'tvbridge_symbol_cache_hit_ratio', 'gauge', 'Symbol mapping cache hit ratio', [({}, stats['hit_ratio'])]
+        yield 'tvbridge_symbol_cache_entries', 'gauge', 'Cached symbol mappings', [({}, stats['size'])]
+        if mt5_handler.symbol_meta is not None:
+            stats = mt5_handler.symbol_meta.stats()
+            yield 'tvbridge_symbol_meta_lookups_total', 'counter', 'Tradeability metadata lookups by result', [
+                ({'result': 'hit'}, stats['hits']), ({'result': 'miss'}, stats['misses']),
+            ]
+            yield 'tvbridge_symbol_meta_closed_markets', 'gauge', 'Symbols currently marked market-closed', [
+                ({}, stats['closed_markets']),
+            ]
+        if mt5_handler.quote_cache is not None:
+            stats = mt5_handler.quote_cache.stats()
+            lookups = stats['hits'] + stats['stale']
+            yield 'tvbridge_quote_cache_lookups_total', 'counter', 'Quote cache lookups by result', [
+                ({'result': 'hit'}, stats['hits']), ({'result': 'stale'}, stats['stale']),
+            ]
+            yield 'tvbridge_quote_cache_hit_ratio', 'gauge', 'Quote cache hit ratio', [
+                ({}, round(stats['hits'] / lookups, 4) if lookups else 0.0),
+            ]
+
+    if signal_journal is not None:
+        yield 'tvbridge_journal_pending', 'gauge', 'Journal records waiting to be committed', [
+            ({}, signal_journal.stats()['pending']),
+        ]
+    if coalescer is not None:
+        yield 'tvbridge_coalescer_open_batches', 'gauge', 'Symbols with a coalescing window open', [
+            ({}, coalescer.stats()['open_batches']),
+        ]
+    if idempotency is not None:
+        stats = idempotency.stats()
+        yield 'tvbridge_duplicate_signals_total', 'counter', 'Alerts suppressed as duplicates', [({}, stats['duplicates'])]
+
+    log_queue = logging_stats()
+    if log_queue:
+        yield 'tvbridge_log_queue_depth', 'gauge', 'Log records waiting for the writer thread', [({}, log_queue['queued'])]
+        yield 'tvbridge_log_dropped_total', 'counter', 'Log records dropped because the queue was full', [
+            ({}, log_queue['dropped']),
+        ]
+
+metrics.REGISTRY.add_collector(collect_runtime_metrics)
+
+def metrics_response():
+    """Prometheus text exposition for /metrics; returns (text, status)."""
+    return metrics.render(), 200
+
+def positions_response(args=None, if_none_match=None):
+    """
+    Open positions for /positions; returns (body, status, headers).
+
+    Served from the position book when it is running. Query arguments:
+    symbol, magic, offset, limit and profit (false leaves floating profit
+    out). The ETag covers the whole body, so pages without profit keep
+    their tag while only profit moves; a matching If-None-Match gets 304
+    with no body.
+    """
+    args = args or {}
+    if fanout_pool is not None:
+        result = fanout_pool.dispatch('get_positions')
+        return {"accounts": result.to_dict()["accounts"]}, 200 if result else 500, {}
+
+    try:
+        symbol = args.get('symbol') or None
+        magic = int(args['magic']) if args.get('magic') else None
+        offset = int(args.get('offset') or 0)
+        limit = int(args['limit']) if args.get('limit') else None
+    except ValueError:
+        return {"error": "magic, offset and limit must be integers"}, 400, {}
+    if offset < 0 or (limit is not None and not 0 < limit <= MAX_POSITIONS_PAGE):
+        return {"error": f"offset must be >= 0 and limit between 1 and {MAX_POSITIONS_PAGE}"}, 400, {}
+    profit = (args.get('profit') or 'true').lower() != 'false'
+
+    if position_book is not None and position_book.synced_at is not None:
+        headers = {"Cache-Control": "no-cache", "X-Positions-Age": str(position_book.age)}
+        if if_none_match:
+            etag = position_book.etag(profit)
+            tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+            if etag.removeprefix('W/') in tags or '*' in tags:
+                return None, 304, {"ETag": etag, **headers}
+        body, etag = position_book.query(symbol, magic, offset, limit, profit)
+        return body, 200, {"ETag": etag, **headers}
+
+    if not mt5_handler or not mt5_handler.connected:
+        return {"error": "MT5 not connected"}, 500, {}
+    
+    try:
+        position_list = run_mt5(mt5_handler.position_snapshot)
+        if position_list is None:
+            # The terminal gave no answer; report no positions as before the book existed
+            return page_positions([], symbol, magic, offset, limit), 200, {}
+        if position_book is not None:
+            position_book.apply(position_list)
+        position_list.sort(key=lambda p: p['ticket'])
+        return page_positions(position_list, symbol, magic, offset, limit, profit), 200, {}
+
+    except ExecutorBusy:
+        return {"error": "MT5 is busy, try again later"}, 503, {}
+
+    except FutureTimeout:
+        return {"error": "Timed out waiting for MT5"}, 504, {}
+        
+    except Exception as e:
+        return {"error": f"Failed to get positions: {e}"}, 500, {}
+
+@app.route('/trade', methods=['POST'])
+def webhook():
+    """Main webhook endpoint to process trading signals."""
+    started = time.perf_counter()
+    data = request.get_json(silent=True)
+    JSON_PARSE_SECONDS.observe(time.perf_counter() - started)
+    body, status = handle_trade(data, request.headers.get('Idempotency-Key'))
+    return jsonify(body), status
+
+@app.route('/trade/<signal_id>', methods=['GET'])
+def trade_status(signal_id):
+    """Status of a signal accepted in asynchronous mode."""
+    body, status = trade_status_response(signal_id)
+    return jsonify(body), status
 
 @app.route('/health', methods=['GET', 'HEAD'])
 def health_check():
@@ -187,42 +624,24 @@ def health_check():
     # Log health check request in ORANGE color
     client_ip = request.environ.get('HTTP_X_FORWARDED_FOR', request.environ.get('REMOTE_ADDR', 'unknown'))
     method = request.method
-    log_health_check(f'{client_ip} - "{method} /health HTTP/1.1" 200')
+    log_health_check('%s - "%s /health HTTP/1.1" 200', client_ip, method)
     
-    mt5_status = mt5_handler.connected if mt5_handler else False
-    return jsonify({
-        "status": "ok", 
-        "mt5_connected": mt5_status
-    }), 200
+    body, status = health_response()
+    return jsonify(body), status
 
 @app.route('/positions', methods=['GET'])
 def get_positions():
     """Get current open positions."""
-    if not mt5_handler or not mt5_handler.connected:
-        return jsonify({"error": "MT5 not connected"}), 500
-    
-    try:
-        import MetaTrader5 as mt5
-        positions = mt5.positions_get()
-        
-        if positions is None:
-            return jsonify({"positions": []}), 200
-        
-        position_list = []
-        for pos in positions:
-            position_list.append({
-                "ticket": pos.ticket,
-                "symbol": pos.symbol,
-                "type": "BUY" if pos.type == 0 else "SELL",
-                "volume": pos.volume,
-                "profit": pos.profit,
-                "open_price": pos.price_open
-            })
-        
-        return jsonify({"positions": position_list}), 200
-        
-    except Exception as e:
-        return jsonify({"error": f"Failed to get positions: {e}"}), 500
+    body, status, headers = positions_response(request.args, request.headers.get('If-None-Match'))
+    if body is None:
+        return Response(status=status, headers=headers)
+    return jsonify(body), status, headers
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Stage latencies, cache ratios, retcodes and queue depths for Prometheus."""
+    text, status = metrics_response()
+    return Response(text, status=status, content_type=metrics.CONTENT_TYPE)
 
 # Custom request logging with colors
 @app.before_request
@@ -230,4 +649,4 @@ def log_request_info():
     """Log all incoming requests"""
     if request.endpoint != 'health_check':  # Don't double log health checks
         client_ip = request.environ.get('HTTP_X_FORWARDED_FOR', request.environ.get('REMOTE_ADDR', 'unknown'))
-        logger.info(f'{client_ip} - "{request.method} {request.path} HTTP/1.1"')
\ No newline at end of file
+        logger.info('%s - "%s %s HTTP/1.1"', client_ip, request.method, request.path)
\ No newline at end of file
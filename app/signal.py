@@ -0,0 +1,149 @@
+"""
+Compiled schema for incoming trading signals.
+
+A webhook payload is parsed once into an immutable Signal: field aliases
+(tp/take_profit, sl/stop_loss, side/action, ticker/symbol) are resolved,
+values are coerced to floats and the action is dispatched through a
+precomputed table to its canonical name and order kind. The same Signal
+then flows through the server, coalescer, fan-out workers and
+MT5Handler.send_order without being rebuilt or re-converted.
+
+Signal is a slotted tuple subclass (like a namedtuple): no per-instance
+dict, immutable, hashable, and cheap to create on the hot path.
+"""
+
+from operator import itemgetter
+
+MARKET = 'market'
+PENDING = 'pending'
+CLOSE = 'close'
+
+# Accepted action spellings -> (canonical action, order kind)
+ACTIONS = {
+    'BUY': ('BUY', MARKET),
+    'LONG': ('BUY', MARKET),
+    'SELL': ('SELL', MARKET),
+    'SHORT': ('SELL', MARKET),
+    'BUY_LIMIT': ('BUY_LIMIT', PENDING),
+    'SELL_LIMIT': ('SELL_LIMIT', PENDING),
+    'BUY_STOP': ('BUY_STOP', PENDING),
+    'SELL_STOP': ('SELL_STOP', PENDING),
+    'CLOSE': ('CLOSE', CLOSE),
+}
+
+_new = tuple.__new__
+
+
+class SignalError(ValueError):
+    """Payload does not describe a valid signal; the message is safe to return to the client"""
+
+
+class Signal(tuple):
+    """Validated, immutable trading signal"""
+
+    __slots__ = ()
+
+    _fields = ('action', 'kind', 'symbol', 'volume', 'price', 'stop_loss', 'take_profit')
+
+    action = property(itemgetter(0))
+    kind = property(itemgetter(1))
+    symbol = property(itemgetter(2))
+    volume = property(itemgetter(3))
+    price = property(itemgetter(4))
+    stop_loss = property(itemgetter(5))
+    take_profit = property(itemgetter(6))
+
+    def __new__(cls, action, symbol, volume=None, price=0.0, stop_loss=0.0, take_profit=0.0):
+        try:
+            action, kind = ACTIONS[action]
+        except KeyError:
+            raise SignalError(f"Unknown or unsupported action: '{action}'") from None
+        return _new(cls, (action, kind, symbol, volume, price, stop_loss, take_profit))
+
+    def __getnewargs__(self):
+        # Pickled for fan-out workers: rebuild through __new__ without 'kind'
+        return (self[0],) + tuple(self[2:])
+
+    def __repr__(self):
+        return (f"Signal({self[0]} {self[2]} volume={self[3]} price={self[4]} "
+                f"sl={self[5]} tp={self[6]})")
+
+    @property
+    def is_market(self) -> bool:
+        return self[1] == MARKET
+
+    @property
+    def is_pending(self) -> bool:
+        return self[1] == PENDING
+
+    @property
+    def close_all(self) -> bool:
+        """CLOSE without a volume closes every position on the symbol"""
+        return self[1] == CLOSE and self[3] is None
+
+    def to_dict(self) -> dict:
+        """Plain representation, accepted back by parse_signal (used by the journal)"""
+        return {name: value for name, value in zip(self._fields, self) if name != 'kind'}
+
+
+def parse_signal(data) -> Signal:
+    """Validate a webhook payload into a Signal, reading and converting each field once; raises SignalError"""
+    # Direct lookups beat iterating the payload for these small alert bodies;
+    # the first alias listed wins when both are present
+    try:
+        get = data.get
+    except AttributeError:
+        raise SignalError("Invalid JSON") from None
+    symbol = get('symbol') or get('ticker')
+    if not symbol:
+        raise SignalError("Missing required field: symbol")
+
+    raw_action = get('action') or get('side') or ''
+    action = str(raw_action).upper()
+    volume = get('volume')
+
+    # CLOSE without a volume (or with "all") closes every position
+    close_all = action == 'CLOSE' and (not volume or str(volume).strip().upper() == 'ALL')
+    if not volume and not close_all:
+        raise SignalError("Missing required field: volume")
+
+    take_profit = get('tp') or get('take_profit') or 0.0
+    if take_profit:
+        try:
+            take_profit = float(take_profit)
+        except (TypeError, ValueError):
+            raise SignalError("Invalid take_profit/tp value") from None
+
+    stop_loss = get('sl') or get('stop_loss') or 0.0
+    if stop_loss:
+        try:
+            stop_loss = float(stop_loss)
+        except (TypeError, ValueError):
+            raise SignalError("Invalid stop_loss/sl value") from None
+
+    if close_all:
+        volume = None
+    else:
+        try:
+            volume = float(volume)
+        except (TypeError, ValueError):
+            raise SignalError("Invalid volume value") from None
+        if volume <= 0:
+            raise SignalError("Invalid volume value")
+
+    entry = ACTIONS.get(action)
+    if entry is None:
+        raise SignalError(f"Unknown or unsupported action: '{raw_action}'")
+    action, kind = entry
+
+    price = 0.0
+    if kind == PENDING:
+        price = get('price')
+        if not price:
+            raise SignalError("Missing required field for pending order: price")
+        try:
+            price = float(price)
+        except (TypeError, ValueError):
+            raise SignalError("Invalid price value") from None
+
+    return _new(Signal, (action, kind, symbol, volume, price, stop_loss, take_profit))
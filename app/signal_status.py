@@ -0,0 +1,90 @@
+"""
+Status tracking for signals accepted in asynchronous /trade mode.
+
+Each accepted signal gets an ID and moves through
+queued -> executing -> filled | failed. The store keeps the most recent
+max_entries signals so GET /trade/<id> can report the outcome, including
+the MT5 retcode and ticket.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+QUEUED = 'queued'
+EXECUTING = 'executing'
+FILLED = 'filled'
+FAILED = 'failed'
+
+
+class SignalStatusStore:
+    """Bounded, thread-safe map of signal ID -> status record"""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._records = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+
+    def add(self, signal_id, action, symbol) -> dict:
+        """Register a newly accepted signal as queued"""
+        now = time.time()
+        record = {
+            'signal_id': signal_id,
+            'status': QUEUED,
+            'action': action,
+            'symbol': symbol,
+            'received_at': now,
+            'updated_at': now,
+            'retcode': None,
+            'ticket': None,
+            'error': None,
+        }
+        with self._lock:
+            self._records[signal_id] = record
+            while len(self._records) > self.max_entries:
+                self._records.popitem(last=False)
+        return dict(record)
+
+    def update(self, signal_id, status, **fields):
+        """Move a signal to a new status and attach result fields"""
+        with self._lock:
+            record = self._records.get(signal_id)
+            if record is None:
+                return
+            record.update(fields)
+            record['status'] = status
+            record['updated_at'] = time.time()
+
+    def complete(self, signal_id, result):
+        """Record the outcome of an executed signal"""
+        fields = result_fields(result)
+        self.update(signal_id, FILLED if fields.pop('success') else FAILED, **fields)
+
+    def get(self, signal_id):
+        """Copy of the status record, or None if unknown or expired"""
+        with self._lock:
+            record = self._records.get(signal_id)
+            return dict(record) if record is not None else None
+
+
+def result_fields(result) -> dict:
+    """Status fields for an OrderResult, a close report dict or a fan-out result"""
+    if hasattr(result, 'retcode'):
+        return {
+            'success': bool(result),
+            'retcode': result.retcode,
+            'ticket': result.ticket,
+            'error': result.error,
+            'attempts': result.attempts,
+            'slippage': result.slippage,
+        }
+    if hasattr(result, 'to_dict'):
+        return {'success': bool(result), 'result': result.to_dict()}
+    if isinstance(result, dict):
+        return {'success': bool(result.get('success')), 'result': result}
+    return {'success': bool(result), 'error': None if result else 'Execution failed'}
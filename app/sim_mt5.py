@@ -0,0 +1,922 @@
+"""
+Simulated MetaTrader5 backend (paper trading) for benchmarks and load tests.
+
+Implements, in-process, the subset of the MetaTrader5 API the app uses:
+
+- a generated broker symbol universe (symbols_get, symbol_info, symbol_select)
+- synthetic ticks: a random walk per symbol, advanced lazily when quoted
+- order_send for deals, pending orders, CLOSE_BY, REMOVE and SLTP against a
+  hedging or netting position book, with broker-side checks for volume
+  limits, stop levels and filling modes
+- positions_get, orders_get, account_info and terminal_info
+- configurable per-call latency and probabilistic retcode injection
+
+MT5_BACKEND=sim registers this module as MetaTrader5 (see app/__init__.py),
+so MT5Handler and everything behind it run unchanged on any OS. The book is
+a few dicts behind one lock: order_send costs microseconds, so the
+simulator is never the bottleneck of a benchmark.
+"""
+
+import fnmatch
+import itertools
+import logging
+import math
+import random
+import sys
+import threading
+import time
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# ---------------- MetaTrader5 constants ----------------
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+ORDER_TYPE_BUY_LIMIT = 2
+ORDER_TYPE_SELL_LIMIT = 3
+ORDER_TYPE_BUY_STOP = 4
+ORDER_TYPE_SELL_STOP = 5
+ORDER_TYPE_BUY_STOP_LIMIT = 6
+ORDER_TYPE_SELL_STOP_LIMIT = 7
+ORDER_TYPE_CLOSE_BY = 8
+
+POSITION_TYPE_BUY = 0
+POSITION_TYPE_SELL = 1
+
+TRADE_ACTION_DEAL = 1
+TRADE_ACTION_PENDING = 5
+TRADE_ACTION_SLTP = 6
+TRADE_ACTION_MODIFY = 7
+TRADE_ACTION_REMOVE = 8
+TRADE_ACTION_CLOSE_BY = 10
+
+ORDER_FILLING_FOK = 0
+ORDER_FILLING_IOC = 1
+ORDER_FILLING_RETURN = 2
+ORDER_FILLING_BOC = 3
+
+ORDER_TIME_GTC = 0
+ORDER_TIME_DAY = 1
+ORDER_TIME_SPECIFIED = 2
+ORDER_TIME_SPECIFIED_DAY = 3
+
+ORDER_STATE_PLACED = 1
+
+SYMBOL_FILLING_FOK = 1
+SYMBOL_FILLING_IOC = 2
+
+SYMBOL_ORDER_MARKET = 1
+SYMBOL_ORDER_LIMIT = 2
+SYMBOL_ORDER_STOP = 4
+SYMBOL_ORDER_STOP_LIMIT = 8
+SYMBOL_ORDER_SL = 16
+SYMBOL_ORDER_TP = 32
+SYMBOL_ORDER_CLOSEBY = 64
+
+SYMBOL_TRADE_MODE_DISABLED = 0
+SYMBOL_TRADE_MODE_LONGONLY = 1
+SYMBOL_TRADE_MODE_SHORTONLY = 2
+SYMBOL_TRADE_MODE_CLOSEONLY = 3
+SYMBOL_TRADE_MODE_FULL = 4
+
+SYMBOL_TRADE_EXECUTION_REQUEST = 0
+SYMBOL_TRADE_EXECUTION_INSTANT = 1
+SYMBOL_TRADE_EXECUTION_MARKET = 2
+SYMBOL_TRADE_EXECUTION_EXCHANGE = 3
+
+ACCOUNT_MARGIN_MODE_RETAIL_NETTING = 0
+ACCOUNT_MARGIN_MODE_EXCHANGE = 1
+ACCOUNT_MARGIN_MODE_RETAIL_HEDGING = 2
+
+TRADE_RETCODE_REQUOTE = 10004
+TRADE_RETCODE_REJECT = 10006
+TRADE_RETCODE_CANCEL = 10007
+TRADE_RETCODE_PLACED = 10008
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_DONE_PARTIAL = 10010
+TRADE_RETCODE_ERROR = 10011
+TRADE_RETCODE_TIMEOUT = 10012
+TRADE_RETCODE_INVALID = 10013
+TRADE_RETCODE_INVALID_VOLUME = 10014
+TRADE_RETCODE_INVALID_PRICE = 10015
+TRADE_RETCODE_INVALID_STOPS = 10016
+TRADE_RETCODE_TRADE_DISABLED = 10017
+TRADE_RETCODE_MARKET_CLOSED = 10018
+TRADE_RETCODE_NO_MONEY = 10019
+TRADE_RETCODE_PRICE_CHANGED = 10020
+TRADE_RETCODE_PRICE_OFF = 10021
+TRADE_RETCODE_INVALID_EXPIRATION = 10022
+TRADE_RETCODE_ORDER_CHANGED = 10023
+TRADE_RETCODE_TOO_MANY_REQUESTS = 10024
+TRADE_RETCODE_NO_CHANGES = 10025
+TRADE_RETCODE_SERVER_DISABLES_AT = 10026
+TRADE_RETCODE_CLIENT_DISABLES_AT = 10027
+TRADE_RETCODE_LOCKED = 10028
+TRADE_RETCODE_FROZEN = 10029
+TRADE_RETCODE_INVALID_FILL = 10030
+TRADE_RETCODE_CONNECTION = 10031
+TRADE_RETCODE_ONLY_REAL = 10032
+TRADE_RETCODE_LIMIT_ORDERS = 10033
+TRADE_RETCODE_LIMIT_VOLUME = 10034
+TRADE_RETCODE_INVALID_ORDER = 10035
+TRADE_RETCODE_POSITION_CLOSED = 10036
+TRADE_RETCODE_LONG_ONLY = 10042
+TRADE_RETCODE_SHORT_ONLY = 10043
+TRADE_RETCODE_CLOSE_ONLY = 10044
+
+RES_S_OK = 1
+RES_E_FAIL = -1
+RES_E_INVALID_PARAMS = -2
+RES_E_NOT_FOUND = -4
+RES_E_INTERNAL_FAIL_CONNECT = -10004
+
+RETCODE_COMMENTS = {
+    TRADE_RETCODE_REQUOTE: 'Requote',
+    TRADE_RETCODE_REJECT: 'Request rejected',
+    TRADE_RETCODE_DONE: 'Request executed',
+    TRADE_RETCODE_ERROR: 'Request processing error',
+    TRADE_RETCODE_TIMEOUT: 'Request canceled by timeout',
+    TRADE_RETCODE_INVALID: 'Invalid request',
+    TRADE_RETCODE_INVALID_VOLUME: 'Invalid volume',
+    TRADE_RETCODE_INVALID_PRICE: 'Invalid price',
+    TRADE_RETCODE_INVALID_STOPS: 'Invalid stops',
+    TRADE_RETCODE_TRADE_DISABLED: 'Trade disabled',
+    TRADE_RETCODE_MARKET_CLOSED: 'Market closed',
+    TRADE_RETCODE_NO_MONEY: 'No money',
+    TRADE_RETCODE_PRICE_CHANGED: 'Prices changed',
+    TRADE_RETCODE_PRICE_OFF: 'Off quotes',
+    TRADE_RETCODE_TOO_MANY_REQUESTS: 'Too many requests',
+    TRADE_RETCODE_FROZEN: 'Order or position frozen',
+    TRADE_RETCODE_INVALID_FILL: 'Unsupported filling mode',
+    TRADE_RETCODE_CONNECTION: 'No connection',
+    TRADE_RETCODE_INVALID_ORDER: 'Invalid order',
+    TRADE_RETCODE_POSITION_CLOSED: 'Position already closed',
+    TRADE_RETCODE_LONG_ONLY: 'Only long positions allowed',
+    TRADE_RETCODE_SHORT_ONLY: 'Only short positions allowed',
+    TRADE_RETCODE_CLOSE_ONLY: 'Only position closing allowed',
+}
+
+# ---------------- Result structures (field names match MetaTrader5) ----------------
+SymbolInfo = namedtuple('SymbolInfo', [
+    'name', 'description', 'path', 'visible', 'select', 'custom', 'digits', 'point', 'spread',
+    'trade_mode', 'trade_exemode', 'filling_mode', 'order_mode', 'trade_stops_level',
+    'trade_freeze_level', 'trade_contract_size', 'trade_tick_size', 'volume_min', 'volume_max',
+    'volume_step', 'currency_base', 'currency_profit', 'currency_margin', 'bid', 'ask', 'time',
+])
+Tick = namedtuple('Tick', ['time', 'bid', 'ask', 'last', 'volume', 'time_msc', 'flags', 'volume_real'])
+TradePosition = namedtuple('TradePosition', [
+    'ticket', 'time', 'time_msc', 'time_update', 'time_update_msc', 'type', 'magic', 'identifier',
+    'reason', 'volume', 'price_open', 'sl', 'tp', 'price_current', 'swap', 'profit', 'symbol', 'comment',
+    'external_id',
+])
+TradeOrder = namedtuple('TradeOrder', [
+    'ticket', 'time_setup', 'time_setup_msc', 'type', 'state', 'magic', 'position_id', 'volume_initial',
+    'volume_current', 'price_open', 'sl', 'tp', 'price_current', 'symbol', 'comment', 'type_time',
+    'type_filling',
+])
+OrderSendResult = namedtuple('OrderSendResult', [
+    'retcode', 'deal', 'order', 'volume', 'price', 'bid', 'ask', 'comment', 'request_id',
+    'retcode_external', 'request',
+])
+AccountInfo = namedtuple('AccountInfo', [
+    'login', 'trade_mode', 'leverage', 'margin_mode', 'trade_allowed', 'trade_expert', 'balance',
+    'profit', 'equity', 'currency', 'server', 'name', 'company',
+])
+TerminalInfo = namedtuple('TerminalInfo', [
+    'connected', 'trade_allowed', 'ping_last', 'build', 'name', 'company', 'path',
+])
+
+VOLUME_EPSILON = 1e-9
+
+# ---------------- Symbol universe ----------------
+_CURRENCIES = [
+    ('EUR', 'Euro'), ('GBP', 'Great Britain Pound'), ('AUD', 'Australian Dollar'),
+    ('NZD', 'New Zealand Dollar'), ('USD', 'US Dollar'), ('CAD', 'Canadian Dollar'),
+    ('CHF', 'Swiss Franc'), ('JPY', 'Japanese Yen'), ('SEK', 'Swedish Krona'),
+    ('NOK', 'Norwegian Krone'), ('DKK', 'Danish Krone'), ('SGD', 'Singapore Dollar'),
+    ('HKD', 'Hong Kong Dollar'), ('ZAR', 'South African Rand'), ('MXN', 'Mexican Peso'),
+    ('PLN', 'Polish Zloty'), ('TRY', 'Turkish Lira'), ('CNH', 'Chinese Yuan'),
+    ('HUF', 'Hungarian Forint'), ('CZK', 'Czech Koruna'),
+]
+
+# name, description, class, reference price
+_CORE_SYMBOLS = [
+    ('XAUUSD', 'Gold vs US Dollar', 'metal', 2370.0),
+    ('XAGUSD', 'Silver vs US Dollar', 'metal', 28.0),
+    ('BTCUSD', 'Bitcoin vs US Dollar', 'crypto', 65000.0),
+    ('ETHUSD', 'Ethereum vs US Dollar', 'crypto', 3200.0),
+    ('US30.cash', 'Wall Street 30', 'index', 39000.0),
+    ('US.NAS100', 'US Tech 100', 'index', 18000.0),
+    ('SPX500', 'US 500', 'index', 5200.0),
+    ('GER40', 'Germany 40', 'index', 18000.0),
+    ('UK100', 'UK 100', 'index', 8000.0),
+    ('USOIL', 'US Crude Oil', 'energy', 80.0),
+]
+
+# Majors start near real quotes so README-style sl/tp alerts pass the stop checks
+_FOREX_PRICES = {
+    'EURUSD': 1.0550, 'GBPUSD': 1.2700, 'AUDUSD': 0.6600, 'NZDUSD': 0.6000, 'USDCAD': 1.3600,
+    'USDCHF': 0.9000, 'USDJPY': 151.50, 'EURGBP': 0.8550, 'EURJPY': 164.30, 'GBPJPY': 192.40,
+}
+
+_EXCHANGES = ('NYSE', 'NAS', 'LSE', 'XETRA', 'TSE')
+
+# class -> digits, contract size, volume min/step/max, stops level, spread (points)
+_CLASS_SPECS = {
+    'forex': (5, 100000.0, 0.01, 0.01, 100.0, 10, 12),
+    'metal': (2, 100.0, 0.01, 0.01, 50.0, 20, 25),
+    'crypto': (2, 1.0, 0.01, 0.01, 10.0, 100, 1500),
+    'index': (2, 1.0, 0.1, 0.1, 500.0, 50, 150),
+    'energy': (2, 100.0, 0.01, 0.01, 100.0, 20, 4),
+    'stock': (2, 1.0, 1.0, 1.0, 10000.0, 5, 5),
+}
+
+
+class _Symbol:
+    """Mutable broker-side symbol state"""
+
+    __slots__ = (
+        'name', 'description', 'path', 'visible', 'digits', 'point', 'spread', 'trade_mode',
+        'trade_exemode', 'filling_mode', 'order_mode', 'trade_stops_level', 'trade_freeze_level',
+        'trade_contract_size', 'volume_min', 'volume_max', 'volume_step', 'currency_base',
+        'currency_profit', 'bid', 'tick', 'tick_at',
+    )
+
+    def info(self, bid, ask, now) -> SymbolInfo:
+        return SymbolInfo(
+            self.name, self.description, self.path, self.visible, self.visible, False, self.digits,
+            self.point, self.spread, self.trade_mode, self.trade_exemode, self.filling_mode, self.order_mode,
+            self.trade_stops_level, self.trade_freeze_level, self.trade_contract_size, self.point,
+            self.volume_min, self.volume_max, self.volume_step, self.currency_base, self.currency_profit,
+            self.currency_base, bid, ask, int(now),
+        )
+
+
+def _make_symbol(name, description, kind, price, visible, base='', profit='USD') -> _Symbol:
+    digits, contract, vmin, vstep, vmax, stops, spread = _CLASS_SPECS[kind]
+    if kind == 'forex' and profit in ('JPY', 'HUF'):
+        digits = 3
+    s = _Symbol()
+    s.name = name
+    s.description = description
+    s.path = f"{kind.title()}\\{name}"
+    s.visible = visible
+    s.digits = digits
+    s.point = 10 ** -digits
+    s.spread = spread
+    s.trade_mode = SYMBOL_TRADE_MODE_FULL
+    s.trade_exemode = SYMBOL_TRADE_EXECUTION_MARKET
+    s.filling_mode = SYMBOL_FILLING_FOK | SYMBOL_FILLING_IOC
+    s.order_mode = 127  # every SYMBOL_ORDER_* flag, including CLOSE_BY
+    s.trade_stops_level = stops
+    s.trade_freeze_level = 0
+    s.trade_contract_size = contract
+    s.volume_min = vmin
+    s.volume_max = vmax
+    s.volume_step = vstep
+    s.currency_base = base
+    s.currency_profit = profit
+    s.bid = round(price, digits)
+    s.tick = None
+    s.tick_at = 0.0
+    return s
+
+
+def generate_symbols(count, suffix='', seed=7) -> list:
+    """
+    Deterministic broker universe of `count` symbols.
+
+    Metals, crypto and indices come first, then every currency pair (with
+    the broker suffix, e.g. 'm' for EURUSDm), then synthetic stock CFDs
+    such as 'ABCD.NYSE' until the count is reached.
+    """
+    rng = random.Random(seed)
+    symbols, seen = [], set()
+
+    def add(symbol):
+        if len(symbols) < count and symbol.name not in seen:
+            seen.add(symbol.name)
+            symbols.append(symbol)
+
+    for name, description, kind, price in _CORE_SYMBOLS:
+        base, profit = (name[:3], name[3:6]) if kind in ('metal', 'crypto') else ('', 'USD')
+        add(_make_symbol(name + suffix if kind == 'metal' else name, description, kind, price,
+                         visible=True, base=base, profit=profit))
+
+    for i, (base, base_name) in enumerate(_CURRENCIES):
+        for quote, quote_name in _CURRENCIES[i + 1:]:
+            price = rng.uniform(0.6, 1.9) * (100 if quote in ('JPY', 'HUF') else 1)
+            price = _FOREX_PRICES.get(base + quote, price)
+            add(_make_symbol(base + quote + suffix, f"{base_name} vs {quote_name}", 'forex', price,
+                             visible=len(symbols) < 40, base=base, profit=quote))
+
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    while len(symbols) < count:
+        ticker = ''.join(rng.choice(letters) for _ in range(rng.randint(2, 5)))
+        exchange = rng.choice(_EXCHANGES)
+        add(_make_symbol(f"{ticker}.{exchange}", f"{ticker.title()} Holdings ({exchange})", 'stock',
+                         rng.uniform(5, 500), visible=False, profit='USD'))
+    return symbols
+
+
+class _Position:
+    __slots__ = ('ticket', 'symbol', 'type', 'volume', 'price_open', 'sl', 'tp', 'magic', 'comment',
+                 'time_msc', 'update_msc')
+
+
+class _Order:
+    __slots__ = ('ticket', 'symbol', 'type', 'volume', 'price', 'sl', 'tp', 'magic', 'comment',
+                 'time_msc', 'type_time', 'type_filling')
+
+
+def parse_retcodes(spec) -> dict:
+    """'10004:0.02,10021:0.01' -> {10004: 0.02, 10021: 0.01}"""
+    retcodes = {}
+    for part in (spec or '').split(','):
+        if part.strip():
+            code, _, probability = part.partition(':')
+            retcodes[int(code)] = float(probability or 1.0)
+    return retcodes
+
+
+def _match_group(name, group) -> bool:
+    """MetaTrader group filter: comma-separated masks, '!' excludes"""
+    matched = False
+    for mask in group.split(','):
+        mask = mask.strip()
+        if mask.startswith('!'):
+            if fnmatch.fnmatchcase(name, mask[1:]):
+                return False
+        elif fnmatch.fnmatchcase(name, mask):
+            matched = True
+    return matched
+
+
+class SimTerminal:
+    """One simulated terminal: symbol universe, ticks and a position book"""
+
+    def __init__(self, **options):
+        self._lock = threading.RLock()
+        self.reset(**options)
+
+    def reset(self, symbols=1000, hedging=True, latency=0.0, order_latency=0.0, retcodes=None,
+              suffix='', volatility=0.0002, tick_interval=0.05, balance=100000.0, seed=7):
+        """Rebuild the universe and clear the book; the bound API functions stay valid"""
+        with self._lock:
+            self.hedging = hedging
+            self.latency = latency
+            self.order_latency = order_latency
+            self.volatility = volatility
+            self.tick_interval = tick_interval
+            self.balance = balance
+            self._rng = random.Random(seed)
+            self._symbols = {s.name: s for s in generate_symbols(symbols, suffix, seed)}
+            self._positions = {}  # ticket -> _Position, in opening order
+            self._netting = {}  # symbol -> ticket of its single position (netting accounts)
+            self._orders = {}  # ticket -> _Order
+            self._pending_symbols = {}  # symbol -> number of pending orders
+            self._tickets = itertools.count(100000001)
+            self._deals = itertools.count(200000001)
+            self._request_ids = itertools.count(1)
+            self.set_retcodes(retcodes or {})
+            self._initialized = False
+            self._connected = True
+            self._login = 0
+            self._server = ''
+            self._error = (RES_S_OK, 'Success')
+            self.orders_sent = 0
+
+    def set_retcodes(self, retcodes):
+        """Inject failures: {retcode: probability per order_send}"""
+        self._inject = []
+        cumulative = 0.0
+        for code, probability in retcodes.items():
+            cumulative += probability
+            self._inject.append((cumulative, code))
+        self._inject_total = cumulative
+
+    def set_symbol(self, name, **fields):
+        """Override broker-side symbol properties, e.g. filling_mode=SYMBOL_FILLING_IOC"""
+        symbol = self._symbols[name]
+        for field, value in fields.items():
+            setattr(symbol, field, value)
+
+    def add_symbol(self, name, description='', kind='forex', price=1.0, visible=True):
+        """List a new broker symbol, as when the broker adds an instrument"""
+        with self._lock:
+            self._symbols[name] = _make_symbol(name, description, kind, price, visible)
+
+    def remove_symbol(self, name):
+        """Delist a broker symbol"""
+        with self._lock:
+            self._symbols.pop(name, None)
+
+    def set_connected(self, connected):
+        """Simulate the terminal losing (or regaining) its connection"""
+        self._connected = connected
+
+    # ---------------- Session ----------------
+    def _call(self):
+        """Per-call latency and connection check; False when the call must fail"""
+        if self.latency:
+            time.sleep(self.latency)
+        if not self._initialized or not self._connected:
+            self._error = (RES_E_INTERNAL_FAIL_CONNECT, 'IPC initialize failed, terminal not connected')
+            return False
+        return True
+
+    def initialize(self, path=None, login=None, password=None, server=None, timeout=None, portable=False):
+        self._initialized = True
+        if login:
+            self._login, self._server = login, server or ''
+        self._error = (RES_S_OK, 'Success')
+        return True
+
+    def login(self, login, password=None, server=None, timeout=None):
+        if not self._call():
+            return False
+        self._login, self._server = login, server or ''
+        return True
+
+    def shutdown(self):
+        self._initialized = False
+        return True
+
+    def last_error(self):
+        return self._error
+
+    def version(self):
+        return (500, 4000, '1 Jan 2024')
+
+    def terminal_info(self):
+        if not self._call():
+            return None
+        return TerminalInfo(True, True, int(self.latency * 1e6), 4000, 'Simulated MetaTrader 5', 'Simulator', '')
+
+    def account_info(self):
+        if not self._call():
+            return None
+        with self._lock:
+            profit = sum(self._profit(p) for p in self._positions.values())
+        mode = ACCOUNT_MARGIN_MODE_RETAIL_HEDGING if self.hedging else ACCOUNT_MARGIN_MODE_RETAIL_NETTING
+        return AccountInfo(self._login, 0, 100, mode, True, True, round(self.balance, 2), round(profit, 2),
+                           round(self.balance + profit, 2), 'USD', self._server, 'Simulated account', 'Simulator')
+
+    # ---------------- Symbols and ticks ----------------
+    def symbols_total(self):
+        if not self._call():
+            return None
+        return len(self._symbols)
+
+    def symbols_get(self, group=None):
+        if not self._call():
+            return None
+        now = time.time()
+        return tuple(
+            s.info(s.bid, self._ask(s, s.bid), now)
+            for s in self._symbols.values()
+            if group is None or _match_group(s.name, group)
+        )
+
+    def symbol_info(self, symbol):
+        if not self._call():
+            return None
+        s = self._symbols.get(symbol)
+        if s is None:
+            self._error = (RES_E_NOT_FOUND, 'Terminal: Not found')
+            return None
+        tick = self._tick(s)
+        return s.info(tick.bid, tick.ask, tick.time)
+
+    def symbol_info_tick(self, symbol):
+        if not self._call():
+            return None
+        s = self._symbols.get(symbol)
+        if s is None:
+            self._error = (RES_E_NOT_FOUND, 'Terminal: Not found')
+            return None
+        return self._tick(s)
+
+    def symbol_select(self, symbol, enable=True):
+        if not self._call():
+            return False
+        s = self._symbols.get(symbol)
+        if s is None:
+            return False
+        s.visible = bool(enable)
+        return True
+
+    def _ask(self, s, bid):
+        return round(bid + s.spread * s.point, s.digits)
+
+    def _tick(self, s) -> Tick:
+        """Current tick, taking one random-walk step once tick_interval has passed"""
+        now = time.time()
+        if s.tick is not None and now - s.tick_at < self.tick_interval:
+            return s.tick
+        if s.tick is not None:
+            dt = min(now - s.tick_at, 1.0)
+            s.bid = round(s.bid * (1 + self.volatility * self._rng.gauss(0.0, 1.0) * math.sqrt(dt)), s.digits)
+        ask = self._ask(s, s.bid)
+        s.tick = Tick(int(now), s.bid, ask, s.bid, 0, int(now * 1000), 6, 0.0)
+        s.tick_at = now
+        if s.name in self._pending_symbols:
+            self._trigger_pending(s, s.bid, ask)
+        return s.tick
+
+    # ---------------- Book queries ----------------
+    def positions_total(self):
+        if not self._call():
+            return None
+        return len(self._positions)
+
+    def positions_get(self, symbol=None, group=None, ticket=None):
+        if not self._call():
+            return None
+        with self._lock:
+            positions = list(self._positions.values())
+        if ticket is not None:
+            positions = [p for p in positions if p.ticket == ticket]
+        elif symbol is not None:
+            positions = [p for p in positions if p.symbol == symbol]
+        elif group is not None:
+            positions = [p for p in positions if _match_group(p.symbol, group)]
+        return tuple(self._position_info(p) for p in positions)
+
+    def orders_total(self):
+        if not self._call():
+            return None
+        return len(self._orders)
+
+    def orders_get(self, symbol=None, group=None, ticket=None):
+        if not self._call():
+            return None
+        with self._lock:
+            orders = list(self._orders.values())
+        if ticket is not None:
+            orders = [o for o in orders if o.ticket == ticket]
+        elif symbol is not None:
+            orders = [o for o in orders if o.symbol == symbol]
+        elif group is not None:
+            orders = [o for o in orders if _match_group(o.symbol, group)]
+        return tuple(
+            TradeOrder(o.ticket, o.time_msc // 1000, o.time_msc, o.type, ORDER_STATE_PLACED, o.magic, 0,
+                       o.volume, o.volume, o.price, o.sl, o.tp, self._tick(self._symbols[o.symbol]).bid,
+                       o.symbol, o.comment, o.type_time, o.type_filling)
+            for o in orders
+        )
+
+    def _position_info(self, p) -> TradePosition:
+        tick = self._tick(self._symbols[p.symbol])
+        current = tick.bid if p.type == POSITION_TYPE_BUY else tick.ask
+        return TradePosition(
+            p.ticket, p.time_msc // 1000, p.time_msc, p.update_msc // 1000, p.update_msc, p.type, p.magic,
+            p.ticket, 3, p.volume, p.price_open, p.sl, p.tp, current, 0.0, round(self._profit(p, current), 2),
+            p.symbol, p.comment, '',
+        )
+
+    def _profit(self, p, current=None):
+        s = self._symbols[p.symbol]
+        if current is None:
+            tick = s.tick
+            if tick is None:
+                return 0.0
+            current = tick.bid if p.type == POSITION_TYPE_BUY else tick.ask
+        direction = 1 if p.type == POSITION_TYPE_BUY else -1
+        return (current - p.price_open) * direction * p.volume * s.trade_contract_size
+
+    # ---------------- Trading ----------------
+    def order_check(self, request):
+        """Validate a request without executing it; returns the retcode order_send would give"""
+        return self._validate(request)
+
+    def order_send(self, request):
+        if self.order_latency:
+            time.sleep(self.order_latency)
+        if not self._call():
+            return None
+        if not isinstance(request, dict):
+            self._error = (RES_E_INVALID_PARAMS, 'Invalid arguments')
+            return None
+
+        self.orders_sent += 1
+        if self._inject_total:
+            roll = self._rng.random()
+            if roll < self._inject_total:
+                code = next(code for cumulative, code in self._inject if roll < cumulative)
+                return self._result(request, code)
+
+        action = request.get('action')
+        with self._lock:
+            if action == TRADE_ACTION_DEAL:
+                return self._deal(request)
+            if action == TRADE_ACTION_PENDING:
+                return self._place_pending(request)
+            if action == TRADE_ACTION_CLOSE_BY:
+                return self._close_by(request)
+            if action == TRADE_ACTION_REMOVE:
+                return self._remove(request)
+            if action == TRADE_ACTION_SLTP:
+                return self._modify_stops(request)
+        return self._result(request, TRADE_RETCODE_INVALID)
+
+    def _result(self, request, retcode, deal=0, order=0, volume=0.0, price=0.0, tick=None):
+        if tick is None:
+            s = self._symbols.get(request.get('symbol'))
+            tick = s.tick if s is not None else None
+        bid, ask = (tick.bid, tick.ask) if tick is not None else (0.0, 0.0)
+        return OrderSendResult(retcode, deal, order, volume, price, bid, ask,
+                               RETCODE_COMMENTS.get(retcode, 'Request rejected'),
+                               next(self._request_ids), 0, request)
+
+    def _validate(self, request):
+        """Broker-side checks shared by deals and pending orders; returns a failing retcode or None"""
+        s = self._symbols.get(request.get('symbol'))
+        if s is None:
+            return TRADE_RETCODE_INVALID
+        order_type = request.get('type')
+        closing = bool(request.get('position'))
+
+        if s.trade_mode == SYMBOL_TRADE_MODE_DISABLED:
+            return TRADE_RETCODE_TRADE_DISABLED
+        if not closing:
+            if s.trade_mode == SYMBOL_TRADE_MODE_CLOSEONLY:
+                return TRADE_RETCODE_CLOSE_ONLY
+            buying = order_type in (ORDER_TYPE_BUY, ORDER_TYPE_BUY_LIMIT, ORDER_TYPE_BUY_STOP)
+            if s.trade_mode == SYMBOL_TRADE_MODE_LONGONLY and not buying:
+                return TRADE_RETCODE_LONG_ONLY
+            if s.trade_mode == SYMBOL_TRADE_MODE_SHORTONLY and buying:
+                return TRADE_RETCODE_SHORT_ONLY
+
+        volume = request.get('volume') or 0.0
+        if volume < s.volume_min - VOLUME_EPSILON or volume > s.volume_max + VOLUME_EPSILON:
+            return TRADE_RETCODE_INVALID_VOLUME
+        steps = volume / s.volume_step
+        if abs(steps - round(steps)) > 1e-6:
+            return TRADE_RETCODE_INVALID_VOLUME
+
+        filling = request.get('type_filling', ORDER_FILLING_FOK)
+        if request.get('action') == TRADE_ACTION_DEAL and not self._filling_allowed(s, filling):
+            return TRADE_RETCODE_INVALID_FILL
+        return None
+
+    @staticmethod
+    def _filling_allowed(s, filling) -> bool:
+        if filling == ORDER_FILLING_FOK:
+            return bool(s.filling_mode & SYMBOL_FILLING_FOK)
+        if filling == ORDER_FILLING_IOC:
+            return bool(s.filling_mode & SYMBOL_FILLING_IOC)
+        if filling == ORDER_FILLING_RETURN:
+            # Market and exchange execution only fill FOK/IOC
+            return s.trade_exemode in (SYMBOL_TRADE_EXECUTION_REQUEST, SYMBOL_TRADE_EXECUTION_INSTANT)
+        return False
+
+    @staticmethod
+    def _stops_valid(s, is_buy, reference, sl, tp) -> bool:
+        """SL/TP on the right side of the reference price and at least trade_stops_level away"""
+        distance = s.trade_stops_level * s.point
+        if is_buy:
+            return (not sl or sl <= reference - distance) and (not tp or tp >= reference + distance)
+        return (not sl or sl >= reference + distance) and (not tp or tp <= reference - distance)
+
+    def _deal(self, request):
+        retcode = self._validate(request)
+        if retcode is not None:
+            return self._result(request, retcode)
+
+        s = self._symbols[request['symbol']]
+        order_type = request.get('type')
+        if order_type not in (ORDER_TYPE_BUY, ORDER_TYPE_SELL):
+            return self._result(request, TRADE_RETCODE_INVALID)
+        is_buy = order_type == ORDER_TYPE_BUY
+        tick = self._tick(s)
+        price = tick.ask if is_buy else tick.bid
+
+        # Instant execution fills only within `deviation` points of the requested price
+        if s.trade_exemode == SYMBOL_TRADE_EXECUTION_INSTANT:
+            requested = request.get('price') or 0.0
+            if abs(requested - price) > (request.get('deviation') or 0) * s.point + VOLUME_EPSILON:
+                return self._result(request, TRADE_RETCODE_REQUOTE, tick=tick)
+
+        volume = request['volume']
+        ticket = request.get('position')
+        if ticket:
+            position = self._positions.get(ticket)
+            if position is None or position.symbol != s.name:
+                return self._result(request, TRADE_RETCODE_POSITION_CLOSED, tick=tick)
+            if position.type == order_type or volume > position.volume + VOLUME_EPSILON:
+                return self._result(request, TRADE_RETCODE_INVALID_VOLUME, tick=tick)
+            order = next(self._tickets)
+            self._reduce(position, volume, price)
+        else:
+            if not self._stops_valid(s, is_buy, tick.bid if is_buy else tick.ask,
+                                     request.get('sl'), request.get('tp')):
+                return self._result(request, TRADE_RETCODE_INVALID_STOPS, tick=tick)
+            order = next(self._tickets)
+            self._fill(s, order, order_type, volume, price, request)
+
+        return self._result(request, TRADE_RETCODE_DONE, next(self._deals), order, volume, price, tick)
+
+    def _fill(self, s, order, order_type, volume, price, request):
+        """Apply an opening deal to the hedging or netting book"""
+        now_msc = int(time.time() * 1000)
+        if not self.hedging:
+            ticket = self._netting.get(s.name)
+            position = self._positions.get(ticket) if ticket else None
+            if position is not None:
+                if position.type == order_type:
+                    total = position.volume + volume
+                    position.price_open = round(
+                        (position.price_open * position.volume + price * volume) / total, s.digits)
+                    position.volume = round(total, 8)
+                    position.update_msc = now_msc
+                    return
+                remaining = round(volume - position.volume, 8)
+                self._reduce(position, min(volume, position.volume), price)
+                if remaining <= VOLUME_EPSILON:
+                    return
+                volume = remaining  # reversal: the rest opens the opposite way
+
+        p = _Position()
+        p.ticket = order
+        p.symbol = s.name
+        p.type = order_type
+        p.volume = volume
+        p.price_open = price
+        p.sl = request.get('sl') or 0.0
+        p.tp = request.get('tp') or 0.0
+        p.magic = request.get('magic', 0)
+        p.comment = request.get('comment', '')
+        p.time_msc = p.update_msc = now_msc
+        self._positions[order] = p
+        if not self.hedging:
+            self._netting[s.name] = order
+
+    def _reduce(self, position, volume, price):
+        """Close `volume` of a position at price, booking the realized profit"""
+        self.balance += self._profit(position, price) * (volume / position.volume)
+        position.volume = round(position.volume - volume, 8)
+        position.update_msc = int(time.time() * 1000)
+        if position.volume <= VOLUME_EPSILON:
+            del self._positions[position.ticket]
+            if self._netting.get(position.symbol) == position.ticket:
+                del self._netting[position.symbol]
+
+    def _close_by(self, request):
+        if not self.hedging:
+            return self._result(request, TRADE_RETCODE_INVALID)
+        position = self._positions.get(request.get('position'))
+        opposite = self._positions.get(request.get('position_by'))
+        if position is None or opposite is None:
+            return self._result(request, TRADE_RETCODE_POSITION_CLOSED)
+        if position.symbol != opposite.symbol or position.type == opposite.type:
+            return self._result(request, TRADE_RETCODE_INVALID)
+        if not self._symbols[position.symbol].order_mode & SYMBOL_ORDER_CLOSEBY:
+            return self._result(request, TRADE_RETCODE_INVALID)
+
+        volume = min(position.volume, opposite.volume)
+        # Both legs close against each other at the opposite leg's open price
+        price = opposite.price_open
+        self._reduce(position, volume, price)
+        self._reduce(opposite, volume, price)
+        tick = self._symbols[position.symbol].tick
+        return self._result(request, TRADE_RETCODE_DONE, next(self._deals), next(self._tickets), volume, price, tick)
+
+    # ---------------- Pending orders ----------------
+    def _place_pending(self, request):
+        retcode = self._validate(request)
+        if retcode is not None:
+            return self._result(request, retcode)
+
+        s = self._symbols[request['symbol']]
+        order_type = request.get('type')
+        price = request.get('price') or 0.0
+        tick = self._tick(s)
+        distance = s.trade_stops_level * s.point
+        valid = {
+            ORDER_TYPE_BUY_LIMIT: price <= tick.ask - distance,
+            ORDER_TYPE_SELL_LIMIT: price >= tick.bid + distance,
+            ORDER_TYPE_BUY_STOP: price >= tick.ask + distance,
+            ORDER_TYPE_SELL_STOP: price <= tick.bid - distance,
+        }.get(order_type)
+        if valid is None:
+            return self._result(request, TRADE_RETCODE_INVALID, tick=tick)
+        if not valid or price <= 0:
+            return self._result(request, TRADE_RETCODE_INVALID_PRICE, tick=tick)
+        is_buy = order_type in (ORDER_TYPE_BUY_LIMIT, ORDER_TYPE_BUY_STOP)
+        if not self._stops_valid(s, is_buy, price, request.get('sl'), request.get('tp')):
+            return self._result(request, TRADE_RETCODE_INVALID_STOPS, tick=tick)
+
+        o = _Order()
+        o.ticket = next(self._tickets)
+        o.symbol = s.name
+        o.type = order_type
+        o.volume = request['volume']
+        o.price = price
+        o.sl = request.get('sl') or 0.0
+        o.tp = request.get('tp') or 0.0
+        o.magic = request.get('magic', 0)
+        o.comment = request.get('comment', '')
+        o.time_msc = int(time.time() * 1000)
+        o.type_time = request.get('type_time', ORDER_TIME_GTC)
+        o.type_filling = request.get('type_filling', ORDER_FILLING_FOK)
+        self._orders[o.ticket] = o
+        self._pending_symbols[s.name] = self._pending_symbols.get(s.name, 0) + 1
+        return self._result(request, TRADE_RETCODE_DONE, 0, o.ticket, o.volume, price, tick)
+
+    def _remove(self, request):
+        order = self._orders.get(request.get('order'))
+        if order is None:
+            return self._result(request, TRADE_RETCODE_INVALID_ORDER)
+        self._drop_order(order)
+        return self._result(request, TRADE_RETCODE_DONE, 0, order.ticket)
+
+    def _drop_order(self, order):
+        del self._orders[order.ticket]
+        left = self._pending_symbols[order.symbol] - 1
+        if left:
+            self._pending_symbols[order.symbol] = left
+        else:
+            del self._pending_symbols[order.symbol]
+
+    def _trigger_pending(self, s, bid, ask):
+        """Fill pending orders on s whose price the new tick has reached"""
+        with self._lock:
+            for order in [o for o in self._orders.values() if o.symbol == s.name]:
+                hit = {
+                    ORDER_TYPE_BUY_LIMIT: ask <= order.price,
+                    ORDER_TYPE_SELL_LIMIT: bid >= order.price,
+                    ORDER_TYPE_BUY_STOP: ask >= order.price,
+                    ORDER_TYPE_SELL_STOP: bid <= order.price,
+                }[order.type]
+                if hit:
+                    self._drop_order(order)
+                    market_type = ORDER_TYPE_BUY if order.type in (ORDER_TYPE_BUY_LIMIT, ORDER_TYPE_BUY_STOP) \
+                        else ORDER_TYPE_SELL
+                    self._fill(s, order.ticket, market_type, order.volume, order.price,
+                               {'sl': order.sl, 'tp': order.tp, 'magic': order.magic, 'comment': order.comment})
+
+    def _modify_stops(self, request):
+        position = self._positions.get(request.get('position'))
+        if position is None:
+            return self._result(request, TRADE_RETCODE_POSITION_CLOSED)
+        s = self._symbols[position.symbol]
+        tick = self._tick(s)
+        is_buy = position.type == POSITION_TYPE_BUY
+        sl, tp = request.get('sl') or 0.0, request.get('tp') or 0.0
+        if not self._stops_valid(s, is_buy, tick.bid if is_buy else tick.ask, sl, tp):
+            return self._result(request, TRADE_RETCODE_INVALID_STOPS, tick=tick)
+        position.sl, position.tp = sl, tp
+        position.update_msc = int(time.time() * 1000)
+        return self._result(request, TRADE_RETCODE_DONE, 0, 0, position.volume, 0.0, tick)
+
+
+# ---------------- Module-level MetaTrader5 API ----------------
+terminal = SimTerminal()
+
+initialize = terminal.initialize
+login = terminal.login
+shutdown = terminal.shutdown
+last_error = terminal.last_error
+version = terminal.version
+terminal_info = terminal.terminal_info
+account_info = terminal.account_info
+symbols_total = terminal.symbols_total
+symbols_get = terminal.symbols_get
+symbol_info = terminal.symbol_info
+symbol_info_tick = terminal.symbol_info_tick
+symbol_select = terminal.symbol_select
+positions_total = terminal.positions_total
+positions_get = terminal.positions_get
+orders_total = terminal.orders_total
+orders_get = terminal.orders_get
+order_check = terminal.order_check
+order_send = terminal.order_send
+
+
+def configure(**options) -> SimTerminal:
+    """Reset the simulated terminal with new options (see SimTerminal.reset)"""
+    terminal.reset(**options)
+    return terminal
+
+
+def install(config=None):
+    """
+    Register this module as MetaTrader5; must run before app modules import it.
+
+    With a Config, the universe, account mode, latency and injected
+    retcodes are taken from its SIM_* settings.
+    """
+    existing = sys.modules.get('MetaTrader5')
+    if existing is not None and existing is not sys.modules[__name__]:
+        logger.warning("MT5_SIM: MetaTrader5 was already imported, modules holding it keep the real terminal")
+    if config is not None:
+        configure(
+            symbols=config.SIM_SYMBOLS,
+            hedging=config.SIM_ACCOUNT_MODE != 'netting',
+            latency=config.SIM_LATENCY_MS / 1000,
+            order_latency=config.SIM_ORDER_LATENCY_MS / 1000,
+            retcodes=parse_retcodes(config.SIM_RETCODES),
+        )
+    sys.modules['MetaTrader5'] = sys.modules[__name__]
+    return terminal
@@ -0,0 +1,182 @@
+"""
+Connection supervisor for the MT5 terminal.
+
+A background thread sends a heartbeat (terminal_info + account_info) every
+interval. After failure_threshold consecutive failures the circuit opens:
+the handler is marked disconnected and the server answers /trade with 503
+immediately instead of queueing work that would fail slowly inside
+order_send. While open, the supervisor reconnects with exponential backoff
+(plus jitter). A successful reconnect re-syncs only the broker symbols that
+changed and closes the circuit again.
+
+Heartbeats and reconnects go through the MT5 executor like every other
+terminal call, so the measured latency includes any queue wait in front of
+the terminal.
+"""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from app.mt5_executor import ExecutorBusy
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'  # terminal healthy, requests flow
+OPEN = 'open'  # terminal down, requests fail fast
+HALF_OPEN = 'half_open'  # reconnect attempt in progress
+
+
+class ConnectionSupervisor:
+    """Heartbeat, circuit breaker and reconnect loop for one MT5Handler"""
+
+    def __init__(self, handler, executor=None, interval=5.0, timeout=10.0,
+                 failure_threshold=2, backoff_initial=1.0, backoff_max=60.0):
+        self.handler = handler
+        self.executor = executor
+        self.interval = interval
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+
+        self.state = CLOSED if handler.connected else OPEN
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.consecutive_failures = 0
+        self.heartbeats = 0
+        self.heartbeat_failures = 0
+        self.reconnect_attempts = 0
+        self.reconnects = 0
+        self.rejected = 0
+        self.last_heartbeat_ms = None
+        self.last_heartbeat_at = None
+        self.last_error = None
+        self.opened_at = None if handler.connected else time.monotonic()
+
+    @property
+    def available(self) -> bool:
+        """True while the circuit is closed; counts the request as rejected otherwise"""
+        if self.state == CLOSED:
+            return True
+        self.rejected += 1
+        return False
+
+    # ---------------- Lifecycle ----------------
+    def start(self):
+        """Start the supervisor thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='mt5-supervisor', daemon=True)
+        self._thread.start()
+        logger.info("MT5_SUPERVISOR: Heartbeat every %ss, reconnect backoff %s-%ss",
+                    self.interval, self.backoff_initial, self.backoff_max)
+
+    def stop(self):
+        """Stop the supervisor thread"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=self.timeout + 1)
+            self._thread = None
+
+    def check_now(self):
+        """Run the next heartbeat immediately (e.g. after an order got no answer)"""
+        self._wake.set()
+
+    # ---------------- Supervision ----------------
+    def _run(self):
+        while not self._stop.is_set():
+            if self.state == CLOSED:
+                self.heartbeat()
+                delay = self.interval
+            else:
+                delay = self.reconnect()
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def _call(self, fn):
+        if self.executor is None:
+            return fn()
+        return self.executor.call(fn, timeout=self.timeout)
+
+    def heartbeat(self):
+        """Probe the terminal once; opens the circuit after enough consecutive failures"""
+        started = time.perf_counter()
+        try:
+            error = self._call(self.handler.heartbeat)
+        except ExecutorBusy:
+            # A full queue means the terminal is busy, not gone
+            return
+        except FutureTimeout:
+            error = f"no heartbeat answer within {self.timeout}s"
+        except Exception as e:
+            error = str(e)
+
+        self.heartbeats += 1
+        self.last_heartbeat_ms = round((time.perf_counter() - started) * 1000, 3)
+        self.last_heartbeat_at = time.time()
+        if error is None:
+            self.consecutive_failures = 0
+            return
+
+        self.heartbeat_failures += 1
+        self.consecutive_failures += 1
+        self.last_error = error
+        logger.warning("MT5_HEARTBEAT_FAILED: %s (%s/%s)", error, self.consecutive_failures, self.failure_threshold)
+        if self.consecutive_failures >= self.failure_threshold:
+            self._open(error)
+
+    def _open(self, reason):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.handler.connected = False
+        logger.error("MT5_CIRCUIT_OPEN: Terminal unavailable (%s), failing trades fast until reconnected", reason)
+
+    def reconnect(self):
+        """One reconnect attempt; returns the delay before the next step"""
+        self.state = HALF_OPEN
+        self.reconnect_attempts += 1
+        attempt = self.consecutive_failures
+        try:
+            ok = self._call(self.handler.reconnect)
+        except Exception as e:
+            ok = False
+            self.last_error = str(e) or type(e).__name__
+
+        if ok:
+            down_for = time.monotonic() - self.opened_at if self.opened_at else 0.0
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.reconnects += 1
+            self.opened_at = None
+            logger.info("MT5_CIRCUIT_CLOSED: Reconnected after %.1fs", down_for)
+            return self.interval
+
+        self.state = OPEN
+        self.consecutive_failures += 1
+        delay = min(self.backoff_max, self.backoff_initial * 2 ** max(0, attempt - self.failure_threshold))
+        delay *= random.uniform(0.8, 1.2)
+        logger.warning("MT5_RECONNECT_FAILED: Retrying in %.1fs", delay)
+        return delay
+
+    def stats(self) -> dict:
+        """Circuit state and heartbeat metrics"""
+        return {
+            'state': self.state,
+            'heartbeat_ms': self.last_heartbeat_ms,
+            'heartbeat_age_s': round(time.time() - self.last_heartbeat_at, 3) if self.last_heartbeat_at else None,
+            'heartbeats': self.heartbeats,
+            'heartbeat_failures': self.heartbeat_failures,
+            'consecutive_failures': self.consecutive_failures,
+            'down_for_s': round(time.monotonic() - self.opened_at, 3) if self.opened_at else 0.0,
+            'reconnect_attempts': self.reconnect_attempts,
+            'reconnects': self.reconnects,
+            'rejected_requests': self.rejected,
+            'last_error': self.last_error,
+        }
@@ -0,0 +1,231 @@
+"""
+Bounded cache for TradingView -> broker symbol mappings.
+
+Entries are evicted least-recently-used once the size bound is reached and
+expire after a TTL. Negative entries ("no mapping found, use as-is") get their
+own, shorter TTL so a symbol the broker lists later is picked up again.
+
+SymbolCacheStore persists resolved mappings per broker server/account so a
+restart can warm-start instead of re-running every mapping strategy.
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolCache:
+    """Thread-safe LRU cache with separate TTLs for positive and negative entries"""
+
+    def __init__(self, max_size=1024, ttl=86400, negative_ttl=300, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (value, expires_at, negative)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss or expired entry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at, _ = entry
+            if expires_at is not None and self._clock() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, negative=False):
+        """Cache a mapping; negative entries use negative_ttl"""
+        ttl = self.negative_ttl if negative else self.ttl
+        expires_at = self._clock() + ttl if ttl else None
+
+        with self._lock:
+            self._entries[key] = (value, expires_at, negative)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, key):
+        """Drop a single entry if present"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate(self, values, stale_key=None):
+        """
+        Drop negative entries, entries mapped to any of values and keys for
+        which stale_key(key) is true; returns the dropped keys
+        """
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if entry[2] or entry[0] in values or (stale_key is not None and stale_key(key))
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += 1
+            return stale
+
+    def clear(self):
+        """Drop every entry, counting it as one invalidation"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def items(self):
+        """Snapshot of (key, value) pairs, least recently used first"""
+        with self._lock:
+            return [(key, entry[0]) for key, entry in self._entries.items()]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def stats(self) -> dict:
+        """Counters and sizes for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'negative_entries': sum(1 for entry in self._entries.values() if entry[2]),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+
+class SymbolCacheStore:
+    """
+    On-disk copy of resolved symbol mappings for one broker server/account.
+
+    Mappings are written in batches by a background thread and replaced
+    atomically (temp file + os.replace), so a crash never leaves a torn file.
+    """
+
+    def __init__(self, directory, server, account, flush_interval=5.0):
+        safe_server = re.sub(r'[^A-Za-z0-9._-]', '_', server or 'default')
+        self.path = os.path.join(directory, f"{safe_server}_{account}.json")
+        self.server = server
+        self.account = account
+        self.flush_interval = flush_interval
+
+        self._mappings = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def load(self) -> dict:
+        """Read persisted mappings; a missing or unreadable file yields {}"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("SYMBOL_CACHE_WARNING: Ignoring unreadable cache file %s - %s", self.path, e)
+            return {}
+
+        if data.get('server') != self.server or data.get('account') != self.account:
+            return {}
+
+        mappings = data.get('mappings') or {}
+        with self._lock:
+            self._mappings = dict(mappings)
+        return dict(mappings)
+
+    def record(self, key, value):
+        """Remember a mapping; it is written on the next flush"""
+        with self._lock:
+            if self._mappings.get(key) != value:
+                self._mappings[key] = value
+                self._dirty = True
+
+    def discard(self, key):
+        """Forget a mapping that no longer resolves"""
+        with self._lock:
+            if self._mappings.pop(key, None) is not None:
+                self._dirty = True
+
+    def flush(self):
+        """Atomically write the mappings if anything changed since the last flush"""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {
+                'server': self.server,
+                'account': self.account,
+                'saved_at': time.time(),
+                'mappings': dict(self._mappings),
+            }
+            self._dirty = False
+
+        directory = os.path.dirname(self.path) or '.'
+        tmp_path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix='.symbol_cache_', dir=directory)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, indent=2, sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            # Don't leave a temp file behind on every failed flush
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+            with self._lock:
+                self._dirty = True
+            logger.warning("SYMBOL_CACHE_WARNING: Failed to save cache file %s - %s", self.path, e)
+
+    def start(self):
+        """Start the background flush thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='symbol-cache-store', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flush thread and write any pending mappings"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.flush_interval + 1)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
@@ -0,0 +1,334 @@
+"""
+Precomputed lookup structures for broker symbol resolution.
+
+The index is built once from the broker's symbol list (see
+MT5Handler._cache_broker_symbols) so that every mapping strategy becomes a
+dict lookup or a binary search instead of a scan over thousands of symbols.
+Every lookup returns the *first* broker symbol (in broker order) that
+satisfies the strategy, which keeps results identical to the old linear scans.
+
+When the broker list changes, with_changes() derives a new index that shares
+the built structures: removed symbols are skipped at lookup time and added
+ones live in a small overlay index that ranks after every existing symbol,
+as if they had been appended to the broker list.
+"""
+
+import copy
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher, get_close_matches
+from heapq import nlargest
+
+# Changes absorbed by with_changes() before the index is rebuilt from scratch
+COMPACT_MIN_CHANGES = 64
+COMPACT_RATIO = 0.1
+
+
+def _trigrams(text: str) -> set:
+    """Trigrams of text padded so that short symbols still produce grams"""
+    padded = f"  {text}  "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _successor(prefix: str) -> str:
+    """Smallest string that sorts after every string starting with prefix"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class _PrefixRangeIndex:
+    """
+    Sorted array of upper-cased names with a sparse table for range-minimum
+    queries over the original broker positions.
+
+    Finding the first broker symbol that starts with a prefix is a bisect for
+    the matching range plus one O(1) range-minimum lookup.
+    """
+
+    def __init__(self, keys_with_pos):
+        ordered = sorted(keys_with_pos)
+        self.keys = [k for k, _ in ordered]
+        level = array('i', (p for _, p in ordered))
+        self.table = [level]
+        width = 1
+        while 2 * width <= len(ordered):
+            prev = self.table[-1]
+            level = array('i', (min(prev[i], prev[i + width]) for i in range(len(prev) - width)))
+            self.table.append(level)
+            width *= 2
+
+    def first(self, prefix: str, exclude=frozenset()):
+        """Lowest broker position whose key starts with prefix and is not excluded, or None"""
+        if not prefix or not self.keys:
+            return None
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, _successor(prefix), lo)
+        if lo >= hi:
+            return None
+        if exclude:
+            return min((p for p in self.table[0][lo:hi] if p not in exclude), default=None)
+        k = (hi - lo).bit_length() - 1
+        row = self.table[k]
+        return min(row[lo], row[hi - (1 << k)])
+
+
+class _SubstringIndex:
+    """
+    Suffix array over a list of upper-cased texts.
+
+    Suffixes are stored as packed (text, offset) integers and compared lazily
+    through a bisect key, so no suffix strings are kept in memory. A substring
+    lookup costs O(log n) to locate the range plus the number of occurrences.
+    """
+
+    _SHIFT = 12
+    _MASK = (1 << 12) - 1
+
+    def __init__(self, texts):
+        self.texts = texts
+        entries = [
+            (pos << self._SHIFT) | offset
+            for pos, text in enumerate(texts)
+            for offset in range(min(len(text), self._MASK + 1))
+        ]
+        entries.sort(key=self._suffix)
+        self.entries = array('q', entries)
+
+    def _suffix(self, entry: int) -> str:
+        return self.texts[entry >> self._SHIFT][entry & self._MASK:]
+
+    def first(self, needle: str, exclude=frozenset()):
+        """Lowest text position containing needle and not excluded, or None"""
+        if not needle or not self.entries:
+            return None
+        lo = bisect_left(self.entries, needle, key=self._suffix)
+        hi = bisect_left(self.entries, _successor(needle), lo, key=self._suffix)
+        if lo >= hi:
+            return None
+        if exclude:
+            return min((e >> self._SHIFT for e in self.entries[lo:hi] if e >> self._SHIFT not in exclude), default=None)
+        return min(self.entries[i] for i in range(lo, hi)) >> self._SHIFT
+
+
+class SymbolIndex:
+    """Lookup structures over one snapshot of the broker symbol list"""
+
+    def __init__(self, names, normalize, descriptions=None):
+        self.names = list(names)
+        self.descriptions = list(descriptions or [])
+        self.normalize = normalize
+        self.exact = set(self.names)
+        self.upper = {}
+        self.normalized = {}
+        self._dead = frozenset()  # positions of names removed since the build
+        self._extra = None  # SymbolIndex over names added since the build
+
+        uppers = [name.upper() for name in self.names]
+        self._uppers = uppers
+        self._normalized_keys = [normalize(name) for name in self.names]
+        self._positions = {}
+        for pos, name in enumerate(self.names):
+            self._positions.setdefault(name, pos)
+            self.upper.setdefault(uppers[pos], name)
+            self.normalized.setdefault(self._normalized_keys[pos], name)
+
+        self._prefixes = _PrefixRangeIndex((u, pos) for pos, u in enumerate(uppers))
+        self._substrings = _SubstringIndex(uppers)
+
+        # Description index: a suffix array answers "symbol in description",
+        # a dict of whole descriptions answers "description in symbol"
+        descs = [(d or '').upper() for d in self.descriptions]
+        self._descriptions = _SubstringIndex(descs)
+        self._whole_descriptions = {}  # description -> positions sharing it, in broker order
+        for pos, desc in enumerate(descs):
+            if desc:
+                self._whole_descriptions.setdefault(desc, []).append(pos)
+        self._max_description_len = max(map(len, self._whole_descriptions), default=0)
+
+        # Trigram postings over the distinct upper-cased names for fuzzy matching,
+        # and (char, nth occurrence) postings that count common characters the
+        # way SequenceMatcher.quick_ratio() does
+        self._fuzzy_keys = list(self.upper)
+        self._trigrams = defaultdict(list)
+        self._chars = defaultdict(list)
+        for key_id, key in enumerate(self._fuzzy_keys):
+            for gram in _trigrams(key):
+                self._trigrams[gram].append(key_id)
+            for char, count in Counter(key).items():
+                for nth in range(count):
+                    self._chars[char, nth].append(key_id)
+
+    def __len__(self):
+        return len(self.exact)
+
+    def __contains__(self, symbol):
+        return symbol in self.exact
+
+    def with_changes(self, added=(), removed=()):
+        """
+        Index with (name, description) pairs added and names removed.
+
+        The snapshot's sorted and suffix arrays are reused: removed names are
+        skipped at lookup time and added names go into a small overlay index
+        that ranks after the snapshot. Once the changes outgrow a tenth of the
+        snapshot everything is rebuilt, so the overlay stays small.
+        """
+        removed = set(removed)
+        extra = self._extra
+        additions = [
+            (name, desc)
+            for name, desc in zip(extra.names, extra.descriptions) if name not in removed
+        ] if extra is not None else []
+        seen = {name for name, _ in additions}
+        for name, desc in added:
+            if name not in seen and name not in self.exact:
+                seen.add(name)
+                additions.append((name, desc or ''))
+        dead = self._dead | {self._positions[name] for name in removed if name in self._positions}
+
+        if len(dead) + len(additions) > max(COMPACT_MIN_CHANGES, len(self.names) * COMPACT_RATIO):
+            names = [name for pos, name in enumerate(self.names) if pos not in dead]
+            descs = self.descriptions + [''] * (len(self.names) - len(self.descriptions))
+            descs = [desc for pos, desc in enumerate(descs) if pos not in dead]
+            return SymbolIndex(names + [n for n, _ in additions], self.normalize,
+                               descriptions=descs + [d for _, d in additions])
+
+        index = copy.copy(self)
+        index._dead = frozenset(dead)
+        index._extra = SymbolIndex([n for n, _ in additions], self.normalize,
+                                   descriptions=[d for _, d in additions]) if additions else None
+
+        # Drop dict entries that named a removed or re-indexed name, then refill them in order
+        index.upper = dict(self.upper)
+        index.normalized = dict(self.normalized)
+        gone = {self.names[pos] for pos in dead - self._dead}
+        if extra is not None:
+            gone |= extra.exact
+        for lookup in (index.upper, index.normalized):
+            for key in [key for key, name in lookup.items() if name in gone]:
+                del lookup[key]
+        if dead - self._dead:
+            for pos, name in enumerate(self.names):
+                if pos not in dead:
+                    index.upper.setdefault(self._uppers[pos], name)
+                    index.normalized.setdefault(self._normalized_keys[pos], name)
+        if index._extra is not None:
+            for key, name in index._extra.upper.items():
+                index.upper.setdefault(key, name)
+            for key, name in index._extra.normalized.items():
+                index.normalized.setdefault(key, name)
+
+        index.exact = (self.exact - removed) | seen
+        return index
+
+    def case_match(self, symbol: str):
+        """First broker symbol equal to symbol ignoring case"""
+        return self.upper.get(symbol.upper())
+
+    def normalized_match(self, normalized_symbol: str):
+        """First broker symbol whose normalized form equals normalized_symbol"""
+        return self.normalized.get(normalized_symbol)
+
+    def prefix_match(self, symbol: str):
+        """First broker symbol that starts with symbol (case-insensitive)"""
+        pos = self._prefixes.first(symbol.upper(), self._dead)
+        if pos is None:
+            return self._extra.prefix_match(symbol) if self._extra is not None else None
+        return self.names[pos]
+
+    def contains_match(self, symbol: str):
+        """First broker symbol that contains symbol (case-insensitive)"""
+        pos = self._substrings.first(symbol.upper(), self._dead)
+        if pos is None:
+            return self._extra.contains_match(symbol) if self._extra is not None else None
+        return self.names[pos]
+
+    def description_match(self, symbol: str):
+        """
+        First broker symbol whose description contains symbol, or whose
+        description is contained in symbol (both case-insensitive)
+        """
+        needle = symbol.upper()
+        dead = self._dead
+        best = self._descriptions.first(needle, dead)
+
+        whole = self._whole_descriptions
+        for start in range(len(needle)):
+            stop = min(len(needle), start + self._max_description_len)
+            for end in range(start + 1, stop + 1):
+                positions = whole.get(needle[start:end])
+                if positions is None:
+                    continue
+                pos = next((p for p in positions if p not in dead), None) if dead else positions[0]
+                if pos is not None and (best is None or pos < best):
+                    best = pos
+
+        if best is None:
+            return self._extra.description_match(symbol) if self._extra is not None else None
+        return self.names[best]
+
+    def fuzzy_match(self, symbol: str, n: int = 3, cutoff: float = 0.6, candidates: int = 40):
+        """
+        Closest broker symbol by difflib similarity.
+
+        Returns exactly what get_close_matches over every name would. The
+        names sharing the most trigrams with symbol are scored first; the
+        best of them sets a bar that the true winner must reach, so only
+        names whose quick_ratio() upper bound clears that bar are scored
+        with the full ratio().
+        """
+        needle = symbol.upper()
+        pool = self._fuzzy_pool(needle, cutoff, candidates)
+        if self._extra is not None:
+            pool += [key for key in self._extra._fuzzy_pool(needle, cutoff, candidates) if key not in pool]
+
+        seed = get_close_matches(needle, pool, n=1, cutoff=cutoff)
+        threshold = SequenceMatcher(None, seed[0], needle).ratio() if seed else cutoff
+
+        scored = self._fuzzy_candidates(needle, threshold)
+        if self._extra is not None:
+            scored |= self._extra._fuzzy_candidates(needle, threshold)
+        matches = get_close_matches(needle, scored, n=n, cutoff=cutoff)
+        return self.upper[matches[0]] if matches else None
+
+    def _fuzzy_candidates(self, needle: str, threshold: float) -> set:
+        """Upper-cased names whose quick_ratio() against needle reaches threshold"""
+        keys = self._fuzzy_keys
+        if threshold <= 0:
+            common = dict.fromkeys(range(len(keys)), 0)
+        else:
+            # Names sharing no character with needle have a quick_ratio() of 0
+            common = Counter()
+            for char, count in Counter(needle).items():
+                for nth in range(count):
+                    common.update(self._chars.get((char, nth), ()))
+        size = len(needle)
+        return {
+            keys[key_id]
+            for key_id, matched in common.items()
+            if 2.0 * matched / (len(keys[key_id]) + size) >= threshold
+            and not (self._dead and keys[key_id] not in self.upper)
+        }
+
+    def _fuzzy_pool(self, needle: str, cutoff: float, candidates: int) -> list:
+        """Upper-cased names sharing the most trigrams with needle, within reach of cutoff"""
+        shared = Counter()
+        for gram in _trigrams(needle):
+            postings = self._trigrams.get(gram)
+            if postings:
+                shared.update(postings)
+        if not shared:
+            return []
+
+        # A ratio of at least cutoff is impossible once lengths differ this much
+        min_len = len(needle) * cutoff / (2 - cutoff)
+        max_len = len(needle) * (2 - cutoff) / cutoff
+        keys = self._fuzzy_keys
+        if self._dead:
+            # Keys whose every name was removed are no longer in the upper map
+            shared = Counter({key_id: n for key_id, n in shared.items() if keys[key_id] in self.upper})
+        return [
+            keys[key_id]
+            for key_id in nlargest(candidates * 2, shared, key=shared.__getitem__)
+            if min_len <= len(keys[key_id]) <= max_len
+        ][:candidates]
@@ -0,0 +1,153 @@
+"""
+Cached tradeability metadata for the symbols being traded.
+
+verify_symbol used to ask the terminal for symbol_info (and sometimes
+symbol_select) on every order. SymbolMetaCache keeps the last symbol_info of
+every traded or watchlisted symbol and refreshes it from a background
+thread, so the order path checks visibility, trade mode and session state
+with a dict lookup. Symbols seen for the first time, and entries older than
+max_age (e.g. while the refresher cannot reach the terminal), fall back to a
+live symbol_info call.
+
+Session state is learned from the broker: an order rejected with
+MARKET_CLOSED marks the symbol closed. The mark is lifted by the first
+refresh that shows a quote newer than the rejection, and otherwise expires
+after closed_ttl so an order can probe the broker again around the open.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolMetaCache:
+    """symbol_info per symbol, refreshed in the background"""
+
+    def __init__(self, fetch_info, refresh_interval=30.0, max_age=120.0, max_symbols=512, closed_ttl=5.0):
+        self.fetch_info = fetch_info
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.max_symbols = max_symbols
+        self.closed_ttl = closed_ttl
+
+        self._entries = {}  # symbol -> (info, refreshed_at)
+        self._last_used = {}  # symbol -> last time the order path asked for it
+        self._closed = {}  # symbol -> (quote time, monotonic time) when the market was reported closed
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def get(self, symbol):
+        """Cached symbol_info if it is younger than max_age, else None"""
+        entry = self._entries.get(symbol)
+        if entry is None or time.monotonic() - entry[1] > self.max_age:
+            self.misses += 1
+            return None
+        self._last_used[symbol] = time.monotonic()
+        self.hits += 1
+        return entry[0]
+
+    def put(self, symbol, info):
+        """Store a symbol_info fetched by the caller and keep refreshing it"""
+        if info is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if symbol not in self._entries and len(self._entries) >= self.max_symbols:
+                oldest = min(self._entries, key=lambda s: self._last_used.get(s, 0.0))
+                self._forget(oldest)
+            self._entries[symbol] = (info, now)
+            self._last_used.setdefault(symbol, now)
+
+    def discard(self, symbol):
+        """Drop a symbol so the next lookup goes to the terminal"""
+        with self._lock:
+            self._forget(symbol)
+
+    def _forget(self, symbol):
+        self._entries.pop(symbol, None)
+        self._last_used.pop(symbol, None)
+        self._closed.pop(symbol, None)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._last_used.clear()
+            self._closed.clear()
+
+    # ---------------- Session State ----------------
+    def mark_closed(self, symbol):
+        """Remember that the broker reported the market closed for symbol"""
+        entry = self._entries.get(symbol)
+        self._closed[symbol] = (getattr(entry[0], 'time', 0) if entry else 0, time.monotonic())
+        logger.info("SYMBOL_META: %s market closed, rejecting orders for up to %ss", symbol, self.closed_ttl)
+
+    def is_closed(self, symbol) -> bool:
+        closed = self._closed.get(symbol)
+        return closed is not None and time.monotonic() - closed[1] < self.closed_ttl
+
+    # ---------------- Background Refresh ----------------
+    def start(self):
+        """Start the background refresher"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='symbol-meta', daemon=True)
+        self._thread.start()
+        logger.info("SYMBOL_META: Refreshing every %ss, max age %ss", self.refresh_interval, self.max_age)
+
+    def stop(self):
+        """Stop the refresher and drop cached metadata"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.refresh_interval + 1)
+            self._thread = None
+        self.clear()
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def refresh(self):
+        """Re-read symbol_info for every cached symbol once"""
+        for symbol in list(self._entries):
+            try:
+                info = self.fetch_info(symbol)
+            except Exception as e:
+                info = None
+                logger.warning("SYMBOL_META_WARNING: Failed to refresh %s - %s", symbol, e)
+            if info is None:
+                # Keep the old entry; it falls back to live calls once it is older than max_age
+                self.refresh_errors += 1
+                continue
+
+            with self._lock:
+                if symbol not in self._entries:
+                    continue
+                self._entries[symbol] = (info, time.monotonic())
+                closed = self._closed.get(symbol)
+                if closed is not None and getattr(info, 'time', 0) > closed[0]:
+                    del self._closed[symbol]
+                    logger.info("SYMBOL_META: %s is quoting again, accepting orders", symbol)
+            self.refreshes += 1
+
+    def stats(self) -> dict:
+        """Counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            'symbols': len(self._entries),
+            'closed_markets': sum(1 for symbol in list(self._closed) if self.is_closed(symbol)),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'refreshes': self.refreshes,
+            'refresh_errors': self.refresh_errors,
+        }
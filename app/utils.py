@@ -1,8 +1,9 @@
 import os
 import logging
 import json
-from datetime import datetime
-from .config import LOG_DIR, LOG_FORMAT, LOG_LEVEL
+from .signal import parse_signal
+from .config import Config
+from .log_pipeline import configure_logging
 
 def setup_logging(name, log_to_file=True):
     """
@@ -15,26 +16,9 @@ def setup_logging(name, log_to_file=True):
     Returns:
         logging.Logger: Configured logger
     """
-    # Create logger
-    logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, LOG_LEVEL.upper()))
-    
-    # Create formatter
-    formatter = logging.Formatter(LOG_FORMAT)
-    
-    # Create console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # Create file handler if logging to file
-    if log_to_file:
-        log_file = os.path.join(LOG_DIR, f"{name}_{datetime.now().strftime('%Y%m%d')}.log")
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-    
-    return logger
+    # Same queued console/file pipeline as main.py; the first call configures it
+    configure_logging(Config(), log_to_file=log_to_file)
+    return logging.getLogger(name)
 
 
 def save_webhook_url(webhook_url):
@@ -59,39 +43,9 @@ def parse_tradingview_webhook(data):
         data (dict): Webhook data from TradingView
         
     Returns:
-        dict: Validated and processed webhook data
+        Signal: Validated signal, the same object the server executes
+
+    Raises:
+        SignalError: (a ValueError) if the payload is not a valid signal
     """
-    required_fields = ['symbol', 'side']
-    
-    # Check required fields
-    for field in required_fields:
-        if field not in data:
-            raise ValueError(f"Missing required field: {field}")
-    
-    # Get symbol from data
-    symbol = str(data['symbol'])
-    
-    # Remove any existing suffix if present (shouldn't be in TradingView data)
-    from .config import MT5_DEFAULT_SUFFIX
-    if MT5_DEFAULT_SUFFIX and symbol.endswith(MT5_DEFAULT_SUFFIX):
-        symbol = symbol[:-len(MT5_DEFAULT_SUFFIX)]
-    
-    # Normalize and validate fields
-    result = {
-        'symbol': symbol,  # Symbol without suffix - suffix will be added in the MT5 handler
-        'side': str(data['side']).upper(),  # Uppercase side for consistency
-        'volume': float(data.get('volume', 0.01)),
-        'price': float(data.get('price', 0)),
-        'stop_loss': float(data.get('stop_loss', 100)),
-        'take_profit': float(data.get('take_profit', 200)),
-        'comment': str(data.get('comment', 'TradingView Signal'))
-    }
-    
-    # Additional validation
-    if result['volume'] <= 0:
-        raise ValueError(f"Invalid volume: {result['volume']}")
-    
-    if result['side'] not in ['BUY', 'SELL', 'LONG', 'SHORT']:
-        raise ValueError(f"Invalid side: {result['side']}")
-    
-    return result
\ No newline at end of file
+    return parse_signal(data)
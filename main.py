@@ -17,21 +17,16 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app.config import Config
 from app.server import app, initialize_mt5
-
-# Configure logging with UTF-8 encoding to prevent Unicode errors
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('trading_bot.log', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+from app.async_server import AsyncServer
+from app.log_pipeline import configure_logging
 
 # Set encoding for console output to prevent Unicode errors
 if sys.stdout.encoding != 'utf-8':
     sys.stdout.reconfigure(encoding='utf-8', errors='ignore')
 
+# Queue-based logging: console + rotating UTF-8 log file, written off the request path
+configure_logging(Config())
+
 logger = logging.getLogger(__name__)
 
 def setup_ngrok(auth_token, port):
@@ -122,6 +117,16 @@ def run_server():
         
         logger.info("MT5_SUCCESS: MT5 connection established")
         
+        if config.SERVER_MODE == 'asyncio':
+            logger.info(f"SERVER_START: Starting asyncio server on {config.SERVER_HOST}:{config.SERVER_PORT}")
+            AsyncServer(
+                config.SERVER_HOST,
+                config.SERVER_PORT,
+                workers=config.SERVER_WORKERS,
+                keepalive_timeout=config.SERVER_KEEPALIVE_TIMEOUT,
+            ).run()
+            return True
+
         # Start Flask server
         logger.info(f"SERVER_START: Starting Flask server on {config.SERVER_HOST}:{config.SERVER_PORT}")
         app.run(
@@ -0,0 +1,184 @@
+"""
+Compare requests/sec and latency percentiles of the Flask and asyncio servers.
+
+Point it at running servers (one URL per server, optionally labelled):
+
+    python scripts/bench_server.py --url flask=http://127.0.0.1:5000 --url asyncio=http://127.0.0.1:5001
+    python scripts/bench_server.py --url http://127.0.0.1:5001 --path /trade --body '{"symbol": "EURUSD", "action": "buy", "volume": "0.01"}'
+
+or let it start both servers itself, without MT5, to compare the HTTP layers:
+
+    python scripts/bench_server.py --spawn
+
+Each client thread keeps one connection open (--no-keepalive reconnects per
+request), so the numbers reflect keep-alive behaviour as a tunnel sees it.
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import subprocess
+import sys
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def bench(url, path, method, body, requests, concurrency, keepalive):
+    """Closed-loop load from `concurrency` threads; returns a stats dict"""
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    headers = {'Content-Type': 'application/json'} if body else {}
+    if not keepalive:
+        headers['Connection'] = 'close'
+
+    latencies = []
+    errors = [0]
+    statuses = {}
+    remaining = [requests]
+    lock = threading.Lock()
+
+    def client():
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        local, local_status, local_errors = [], {}, 0
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= 1
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                local.append(time.perf_counter() - started)
+                local_status[response.status] = local_status.get(response.status, 0) + 1
+                if not keepalive or response.getheader('Connection', '').lower() == 'close':
+                    conn.close()
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                conn.close()
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+            for status, count in local_status.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'statuses': statuses,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'max_ms': (latencies[-1] if latencies else 0.0) * 1000,
+    }
+
+
+def serve(mode, port):
+    """Run one server without MT5 (used by --spawn)"""
+    logging.disable(logging.CRITICAL)
+    from app.server import app
+    if mode == 'asyncio':
+        from app.async_server import AsyncServer
+        AsyncServer('127.0.0.1', port).run()
+    else:
+        app.run(host='127.0.0.1', port=port, threaded=True)
+
+
+def wait_for(url, timeout=15.0):
+    parts = urlsplit(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=1)
+            conn.request('GET', '/health')
+            conn.getresponse().read()
+            conn.close()
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the /trade, /health and /positions HTTP servers")
+    parser.add_argument('--url', action='append', default=[], help="[label=]base URL of a running server")
+    parser.add_argument('--spawn', action='store_true', help="Start Flask and asyncio servers locally without MT5")
+    parser.add_argument('--path', default='/health')
+    parser.add_argument('--method', default=None, help="Defaults to POST with --body, else GET")
+    parser.add_argument('--body', default=None, help="JSON request body")
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--no-keepalive', action='store_true')
+    parser.add_argument('--serve', choices=['flask', 'asyncio'], help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return 0
+
+    targets = []
+    for entry in args.url:
+        label, _, url = entry.rpartition('=')
+        targets.append((label or url, url))
+
+    processes = []
+    if args.spawn:
+        for mode, port in (('flask', 5901), ('asyncio', 5902)):
+            processes.append(subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), '--serve', mode, '--port', str(port)],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            ))
+            targets.append((mode, f"http://127.0.0.1:{port}"))
+
+    if not targets:
+        parser.error("give at least one --url or use --spawn")
+
+    body = json.dumps(json.loads(args.body)).encode() if args.body else None
+    method = args.method or ('POST' if body else 'GET')
+    try:
+        print(f"{method} {args.path}  {args.requests} requests, {args.concurrency} connections, "
+              f"keep-alive {'off' if args.no_keepalive else 'on'}\n")
+        print(f"{'server':<12} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}  statuses")
+        for label, url in targets:
+            if not wait_for(url):
+                print(f"{label:<12} not reachable at {url}")
+                continue
+            # Warm up connections and code paths before measuring
+            bench(url, args.path, method, body, min(200, args.requests), args.concurrency, not args.no_keepalive)
+            result = bench(url, args.path, method, body, args.requests, args.concurrency, not args.no_keepalive)
+            print(f"{label:<12} {result['rps']:>10.0f} {result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+                  f"{result['max_ms']:>9.2f} {result['errors']:>7}  {result['statuses']}")
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
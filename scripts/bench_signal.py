@@ -0,0 +1,116 @@
+"""
+Microbenchmarks for the compiled signal schema.
+
+Compares the old path (ad-hoc data.get/float() in the webhook, a rebuilt
+signal dict, then float(signal.get(...)) again in send_order) with a single
+parse_signal() pass producing an immutable Signal.
+
+    python scripts/bench_signal.py
+    python scripts/bench_signal.py --number 500000
+"""
+
+import argparse
+import sys
+import os
+import timeit
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.signal import parse_signal
+
+PAYLOADS = {
+    'market': {"symbol": "EURUSD", "action": "buy", "volume": "0.01"},
+    'market_sl_tp': {"symbol": "XAUUSD", "action": "sell", "volume": "0.02", "sl": "2380.00", "tp": "2360.00"},
+    'pending': {"symbol": "GBPUSD", "action": "BUY_LIMIT", "volume": "0.10", "price": "1.2650",
+                "stop_loss": "1.2600", "take_profit": "1.2750"},
+}
+
+
+def legacy_webhook(data):
+    """The pre-schema webhook validation, reduced to its conversions"""
+    action = data.get('action', '').upper()
+    symbol = data.get('symbol')
+    volume = data.get('volume')
+    if not symbol or not volume:
+        raise ValueError("missing field")
+    tp = data.get('tp') or data.get('take_profit')
+    sl = data.get('sl') or data.get('stop_loss')
+    if tp:
+        tp = float(tp)
+    if sl:
+        sl = float(sl)
+    volume = float(volume)
+    if action in ['BUY', 'SELL', 'LONG', 'SHORT']:
+        signal = {"symbol": symbol, "action": 'BUY' if action in ['BUY', 'LONG'] else 'SELL', "volume": volume}
+    elif action in ['BUY_LIMIT', 'SELL_LIMIT', 'BUY_STOP', 'SELL_STOP']:
+        signal = {"symbol": symbol, "action": action, "volume": volume, "price": float(data.get('price'))}
+    else:
+        raise ValueError("unknown action")
+    if tp:
+        signal["take_profit"] = tp
+    if sl:
+        signal["stop_loss"] = sl
+    return signal
+
+
+def legacy_send_order_fields(signal):
+    """send_order's second round of parsing"""
+    action = signal.get("action")
+    symbol = signal.get("symbol")
+    volume = float(signal.get("volume", 0.1))
+    price = float(signal.get("price", 0.0))
+    sl = float(signal.get("stop_loss", 0.0))
+    tp = float(signal.get("take_profit", 0.0))
+    if action == "BUY" or action == "Long":
+        order_type = 0
+    elif action == "SELL" or action == "Short":
+        order_type = 1
+    elif action == "BUY_LIMIT":
+        order_type = 2
+    elif action == "SELL_LIMIT":
+        order_type = 3
+    elif action == "BUY_STOP":
+        order_type = 4
+    else:
+        order_type = 5
+    return symbol, volume, price, sl, tp, order_type
+
+
+ORDER_TYPES = {'BUY': 0, 'SELL': 1, 'BUY_LIMIT': 2, 'SELL_LIMIT': 3, 'BUY_STOP': 4, 'SELL_STOP': 5}
+
+
+def schema_send_order_fields(signal):
+    """send_order reading the parsed Signal"""
+    action, kind, symbol, volume, price, sl, tp = signal
+    return symbol, volume, price, sl, tp, ORDER_TYPES[action]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark signal parsing")
+    parser.add_argument('--number', type=int, default=200000, help="Iterations per measurement")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    def best(fn):
+        return min(timeit.repeat(fn, number=args.number, repeat=args.repeat)) / args.number * 1e9
+
+    print(f"{'payload':<14} {'stage':<22} {'legacy ns':>10} {'schema ns':>10} {'speedup':>8}")
+    for name, payload in PAYLOADS.items():
+        legacy_signal = legacy_webhook(payload)
+        signal = parse_signal(payload)
+        rows = [
+            ('parse', lambda: legacy_webhook(payload), lambda: parse_signal(payload)),
+            ('send_order fields', lambda: legacy_send_order_fields(legacy_signal),
+             lambda: schema_send_order_fields(signal)),
+            ('end to end', lambda: legacy_send_order_fields(legacy_webhook(payload)),
+             lambda: schema_send_order_fields(parse_signal(payload))),
+        ]
+        for stage, legacy, schema in rows:
+            old, new = best(legacy), best(schema)
+            print(f"{name:<14} {stage:<22} {old:>10.0f} {new:>10.0f} {old / new:>7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
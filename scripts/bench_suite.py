@@ -0,0 +1,207 @@
+"""
+Microbenchmark suite for the symbol mapping and order paths, runnable on any OS.
+
+The MetaTrader5 module is replaced by the in-process simulator
+(app/sim_mt5.py) with a generated broker universe. For each universe size
+the suite measures:
+
+- map_symbol cold (cache miss) and warm (cache hit), per winning strategy
+- normalize and fuzzy_map
+- send_order end to end (map, verify, tick, order_send)
+- the /trade Flask route through the test client
+
+Results are compared with a stored baseline. Anything slower than the
+baseline by more than --tolerance is flagged, and the exit status is 1.
+
+    python scripts/bench_suite.py
+    python scripts/bench_suite.py --sizes 1000,10000 --latency-ms 0.2
+    python scripts/bench_suite.py --save-baseline
+
+Baselines are machine-specific: regenerate them (--save-baseline) on the box
+that runs the comparison. Logging is disabled, so the numbers cover the code
+and not log I/O.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import sys
+import os
+import time
+import timeit
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# The simulator has to be registered before app modules import MetaTrader5
+from app import sim_mt5
+sim_mt5.install()
+
+from app import server
+from app.mt5_executor import MT5Executor
+from app.mt5_handler import MT5Handler
+from app.signal import Signal
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+
+# Query -> strategy it is expected to resolve through in the simulated universe
+MAPPING_QUERIES = [
+    ('EURUSD', 'exact'),
+    ('eurusd', 'case'),
+    ('EUR/USD', 'normalized'),
+    ('US30', 'prefix'),
+    ('NAS100', 'contains'),
+    ('EURUSX', 'fuzzy'),
+    ('Wall Street', 'description'),
+    ('QXZQXZQXZ', 'none'),
+]
+
+TRADE_BODY = {"symbol": "EURUSD", "action": "buy", "volume": "0.01"}
+
+
+def measure(fn, repeat):
+    """Best-of-repeat nanoseconds per call, with the loop count calibrated like timeit"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def build_handler(size, latency):
+    """Connected handler over a fresh simulated universe (netting, so the book stays small)"""
+    sim_mt5.configure(symbols=size, hedging=False, latency=latency)
+    handler = MT5Handler(account=1, password='', server='Sim-Bench', path=None,
+                         symbol_cache_dir=None, symbol_check_interval=0)
+    started = time.perf_counter()
+    if not handler.connect():
+        raise RuntimeError("simulated terminal refused to connect")
+    return handler, (time.perf_counter() - started) * 1e9
+
+
+def run_size(size, latency, repeat, results, notes):
+    handler, connect_ns = build_handler(size, latency)
+    results[f"connect@{size}"] = connect_ns
+
+    for query, expected in MAPPING_QUERIES:
+        _, strategy = handler._resolve_symbol(query)
+        if strategy != expected:
+            notes.append(f"{query!r} resolved via {strategy} (expected {expected}) with {size} symbols")
+
+        def cold(query=query):
+            handler.symbol_cache.discard(query)
+            handler.map_symbol(query)
+
+        results[f"map_symbol.cold.{strategy}@{size}"] = measure(cold, repeat)
+        handler.map_symbol(query)
+        results[f"map_symbol.warm.{strategy}@{size}"] = measure(lambda query=query: handler.map_symbol(query), repeat)
+
+    results[f"normalize@{size}"] = measure(lambda: handler.normalize('EURUSD.pro'), repeat)
+    results[f"fuzzy_map@{size}"] = measure(lambda: handler.fuzzy_map('EURUSX'), repeat)
+
+    buy, sell = Signal('BUY', 'EURUSD', 0.01), Signal('SELL', 'EURUSD', 0.01)
+
+    def round_trip():
+        handler.send_order(buy)
+        handler.send_order(sell)
+
+    results[f"send_order@{size}"] = measure(round_trip, repeat) / 2
+
+    # /trade through Flask with the production executor thread, no journal or dedup
+    executor = MT5Executor(max_queue=1000)
+    executor.start()
+    handler.executor = executor
+    server.mt5_handler, server.mt5_executor = handler, executor
+    server.signal_journal = server.idempotency = server.coalescer = None
+    client = server.app.test_client()
+    bodies = [dict(TRADE_BODY, action='buy'), dict(TRADE_BODY, action='sell')]
+
+    def trade():
+        for body in bodies:
+            response = client.post('/trade', json=body)
+            if response.status_code != 200:
+                raise RuntimeError(f"/trade returned {response.status_code}: {response.get_json()}")
+
+    try:
+        results[f"trade_route@{size}"] = measure(trade, repeat) / 2
+    finally:
+        executor.stop()
+        server.mt5_handler = server.mt5_executor = None
+        handler.disconnect()
+
+
+def compare(results, baseline, tolerance):
+    """Print current vs baseline; returns the names of regressed benchmarks"""
+    regressions = []
+    print(f"{'benchmark':<42} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<42} {'-':>12} {format_ns(current):>12} {'new':>7}")
+            continue
+        ratio = current / base if base else float('inf')
+        flag = ''
+        if ratio > 1 + tolerance:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"{name:<42} {format_ns(base):>12} {format_ns(current):>12} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def format_ns(ns):
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f} ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f} us"
+    return f"{ns:.0f} ns"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark symbol mapping and order paths against a simulated MT5")
+    parser.add_argument('--sizes', default='1000,10000,50000', help="Comma-separated broker universe sizes")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Simulated latency per MT5 call")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.3, help="Allowed slowdown before flagging (0.3 = 30%%)")
+    parser.add_argument('--save-baseline', action='store_true', help="Write the results as the new baseline")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+
+    results, notes = {}, []
+    for size in sizes:
+        print(f"Running {size} symbols...", file=sys.stderr)
+        run_size(size, args.latency_ms / 1000, args.repeat, results, notes)
+
+    meta = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'latency_ms': args.latency_ms,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'meta': meta, 'results': {k: round(v, 1) for k, v in results.items()}}, f, indent=2)
+            f.write('\n')
+        print(f"Baseline saved to {args.baseline}")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        baseline = stored.get('results', {})
+        if stored.get('meta', {}).get('latency_ms') != args.latency_ms:
+            notes.append(f"baseline was recorded with latency_ms={stored['meta'].get('latency_ms')}")
+
+    regressions = compare(results, baseline, args.tolerance)
+    for note in notes:
+        print(f"note: {note}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+"""
+Open-loop load generator for the webhook server.
+
+Requests are scheduled at a fixed rate (or with Poisson arrivals) whether
+or not earlier ones have completed, the way TradingView keeps firing alerts
+at a slow bridge. Latency is measured from each request's *scheduled* send
+time, so time spent queued behind a stalled server is counted. A closed-loop
+client stops sending while the server stalls and under-reports that time
+(coordinated omission). The uncorrected service time is reported next to it.
+
+Payloads are a weighted mix modelled on the README alert examples:
+
+    market     {"symbol": "EURUSD", "action": "buy", "volume": "0.01"}
+    strategy   {{strategy.order.action}} / {{strategy.order.contracts}} style alerts
+    sltp       {"symbol": "XAUUSD", "action": "sell", "volume": "0.02", "sl": "2380.00", "tp": "2360.00"}
+    pending    BUY_LIMIT / SELL_STOP away from the market
+    close      {"action": "close", "volume": "0.01"} or "all"
+    duplicate  an alert with a "time" field sent twice (duplicate protection)
+    health     GET /health
+
+Run it against a local server, e.g. one backed by the simulator:
+
+    MT5_BACKEND=sim python main.py --no-ngrok
+    python scripts/load_test.py --rate 200 --duration 30
+    python scripts/load_test.py --rate 100,200,400,800 --duration 20 --mix market=8,close=1,health=1
+    python scripts/load_test.py --url http://127.0.0.1:5001 --json asyncio.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import os
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+DEFAULT_MIX = 'market=50,strategy=15,sltp=10,pending=5,close=10,duplicate=5,health=5'
+DEFAULT_SYMBOLS = 'EURUSD,GBPUSD,USDJPY,XAUUSD,BTCUSD'
+
+# Percentiles printed in the latency spectrum
+SPECTRUM = (50, 75, 90, 95, 99, 99.9, 99.99, 100)
+
+
+# ---------------- Payloads ----------------
+class PayloadMix:
+    """Draws (kind, method, path, body) tuples according to the configured weights"""
+
+    def __init__(self, mix, symbols, seed):
+        self.rng = random.Random(seed)
+        self.symbols = symbols
+        self.kinds, self.weights = [], []
+        for part in mix.split(','):
+            kind, _, weight = part.partition('=')
+            kind = kind.strip()
+            if not hasattr(self, f"_{kind}"):
+                raise ValueError(f"unknown payload kind: {kind}")
+            self.kinds.append(kind)
+            self.weights.append(float(weight or 1))
+        self._repeat = None  # duplicate alert waiting for its second delivery
+
+    def next(self):
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        return (kind,) + getattr(self, f"_{kind}")()
+
+    def _trade(self, body):
+        return 'POST', '/trade', json.dumps(body).encode()
+
+    def _market(self):
+        return self._trade({"symbol": self.rng.choice(self.symbols), "action": self.rng.choice(('buy', 'sell')),
+                            "volume": "0.01"})
+
+    def _strategy(self):
+        return self._trade({"symbol": self.rng.choice(self.symbols), "action": self.rng.choice(('long', 'short')),
+                            "volume": f"{self.rng.randint(1, 5) / 100:.2f}"})
+
+    def _sltp(self):
+        return self._trade({"symbol": "XAUUSD", "action": "sell", "volume": "0.02", "sl": "2380.00", "tp": "2360.00"})
+
+    def _pending(self):
+        if self.rng.random() < 0.5:
+            return self._trade({"symbol": "EURUSD", "action": "buy_limit", "volume": "0.01", "price": "1.0000"})
+        return self._trade({"symbol": "XAUUSD", "action": "sell_stop", "volume": "0.01", "price": "2000.00"})
+
+    def _close(self):
+        volume = "all" if self.rng.random() < 0.2 else "0.01"
+        return self._trade({"symbol": self.rng.choice(self.symbols), "action": "close", "volume": volume})
+
+    def _duplicate(self):
+        if self._repeat is not None:
+            body, self._repeat = self._repeat, None
+            return body
+        alert = {"symbol": self.rng.choice(self.symbols), "action": "buy", "volume": "0.01",
+                 "time": datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')}
+        self._repeat = self._trade(alert)
+        return self._repeat
+
+    def _health(self):
+        return 'GET', '/health', None
+
+
+# ---------------- HTTP client ----------------
+class Connection:
+    """Minimal keep-alive HTTP/1.1 client over asyncio streams"""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+        if body is not None:
+            head += f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+        self.writer.write(head.encode('latin-1') + b"\r\n" + (body or b''))
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by server")
+        status = int(status_line.split()[1])
+        length, close = None, status_line.startswith(b'HTTP/1.0')
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            name = name.strip().lower()
+            if name == 'content-length':
+                length = int(value)
+            elif name == 'connection':
+                close = value.strip().lower() == 'close'
+        if length is not None:
+            await self.reader.readexactly(length)
+        else:
+            await self.reader.read()
+            close = True
+        if close:
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+# ---------------- Load generation ----------------
+async def run_step(url, rate, duration, warmup, connections, mix, poisson, timeout):
+    """
+    Fire requests open-loop at `rate` per second for warmup + duration seconds.
+
+    Returns one (kind, scheduled, sent, done, status) record per request
+    scheduled after the warm-up; status is None for errors and timeouts.
+    """
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    idle = asyncio.Queue()
+    for _ in range(connections):
+        idle.put_nowait(Connection(host, port))
+
+    records, tasks = [], set()
+    loop = asyncio.get_running_loop()
+    started = loop.time() + 0.05
+    measure_from = started + warmup
+    end = measure_from + duration
+
+    async def fire(kind, method, path, body, scheduled):
+        # Waiting for a free connection counts as latency: the alert was due at `scheduled`
+        conn = await idle.get()
+        sent = loop.time()
+        try:
+            status = await asyncio.wait_for(conn.request(method, path, body), timeout)
+        except (OSError, ValueError, IndexError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            conn.close()
+            status = None
+        done = loop.time()
+        idle.put_nowait(conn)
+        if scheduled >= measure_from:
+            records.append((kind, scheduled, sent, done, status))
+
+    rng = random.Random(1)
+    scheduled = started
+    while scheduled < end:
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        kind, method, path, body = mix.next()
+        task = asyncio.ensure_future(fire(kind, method, path, body, scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        scheduled += rng.expovariate(rate) if poisson else 1.0 / rate
+
+    if tasks:
+        await asyncio.wait(tasks, timeout=timeout + 5)
+    while not idle.empty():
+        idle.get_nowait().close()
+    return records
+
+
+# ---------------- Reporting ----------------
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank: the smallest value with at least pct% of the samples at or below it
+    index = min(len(sorted_values) - 1, max(0, math.ceil(round(pct * len(sorted_values) / 100, 6)) - 1))
+    return sorted_values[index]
+
+
+def summarize(records, rate, duration):
+    corrected = sorted((done - scheduled) * 1000 for _, scheduled, _, done, _ in records)
+    service = sorted((done - sent) * 1000 for _, _, sent, done, _ in records)
+    statuses, kinds = {}, {}
+    for kind, scheduled, _, done, status in records:
+        key = str(status) if status is not None else 'error'
+        statuses[key] = statuses.get(key, 0) + 1
+        entry = kinds.setdefault(kind, {'count': 0, 'errors': 0, 'latencies': []})
+        entry['count'] += 1
+        entry['errors'] += status is None or status >= 500
+        entry['latencies'].append((done - scheduled) * 1000)
+
+    errors = sum(count for key, count in statuses.items() if key == 'error' or key.startswith('5'))
+    last_done = max((done for *_, done, _ in records), default=0.0)
+    first = min((scheduled for _, scheduled, *_ in records), default=0.0)
+    elapsed = max(last_done - first, duration) if records else duration
+    return {
+        'target_rate': rate,
+        'requests': len(records),
+        'throughput': len(records) / elapsed if elapsed else 0.0,
+        'errors': errors,
+        'error_rate': errors / len(records) if records else 0.0,
+        'statuses': statuses,
+        'corrected_ms': {str(p): round(percentile(corrected, p), 3) for p in SPECTRUM},
+        'service_ms': {str(p): round(percentile(service, p), 3) for p in SPECTRUM},
+        'kinds': {
+            kind: {
+                'count': entry['count'],
+                'errors': entry['errors'],
+                'p50_ms': round(percentile(sorted(entry['latencies']), 50), 3),
+                'p99_ms': round(percentile(sorted(entry['latencies']), 99), 3),
+            }
+            for kind, entry in sorted(kinds.items())
+        },
+    }
+
+
+def print_step(summary):
+    print(f"\nrate {summary['target_rate']:g}/s: {summary['requests']} requests, "
+          f"{summary['throughput']:.1f}/s completed, errors {summary['errors']} ({summary['error_rate']:.2%})")
+    print(f"statuses: {summary['statuses']}")
+    print(f"{'percentile':>12} {'corrected ms':>14} {'service ms':>12}")
+    for p in SPECTRUM:
+        label = 'max' if p == 100 else f"p{p:g}"
+        print(f"{label:>12} {summary['corrected_ms'][str(p)]:>14.2f} {summary['service_ms'][str(p)]:>12.2f}")
+    print(f"{'kind':<10} {'count':>7} {'errors':>7} {'p50 ms':>9} {'p99 ms':>9}")
+    for kind, entry in summary['kinds'].items():
+        print(f"{kind:<10} {entry['count']:>7} {entry['errors']:>7} {entry['p50_ms']:>9.2f} {entry['p99_ms']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop load test for /trade and /health")
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help="Base URL of the server")
+    parser.add_argument('--rate', default='100', help="Requests per second; a comma-separated list runs one step per rate")
+    parser.add_argument('--duration', type=float, default=30.0, help="Measured seconds per step")
+    parser.add_argument('--warmup', type=float, default=3.0, help="Unmeasured seconds before each step")
+    parser.add_argument('--connections', type=int, default=64, help="Maximum concurrent connections")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="kind=weight,... (market, strategy, sltp, pending, close, duplicate, health)")
+    parser.add_argument('--symbols', default=DEFAULT_SYMBOLS)
+    parser.add_argument('--poisson', action='store_true', help="Exponential inter-arrival times instead of a fixed interval")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help="Write the step summaries to this file")
+    args = parser.parse_args()
+
+    rates = [float(rate) for rate in args.rate.split(',') if rate.strip()]
+    mix = PayloadMix(args.mix, [s.strip() for s in args.symbols.split(',') if s.strip()], args.seed)
+
+    print(f"open-loop load on {args.url}: {args.duration:g}s per step after {args.warmup:g}s warm-up, "
+          f"up to {args.connections} connections, {'poisson' if args.poisson else 'fixed'} arrivals")
+    print("corrected = from scheduled send time (includes queueing); service = from actual send")
+
+    summaries = []
+    for rate in rates:
+        records = asyncio.run(run_step(args.url, rate, args.duration, args.warmup, args.connections, mix,
+                                       args.poisson, args.timeout))
+        summary = summarize(records, rate, args.duration)
+        summaries.append(summary)
+        print_step(summary)
+
+    if len(summaries) > 1:
+        print(f"\n{'rate/s':>8} {'done/s':>8} {'errors':>7} {'p50 ms':>9} {'p99 ms':>9} {'p99.9 ms':>9}")
+        for s in summaries:
+            c = s['corrected_ms']
+            print(f"{s['target_rate']:>8g} {s['throughput']:>8.1f} {s['error_rate']:>7.2%} "
+                  f"{c['50']:>9.2f} {c['99']:>9.2f} {c['99.9']:>9.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'url': args.url, 'mix': args.mix, 'steps': summaries}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
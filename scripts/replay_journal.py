@@ -0,0 +1,86 @@
+"""
+Replay signals that were journaled but never executed.
+
+Run this after a crash, before restarting the server. By default only
+signals that never started executing and are younger than --max-age are
+replayed; signals that started without a recorded result may already have
+reached the broker and are listed but skipped unless --include-started.
+
+    python scripts/replay_journal.py --dry-run
+    python scripts/replay_journal.py --max-age 120
+"""
+
+import argparse
+import logging
+import sys
+import os
+import time
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import Config
+from app.journal import SignalJournal, pending_signals
+from app.mt5_handler import MT5Handler
+from app.signal_status import result_fields
+
+REPLAYABLE_METHODS = {'send_order', 'bulk_close'}
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('replay_journal')
+
+
+def main():
+    config = Config()
+    parser = argparse.ArgumentParser(description="Replay unexecuted signals from the signal journal")
+    parser.add_argument('--path', default=config.SIGNAL_JOURNAL_PATH, help="Journal file")
+    parser.add_argument('--max-age', type=float, default=600, help="Skip signals older than this many seconds")
+    parser.add_argument('--include-started', action='store_true',
+                        help="Also replay signals that started executing without a recorded result")
+    parser.add_argument('--dry-run', action='store_true', help="List what would be replayed and exit")
+    args = parser.parse_args()
+
+    if not args.path or not os.path.exists(args.path):
+        print(f"No journal found at '{args.path}'")
+        return 1
+
+    now = time.time()
+    to_replay = []
+    for entry in pending_signals(args.path):
+        age = now - entry['ts']
+        label = f"{entry['id']} {entry['method']}{tuple(entry['args'])} age={age:.0f}s"
+        if entry['method'] not in REPLAYABLE_METHODS:
+            print(f"SKIP (unknown method)  {label}")
+        elif entry['started'] and not args.include_started:
+            print(f"SKIP (outcome unknown) {label}")
+        elif age > args.max_age:
+            print(f"SKIP (too old)         {label}")
+        else:
+            print(f"REPLAY                 {label}")
+            to_replay.append(entry)
+
+    if args.dry_run or not to_replay:
+        print(f"\n{len(to_replay)} signal(s) to replay" + (" (dry run)" if args.dry_run else ""))
+        return 0
+
+    handler = MT5Handler.from_config(config)
+    if not handler.connect():
+        print("Failed to connect to MT5")
+        return 1
+
+    journal = SignalJournal(args.path, fsync=config.SIGNAL_JOURNAL_FSYNC).open()
+    try:
+        for entry in to_replay:
+            journal.log_executing(entry['id'])
+            result = getattr(handler, entry['method'])(*entry['args'])
+            fields = result_fields(result)
+            journal.log_result(entry['id'], fields, replayed=True)
+            print(f"{entry['id']}: {'OK' if fields['success'] else 'FAILED'} {fields}")
+    finally:
+        journal.close()
+        handler.disconnect()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# The simulator has to be registered before app modules import MetaTrader5
+from app import sim_mt5
+sim_mt5.install()
+
+from app.mt5_handler import MT5Handler
+
+
+@pytest.fixture
+def sim():
+    """Fresh simulated terminal: a small netting universe with no latency"""
+    return sim_mt5.configure(symbols=200, hedging=False)
+
+
+@pytest.fixture
+def handler(sim):
+    """Handler connected to the simulated terminal, without background threads or persistence"""
+    h = MT5Handler(account=1, password='', server='Sim-Test', path=None,
+                   symbol_cache_dir=None, symbol_check_interval=0, symbol_meta_refresh=0)
+    assert h.connect()
+    yield h
+    h.disconnect()
+
+
+@pytest.fixture
+def trade_server(handler, tmp_path):
+    """
+    app.server wired to the simulated handler with an executor and a journal.
+
+    Tests switch on async mode or a coalescer through the returned module.
+    """
+    from app import server
+    from app.journal import SignalJournal
+    from app.mt5_executor import MT5Executor
+    from app.signal_status import SignalStatusStore
+
+    executor = MT5Executor(max_queue=1000)
+    executor.start()
+    handler.executor = executor
+    server.mt5_handler, server.mt5_executor = handler, executor
+    server.signal_status = SignalStatusStore()
+    server.signal_journal = SignalJournal(str(tmp_path / 'signals.jsonl')).open()
+    server.idempotency = server.coalescer = server.supervisor = server.position_book = None
+    server.async_trade_mode = False
+    yield server
+    if server.coalescer is not None:
+        server.coalescer.stop()
+    executor.stop()
+    server.signal_journal.close()
+    server.mt5_handler = server.mt5_executor = server.signal_journal = server.coalescer = None
+    server.async_trade_mode = False
+
+
+@pytest.fixture
+def hedging_handler():
+    """Handler on a simulated hedging account, where opposite tickets can be closed by each other"""
+    sim_mt5.configure(symbols=200, hedging=True)
+    h = MT5Handler(account=1, password='', server='Sim-Test', path=None,
+                   symbol_cache_dir=None, symbol_check_interval=0, symbol_meta_refresh=0)
+    assert h.connect()
+    yield h
+    h.disconnect()
@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+from app.async_server import AsyncServer
+
+
+async def exchange(app_server, raw_requests):
+    """Send raw requests over one connection; returns (status, headers, body) per response"""
+    listener = await asyncio.start_server(app_server._handle_connection, '127.0.0.1', 0)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    responses = []
+    try:
+        for raw in raw_requests:
+            writer.write(raw)
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), 5)
+            if not status_line:
+                break
+            headers = {}
+            while (line := await reader.readline()) not in (b'\r\n', b''):
+                name, _, value = line.decode().partition(':')
+                headers[name.strip().lower()] = value.strip()
+            length = 0 if raw.startswith(b'HEAD') else int(headers.get('content-length', 0))
+            body = await reader.readexactly(length)
+            responses.append((int(status_line.split()[1]), headers, body))
+    finally:
+        writer.close()
+        listener.close()
+        await listener.wait_closed()
+    return responses
+
+
+def request(method, path, body=None, headers=()):
+    data = json.dumps(body).encode() if body is not None else b''
+    lines = [f"{method} {path} HTTP/1.1", "Host: test", *headers]
+    if data:
+        lines += ["Content-Type: application/json", f"Content-Length: {len(data)}"]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode() + data
+
+
+def test_routes_share_one_keep_alive_connection(trade_server, sim):
+    responses = asyncio.run(exchange(AsyncServer('127.0.0.1', 0), [
+        request('POST', '/trade', {"symbol": "EURUSD", "action": "buy", "volume": "0.01"}),
+        request('HEAD', '/health'),
+        request('GET', '/positions?symbol=EURUSD'),
+        request('GET', '/metrics'),
+        request('GET', '/nope'),
+        request('GET', '/trade'),
+    ]))
+    statuses = [status for status, _, _ in responses]
+    assert statuses == [200, 200, 200, 200, 404, 405]
+    assert json.loads(responses[0][2])['status'] == 'success'
+    assert responses[1][1]['content-length'] != '0' and responses[1][2] == b''
+    assert [p['symbol'] for p in json.loads(responses[2][2])['positions']] == ['EURUSD']
+    assert b'tvbridge_' in responses[3][2]
+    assert all(headers['connection'] == 'keep-alive' for _, headers, _ in responses)
+    assert sim.orders_sent == 1
+
+
+def test_async_trade_status_lookup(trade_server):
+    trade_server.async_trade_mode = True
+    accepted, = asyncio.run(exchange(AsyncServer('127.0.0.1', 0), [
+        request('POST', '/trade', {"symbol": "EURUSD", "action": "sell", "volume": "0.01"}),
+    ]))
+    assert accepted[0] == 202
+    signal_id = json.loads(accepted[2])['signal_id']
+    status, _, body = asyncio.run(exchange(AsyncServer('127.0.0.1', 0), [request('GET', f'/trade/{signal_id}')]))[0]
+    assert status == 200 and json.loads(body)['signal_id'] == signal_id
+
+
+def test_malformed_requests_are_answered_and_closed(trade_server):
+    server = AsyncServer('127.0.0.1', 0, max_body=16)
+    too_large, = asyncio.run(exchange(server, [
+        request('POST', '/trade', {"symbol": "EURUSD", "action": "buy", "volume": "0.01"}),
+        request('HEAD', '/health'),
+    ]))
+    assert too_large[0] == 413 and too_large[1]['connection'] == 'close'
+
+    chunked, = asyncio.run(exchange(server, [b"POST /trade HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"]))
+    assert chunked[0] == 411
+    bad, = asyncio.run(exchange(server, [b"NONSENSE\r\n\r\n"]))
+    assert bad[0] == 400
+
+
+def test_connection_close_is_honoured(trade_server):
+    responses = asyncio.run(exchange(AsyncServer('127.0.0.1', 0), [
+        request('GET', '/health', headers=["Connection: close"]),
+        request('GET', '/health'),
+    ]))
+    assert len(responses) == 1 and responses[0][1]['connection'] == 'close'
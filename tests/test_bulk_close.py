@@ -0,0 +1,35 @@
+from app import sim_mt5
+from app.signal import Signal
+
+
+def open_positions(handler, *actions):
+    for action in actions:
+        assert handler.send_order(Signal(action, 'EURUSD', 0.1)).success
+
+
+def test_close_by_nets_opposite_tickets(hedging_handler):
+    open_positions(hedging_handler, 'BUY', 'SELL')
+    report = hedging_handler.bulk_close('EURUSD')
+    assert report['success'] and report['orders_sent'] == 1
+    assert [r['method'] for r in report['results']] == ['close_by']
+
+
+def test_rejected_close_by_falls_back_to_deals(hedging_handler, monkeypatch):
+    open_positions(hedging_handler, 'BUY', 'BUY', 'SELL')
+    terminal = sim_mt5.terminal
+    monkeypatch.setattr(terminal, '_close_by', lambda request: terminal._result(request, sim_mt5.TRADE_RETCODE_INVALID))
+
+    report = hedging_handler.bulk_close('EURUSD')
+    assert report['success']
+    assert report['positions'] == 3 and report['closed'] == 3 and report['orders_sent'] == 4
+    assert [r for r in report['results'] if r.get('superseded')][0]['method'] == 'close_by'
+    assert hedging_handler.close_positions('EURUSD') is True
+    assert terminal.positions_get(symbol='EURUSD') == ()
+
+
+def test_close_by_skipped_when_symbol_does_not_allow_it(hedging_handler):
+    sim_mt5.terminal.set_symbol('EURUSD', order_mode=127 & ~sim_mt5.SYMBOL_ORDER_CLOSEBY)
+    open_positions(hedging_handler, 'BUY', 'SELL')
+    report = hedging_handler.bulk_close('EURUSD')
+    assert report['success']
+    assert [r['method'] for r in report['results']] == ['close', 'close']
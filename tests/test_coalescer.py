@@ -0,0 +1,103 @@
+import threading
+
+import pytest
+
+from app.coalescer import SignalCoalescer
+from app.signal import Signal
+
+
+def recorder():
+    sent = []
+
+    def execute(signal, signal_ids):
+        sent.append((signal.action, signal.symbol, signal.volume, list(signal_ids)))
+        return f"result {len(sent)}"
+
+    return sent, execute
+
+
+def test_same_symbol_signals_are_netted_into_one_order():
+    sent, execute = recorder()
+    coalescer = SignalCoalescer(execute, window=0.1)
+    coalescer.start()
+    try:
+        futures = [
+            coalescer.submit('a', Signal('BUY', 'EURUSD', 0.3)),
+            coalescer.submit('b', Signal('SELL', 'EURUSD', 0.1)),
+            coalescer.submit('c', Signal('BUY', 'eurusd', 0.05)),
+            coalescer.submit('d', Signal('SELL', 'XAUUSD', 0.02)),
+        ]
+        results = [future.result(timeout=5) for future in futures]
+    finally:
+        coalescer.stop()
+
+    assert sorted(sent) == [('BUY', 'EURUSD', 0.25, ['a', 'b', 'c']), ('SELL', 'XAUUSD', 0.02, ['d'])]
+    assert results[0] == results[1] == results[2] != results[3]
+    assert coalescer.stats()['orders_sent'] == 2
+
+
+def test_opposite_signals_cancel_out_without_an_order():
+    sent, execute = recorder()
+    coalescer = SignalCoalescer(execute, window=0.05)
+    coalescer.start()
+    try:
+        futures = [coalescer.submit('a', Signal('BUY', 'EURUSD', 0.1)), coalescer.submit('b', Signal('SELL', 'EURUSD', 0.1))]
+        result = futures[0].result(timeout=5)
+    finally:
+        coalescer.stop()
+    assert sent == []
+    assert result and result.comment == 'Netted out' and futures[1].result() is result
+
+
+def test_flush_on_close_executes_the_open_batch_now():
+    sent, execute = recorder()
+    coalescer = SignalCoalescer(execute, window=60)
+    coalescer.start()
+    try:
+        future = coalescer.submit('a', Signal('BUY', 'XAUUSD', 0.01))
+        other = coalescer.submit('b', Signal('BUY', 'EURUSD', 0.01))
+        coalescer.flush('xauusd')
+        assert future.done() and sent == [('BUY', 'XAUUSD', 0.01, ['a'])]
+        assert not other.done()
+    finally:
+        coalescer.stop()
+    assert other.result(timeout=5) == 'result 2'
+
+
+def test_flush_waits_for_a_batch_already_executing():
+    started, release = threading.Event(), threading.Event()
+
+    def execute(signal, signal_ids):
+        started.set()
+        release.wait(5)
+        return 'filled'
+
+    coalescer = SignalCoalescer(execute, window=0.01)
+    coalescer.start()
+    try:
+        future = coalescer.submit('a', Signal('BUY', 'XAUUSD', 0.01))
+        assert started.wait(5)
+        flushed = threading.Thread(target=coalescer.flush, args=('XAUUSD',))
+        flushed.start()
+        flushed.join(0.1)
+        assert flushed.is_alive()
+        release.set()
+        flushed.join(5)
+        assert not flushed.is_alive() and future.result() == 'filled'
+    finally:
+        coalescer.stop()
+
+
+def test_failed_batch_fails_every_signal_and_stopped_coalescer_refuses():
+    def execute(signal, signal_ids):
+        raise RuntimeError("terminal gone")
+
+    coalescer = SignalCoalescer(execute, window=0.01)
+    coalescer.start()
+    futures = [coalescer.submit(i, Signal('BUY', 'EURUSD', 0.01)) for i in 'ab']
+    for future in futures:
+        with pytest.raises(RuntimeError, match="terminal gone"):
+            future.result(timeout=5)
+    coalescer.stop()
+    with pytest.raises(RuntimeError):
+        coalescer.submit('c', Signal('BUY', 'EURUSD', 0.01))
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+from app import sim_mt5
+from app.execution_profile import ExecutionProfile, filling_mode
+from app.signal import parse_signal
+
+
+def info(filling, exemode=sim_mt5.SYMBOL_TRADE_EXECUTION_MARKET, order_mode=0):
+    return SimpleNamespace(name='EURUSD', digits=5, volume_step=0.01, filling_mode=filling,
+                           trade_exemode=exemode, order_mode=order_mode)
+
+
+def buy(symbol='EURUSD'):
+    return parse_signal({"symbol": symbol, "action": "buy", "volume": "0.01"})
+
+
+def test_filling_prefers_fok_then_ioc_then_return():
+    both = sim_mt5.SYMBOL_FILLING_FOK | sim_mt5.SYMBOL_FILLING_IOC
+    assert filling_mode(info(both)) == sim_mt5.ORDER_FILLING_FOK
+    assert filling_mode(info(sim_mt5.SYMBOL_FILLING_IOC)) == sim_mt5.ORDER_FILLING_IOC
+    assert filling_mode(info(0, sim_mt5.SYMBOL_TRADE_EXECUTION_INSTANT)) == sim_mt5.ORDER_FILLING_RETURN
+
+
+def test_requests_are_built_from_unshared_templates():
+    profile = ExecutionProfile(info(sim_mt5.SYMBOL_FILLING_IOC, order_mode=sim_mt5.SYMBOL_ORDER_CLOSEBY))
+    first = profile.order(sim_mt5.ORDER_TYPE_BUY, 0.1, 1.1234567, 1.1000004, 0.0)
+    first["comment"] = "changed"
+    second = profile.order(sim_mt5.ORDER_TYPE_BUY_LIMIT, 0.2, 1.05, 0.0, 0.0, pending=True)
+
+    assert first["price"] == 1.12346 and first["sl"] == 1.1 and first["tp"] == 0.0
+    assert first["type_filling"] == sim_mt5.ORDER_FILLING_IOC and first["action"] == sim_mt5.TRADE_ACTION_DEAL
+    assert second["action"] == sim_mt5.TRADE_ACTION_PENDING and "deviation" not in second
+    assert profile.order(sim_mt5.ORDER_TYPE_BUY, 0.1, 1.1, 0, 0)["comment"] != "changed"
+    close = profile.close(42, sim_mt5.ORDER_TYPE_SELL, 0.1, 1.1)
+    assert close["position"] == 42 and close["type_filling"] == sim_mt5.ORDER_FILLING_IOC
+    assert profile.describe()['close_by'] is True
+
+
+def test_orders_use_the_filling_mode_the_symbol_allows(handler, sim):
+    sim.set_symbol('EURUSD', filling_mode=sim_mt5.SYMBOL_FILLING_IOC)
+    assert handler.send_order(buy()).success
+    assert handler.execution_profile('EURUSD').filling == sim_mt5.ORDER_FILLING_IOC
+
+
+def test_invalid_fill_rebuilds_the_profile(handler, sim):
+    assert handler.send_order(buy()).success
+    assert handler.execution_profile('EURUSD').filling == sim_mt5.ORDER_FILLING_FOK
+
+    sim.set_symbol('EURUSD', filling_mode=sim_mt5.SYMBOL_FILLING_IOC)
+    assert handler.send_order(buy()).retcode == sim_mt5.TRADE_RETCODE_INVALID_FILL
+    assert handler.send_order(buy()).success
+    assert handler.execution_profiles.stats()['symbols']['EURUSD']['filling'] == 'IOC'
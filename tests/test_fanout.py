@@ -0,0 +1,101 @@
+import json
+import multiprocessing
+import threading
+
+import pytest
+
+from app.fanout import FanoutPool, _Worker, load_accounts
+
+ACCOUNTS = [
+    {"name": "main", "account": 1, "password": "x", "server": "Sim", "path": "a"},
+    {"name": "copy", "account": 2, "password": "x", "server": "Sim", "path": "b"},
+]
+
+
+class ThreadContext:
+    """Pipe as usual, but the 'process' is a thread running a scripted worker"""
+
+    def __init__(self, replies):
+        self.replies = replies  # account name -> fn(method, args) returning (result, error), or None to stay silent
+
+    def Pipe(self):
+        return multiprocessing.Pipe()
+
+    def Process(self, target, args, name, daemon):
+        account, conn = args
+        return threading.Thread(target=self._serve, args=(account, conn), name=name, daemon=daemon)
+
+    def _serve(self, account, conn):
+        conn.send(('ready', True))
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            request_id, method, args = message
+            reply = self.replies[account['name']]
+            if reply is None:
+                continue
+            # A stale reply to an earlier request must be skipped by the pool
+            conn.send((request_id - 1, 'stale', None, 0.0))
+            conn.send((request_id, *reply(method, args), 1.5))
+
+
+def pool_with(replies, timeout=2.0):
+    pool = FanoutPool([], timeout=timeout, start_timeout=5.0)
+    context = ThreadContext(replies)
+    pool.workers = [_Worker(dict(account), context) for account in ACCOUNTS]
+    assert pool.start()
+    return pool
+
+
+def test_dispatch_aggregates_every_account():
+    pool = pool_with({
+        'main': lambda method, args: ({'success': True, 'symbol': args[0]}, None),
+        'copy': lambda method, args: ({'success': False, 'error': 'no money'}, None),
+    })
+    try:
+        result = pool.dispatch('send_order', 'EURUSD')
+    finally:
+        pool.stop()
+
+    assert not result
+    body = result.to_dict()
+    assert body['method'] == 'send_order' and body['success'] is False
+    main, copy = body['accounts']
+    assert main == {'name': 'main', 'account': 1, 'success': True, 'result': {'success': True, 'symbol': 'EURUSD'},
+                    'error': None, 'latency_ms': 1.5}
+    assert copy['success'] is False and copy['result']['error'] == 'no money'
+
+
+def test_dispatch_reports_worker_errors_and_timeouts():
+    pool = pool_with({'main': lambda method, args: (None, 'Unsupported fan-out method: x'), 'copy': None}, timeout=0.3)
+    try:
+        result = pool.dispatch('x')
+    finally:
+        pool.stop()
+
+    main, copy = result.accounts
+    assert main['success'] is False and main['error'] == 'Unsupported fan-out method: x'
+    assert copy['success'] is False and "No response from account 'copy'" in copy['error']
+    assert copy['latency_ms'] is None
+
+
+def test_empty_position_list_counts_as_success():
+    pool = pool_with({name: (lambda method, args: ([], None)) for name in ('main', 'copy')})
+    try:
+        assert pool.dispatch('get_positions')
+    finally:
+        pool.stop()
+
+
+def test_load_accounts_validates_entries(tmp_path):
+    path = tmp_path / 'accounts.json'
+    path.write_text(json.dumps([{"account": "42", "password": "x", "server": "S", "path": "p"}]))
+    assert load_accounts(str(path)) == [{"account": 42, "password": "x", "server": "S", "path": "p", "name": "42"}]
+
+    path.write_text(json.dumps([{"account": 42, "server": "S"}]))
+    with pytest.raises(ValueError, match="missing: password, path"):
+        load_accounts(str(path))
+    path.write_text('[]')
+    with pytest.raises(ValueError):
+        load_accounts(str(path))
@@ -0,0 +1,65 @@
+from app.idempotency import IdempotencyStore, idempotency_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1200.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_duplicate_within_window_gets_the_first_response():
+    store = IdempotencyStore(window=60, buckets=12, clock=FakeClock())
+    entry, duplicate = store.begin('id:a')
+    assert not duplicate and not entry.wait(0)
+    store.complete(entry, {"status": "success"}, 200)
+
+    again, duplicate = store.begin('id:a')
+    assert duplicate and again is entry
+    assert again.wait(0) and (again.body, again.status) == ({"status": "success"}, 200)
+
+
+def test_keys_expire_when_their_bucket_rolls_over():
+    clock = FakeClock()
+    store = IdempotencyStore(window=60, buckets=12, clock=clock)
+    store.begin('id:old')
+    clock.now += 30
+    store.begin('id:new')
+
+    clock.now += 29  # 'old' is 59s old: still in the window
+    assert store.begin('id:old')[1]
+    clock.now += 1  # its bucket comes round again and is cleared
+    assert not store.begin('id:old')[1]
+    assert store.begin('id:new')[1]
+
+    clock.now += 1000  # a long idle gap clears every bucket
+    assert store.stats()['keys'] == 0
+
+
+def test_full_bucket_evicts_its_oldest_key():
+    store = IdempotencyStore(window=60, buckets=2, max_keys=4, clock=FakeClock())
+    for key in ('a', 'b', 'c'):
+        store.begin(key)
+    assert store.stats()['evictions'] == 1
+    assert not store.begin('a')[1]
+    assert store.begin('c')[1]
+
+
+def test_released_key_lets_a_retry_through():
+    store = IdempotencyStore(clock=FakeClock())
+    entry, _ = store.begin('id:a')
+    store.release(entry, {"error": "MT5 is busy"}, 503)
+    assert entry.wait(0) and entry.status == 503
+    assert not store.begin('id:a')[1]
+
+
+def test_key_prefers_client_id_then_alert_content():
+    assert idempotency_key({"symbol": "EURUSD"}, 'hdr') == 'id:hdr'
+    assert idempotency_key({"alert_id": 7, "symbol": "EURUSD"}) == 'id:7'
+    assert idempotency_key({"symbol": "EURUSD", "action": "buy"}) is None
+
+    first = idempotency_key({"symbol": "eurusd ", "action": "BUY", "volume": "0.1", "time": "t1"})
+    assert first == idempotency_key({"symbol": "EURUSD", "action": "buy", "volume": "0.1", "time": "t1"})
+    assert first != idempotency_key({"symbol": "EURUSD", "action": "buy", "volume": "0.1", "time": "t2"})
+    assert first.startswith('hash:')
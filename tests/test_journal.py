@@ -0,0 +1,64 @@
+import pytest
+
+from app import journal as journal_module
+from app.journal import JournalError, SignalJournal, pending_signals, read_journal
+
+
+def test_executing_mark_batches_and_orders_before_result(tmp_path):
+    path = str(tmp_path / 'signals.jsonl')
+    journal = SignalJournal(path).open()
+    try:
+        journal.log_signal('a', 'send_order', [{"symbol": "EURUSD", "action": "BUY", "volume": 0.01}])
+        journal.log_signal('b', 'send_order', [{"symbol": "EURUSD", "action": "SELL", "volume": 0.01}])
+        first = journal.log_executing('a', wait=False)
+        last = journal.log_executing('b', wait=False)
+        assert last > first
+        journal.wait_committed(last)
+        assert [r['type'] for r in read_journal(path)] == ['signal', 'signal', 'executing', 'executing']
+        journal.log_result('a', {"success": True})
+    finally:
+        journal.close()
+
+    pending = pending_signals(path)
+    assert [(p['id'], p['started']) for p in pending] == [('b', True)]
+
+
+def failing_fsync(monkeypatch, failures):
+    """Make the next `failures` fsyncs raise, like a full or failing disk"""
+    real_fsync = journal_module.os.fsync
+    remaining = [failures]
+
+    def fsync(fd):
+        if remaining[0] > 0:
+            remaining[0] -= 1
+            raise OSError(28, "No space left on device")
+        real_fsync(fd)
+
+    monkeypatch.setattr(journal_module.os, 'fsync', fsync)
+
+
+def test_failed_write_is_not_committed_and_times_out(tmp_path, monkeypatch):
+    path = str(tmp_path / 'signals.jsonl')
+    failing_fsync(monkeypatch, failures=10 ** 6)
+    journal = SignalJournal(path, commit_timeout=0.2).open()
+    try:
+        with pytest.raises(JournalError):
+            journal.log_signal('a', 'send_order', [])
+        assert journal.stats()['write_errors'] >= 1
+        assert journal.stats()['records'] == 0
+    finally:
+        monkeypatch.undo()
+        journal.close()
+
+
+def test_failed_write_is_retried_without_torn_lines(tmp_path, monkeypatch):
+    path = str(tmp_path / 'signals.jsonl')
+    failing_fsync(monkeypatch, failures=2)
+    journal = SignalJournal(path, commit_timeout=5.0).open()
+    try:
+        journal.log_signal('a', 'send_order', [])
+        journal.log_result('a', {"success": True})
+    finally:
+        journal.close()
+    assert [r['type'] for r in read_journal(path)] == ['signal', 'result']
+    assert journal.stats()['write_errors'] == 2
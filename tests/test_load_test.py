@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+import pytest
+
+from scripts.load_test import PayloadMix, percentile, run_step, summarize
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile(list(range(1, 1001)), 99.9) == 999
+    assert percentile([], 99) == 0.0
+
+
+def test_summary_charges_queueing_to_corrected_latency():
+    # Second request was due at t=0.1 but only went out when the first finished at t=1.0
+    records = [('market', 0.0, 0.0, 1.0, 200), ('close', 0.1, 1.0, 1.01, 503)]
+    summary = summarize(records, rate=10, duration=1.0)
+    assert summary['corrected_ms']['100'] == pytest.approx(1000.0)
+    assert summary['corrected_ms']['50'] == pytest.approx(910.0)
+    assert summary['service_ms']['50'] == pytest.approx(10.0)
+    assert summary['statuses'] == {'200': 1, '503': 1}
+    assert summary['errors'] == 1 and summary['error_rate'] == 0.5
+    assert summary['kinds']['close'] == {'count': 1, 'errors': 1, 'p50_ms': 910.0, 'p99_ms': 910.0}
+    json.dumps(summary)
+
+
+def test_payload_mix_is_seeded_and_repeats_duplicates():
+    draws = [PayloadMix('market=1,duplicate=1', ['EURUSD'], seed=3).next() for _ in range(2)]
+    assert draws[0] == draws[1]
+
+    mix = PayloadMix('duplicate=1', ['EURUSD'], seed=1)
+    first, second, third = mix.next(), mix.next(), mix.next()
+    assert first == second and third != first
+    assert 'time' in json.loads(first[3])
+    with pytest.raises(ValueError):
+        PayloadMix('market=1,bogus=2', ['EURUSD'], seed=1)
+
+
+def test_run_step_keeps_scheduling_while_the_server_stalls():
+    async def scenario():
+        calls = []
+
+        async def handle(reader, writer):
+            while await reader.readline() not in (b'\r\n', b''):
+                pass
+            calls.append(None)
+            if len(calls) == 1:
+                await asyncio.sleep(0.3)
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\nok")
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await run_step(f"http://127.0.0.1:{port}", rate=50, duration=0.2, warmup=0.0,
+                                  connections=1, mix=PayloadMix('health=1', [], seed=1),
+                                  poisson=False, timeout=2.0)
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    records = asyncio.run(scenario())
+    assert len(records) == pytest.approx(10, abs=1)
+    assert all(status == 200 for *_, status in records)
+    summary = summarize(records, 50, 0.2)
+    # Requests queued behind the stall keep their scheduled start; service time stays small
+    assert summary['corrected_ms']['50'] > 100
+    assert summary['service_ms']['50'] < 100
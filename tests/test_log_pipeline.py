@@ -0,0 +1,35 @@
+import logging
+import queue
+
+from app.log_pipeline import NonBlockingQueueHandler
+
+
+def test_arguments_are_merged_on_the_calling_thread():
+    log_queue = queue.Queue()
+    logger = logging.getLogger('test.log_pipeline')
+    logger.propagate = False
+    handler = NonBlockingQueueHandler(log_queue)
+    logger.addHandler(handler)
+    try:
+        positions = ['EURUSD']
+        logger.warning("Open positions: %s", positions)
+        positions.append('XAUUSD')
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            logger.exception("Failed")
+    finally:
+        logger.removeHandler(handler)
+
+    record = log_queue.get_nowait()
+    assert record.getMessage() == "Open positions: ['EURUSD']"
+    assert record.args is None
+    record = log_queue.get_nowait()
+    assert record.exc_info is None and 'ValueError: boom' in record.exc_text
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    for i in range(3):
+        handler.handle(logging.makeLogRecord({'msg': 'line %d', 'args': (i,)}))
+    assert handler.dropped == 2
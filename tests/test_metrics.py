@@ -0,0 +1,58 @@
+import pytest
+
+from app import metrics
+from app.metrics import Counter, Histogram, Registry
+
+
+def test_histogram_exports_cumulative_buckets():
+    registry = Registry()
+    histogram = Histogram('test_seconds', 'Test latency', ['stage'], buckets=(0.1, 0.01, 1), registry=registry)
+    child = histogram.labels('parse')
+    for value in (0.005, 0.01, 0.5, 3.0):
+        child.observe(value)
+
+    assert registry.render().splitlines() == [
+        '# HELP test_seconds Test latency',
+        '# TYPE test_seconds histogram',
+        'test_seconds_bucket{stage="parse",le="0.01"} 2',
+        'test_seconds_bucket{stage="parse",le="0.1"} 2',
+        'test_seconds_bucket{stage="parse",le="1"} 3',
+        'test_seconds_bucket{stage="parse",le="+Inf"} 4',
+        'test_seconds_sum{stage="parse"} 3.515',
+        'test_seconds_count{stage="parse"} 4',
+    ]
+
+
+def test_counters_labels_and_collectors_render():
+    registry = Registry()
+    counter = Counter('test_total', 'Things', ['kind'], registry=registry)
+    counter.labels('a"b').inc()
+    counter.labels(10013).inc(2)
+    assert counter.labels('10013') is counter.labels(10013)
+    with pytest.raises(ValueError):
+        counter.labels('a', 'b')
+    with pytest.raises(ValueError):
+        Counter('test_total', 'Again', registry=registry)
+
+    def collect():
+        yield 'test_depth', 'gauge', 'Queue depth', [({'lane': 'close'}, 3), ({}, 1.5)]
+
+    registry.add_collector(collect)
+    text = registry.render()
+    assert 'test_total{kind="10013"} 2\n' in text
+    assert 'test_total{kind="a\\"b"} 1\n' in text
+    assert '# TYPE test_depth gauge\ntest_depth{lane="close"} 3\ntest_depth 1.5\n' in text
+    registry.remove_collector(collect)
+    assert 'test_depth' not in registry.render()
+
+
+def test_metrics_endpoint_reports_trade_stages(trade_server):
+    client = trade_server.app.test_client()
+    client.post('/trade', json={"symbol": "EURUSD", "action": "buy", "volume": "0.01"})
+    response = client.get('/metrics')
+    assert response.status_code == 200 and response.content_type == metrics.CONTENT_TYPE
+    text = response.get_data(as_text=True)
+    for stage in ('request', 'json_parse', 'verify_symbol', 'order_send'):
+        assert f'tvbridge_stage_seconds_count{{stage="{stage}"}}' in text
+    assert 'tvbridge_trade_responses_total{status="200"}' in text
+    assert 'tvbridge_mt5_retcodes_total{retcode="10009"}' in text
@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+
+from app.mt5_executor import ANY_KEY, ExecutorBusy, MT5Executor
+
+
+def test_close_does_not_overtake_entry_on_same_symbol():
+    executor = MT5Executor(max_queue=100)
+    executor.start()
+    gate = threading.Event()
+    ran = []
+    try:
+        # Hold the worker so everything below is queued before anything runs
+        executor.submit(gate.wait, lane='control')
+        futures = [
+            executor.submit(ran.append, 'entry XAUUSD', lane='entry', key='XAUUSD'),
+            executor.submit(ran.append, 'entry EURUSD', lane='entry', key='EURUSD'),
+            executor.submit(ran.append, 'close XAUUSD', lane='close', key='XAUUSD'),
+            executor.submit(ran.append, 'close GBPUSD', lane='close', key='GBPUSD'),
+        ]
+        gate.set()
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        executor.stop()
+    assert ran == ['close GBPUSD', 'entry XAUUSD', 'close XAUUSD', 'entry EURUSD']
+
+
+def test_close_all_waits_for_queued_entries():
+    executor = MT5Executor(max_queue=100)
+    executor.start()
+    gate = threading.Event()
+    ran = []
+    try:
+        executor.submit(gate.wait, lane='control')
+        futures = [
+            executor.submit(ran.append, 'pending EURUSD', lane='pending', key='EURUSD'),
+            executor.submit(ran.append, 'entry XAUUSD', lane='entry', key='XAUUSD'),
+            executor.submit(ran.append, 'close all', lane='close', key=ANY_KEY),
+        ]
+        gate.set()
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        executor.stop()
+    assert ran == ['pending EURUSD', 'entry XAUUSD', 'close all']
+    assert executor.stats()['queue_depth'] == 0
+
+
+def hold(executor):
+    """Occupy the worker until the returned event is set"""
+    started, gate = threading.Event(), threading.Event()
+    executor.submit(lambda: (started.set(), gate.wait()), lane='control')
+    assert started.wait(5)
+    return gate
+
+
+def test_fairness_does_not_overtake_same_symbol_in_higher_lane():
+    executor = MT5Executor(max_queue=100, max_skips=1)
+    executor.start()
+    ran = []
+    try:
+        gate = hold(executor)
+        futures = [
+            executor.submit(ran.append, 'pending EURUSD', lane='pending', key='EURUSD'),
+            executor.submit(ran.append, 'pending XAUUSD', lane='pending', key='XAUUSD'),
+            executor.submit(ran.append, 'entry XAUUSD', lane='entry', key='XAUUSD'),
+            executor.submit(ran.append, 'entry GBPUSD', lane='entry', key='GBPUSD'),
+            executor.submit(ran.append, 'pending USDJPY', lane='pending', key='USDJPY'),
+        ]
+        gate.set()
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        executor.stop()
+    # The starved entry lane waits for the earlier pending XAUUSD, then gets its turn
+    assert ran == ['pending EURUSD', 'pending XAUUSD', 'entry XAUUSD', 'pending USDJPY', 'entry GBPUSD']
+
+
+def test_close_queued_behind_entries_is_admitted_against_entry_limit():
+    executor = MT5Executor(max_queue=2)
+    executor.start()
+    try:
+        gate = hold(executor)
+        executor.submit(len, 'a', lane='entry', key='XAUUSD')
+        executor.submit(len, 'b', lane='entry', key='EURUSD')
+        with pytest.raises(ExecutorBusy):
+            executor.submit(len, 'c', lane='close', key='XAUUSD')
+        close = executor.submit(len, 'dd', lane='close', key='GBPUSD')
+        gate.set()
+        assert close.result(timeout=5) == 2
+    finally:
+        executor.stop()
+    assert executor.stats()['queue_depth'] == 0
+    assert executor._shared_depth == 0
@@ -0,0 +1,101 @@
+from app import sim_mt5
+from app.mt5_executor import MT5Executor
+from app.mt5_handler import MT5Handler
+from app.signal import parse_signal
+from app.symbol_cache import SymbolCacheStore
+
+
+def test_verify_symbol_unknown(handler):
+    assert handler.verify_symbol('NOPE_XYZ') is False
+    assert handler.tradeable_info('NOPE_XYZ') is None
+
+
+def test_verify_symbol_known(handler):
+    assert handler.verify_symbol('EURUSD') is True
+
+
+def test_send_order_unknown_symbol(handler, sim):
+    result = handler.send_order(parse_signal({"symbol": "NOPE_XYZ", "action": "buy", "volume": "0.01"}))
+    assert not result.success
+    assert "not tradeable" in result.error
+    assert sim.orders_sent == 0
+
+
+def test_resync_remaps_symbol_shadowed_by_new_listing(sim):
+    sim.reset(symbols=200, hedging=False, suffix='m')
+    h = MT5Handler(account=1, password='', server='Sim-Test', path=None,
+                   symbol_cache_dir=None, symbol_check_interval=0, symbol_meta_refresh=0)
+    assert h.connect()
+    try:
+        assert h.map_symbol('XAUUSD') == 'XAUUSDm'
+        sim.add_symbol('XAUUSD', 'Gold vs US Dollar', kind='metal', price=2300.0)
+        h.resync_symbols()
+        assert h.map_symbol('XAUUSD') == 'XAUUSD'
+        assert h.broker_symbols[-1] == 'XAUUSD'
+    finally:
+        h.disconnect()
+
+
+def test_resync_drops_mappings_to_removed_symbols(handler, sim):
+    assert handler.map_symbol('eurusd') == 'EURUSD'
+    untouched = handler.map_symbol('GBPUSD')
+    sim.remove_symbol('EURUSD')
+    handler.resync_symbols()
+    assert 'EURUSD' not in handler.broker_symbols
+    assert 'eurusd' not in handler.symbol_cache
+    assert 'GBPUSD' in handler.symbol_cache
+    assert handler.map_symbol('GBPUSD') == untouched
+    assert handler.map_symbol('eurusd') != 'EURUSD'
+
+
+def test_direct_matches_win_over_persisted_mappings(sim, tmp_path):
+    store = SymbolCacheStore(str(tmp_path), 'Sim-Test', 1)
+    for key, value in {'EURUSD': 'GBPUSD', 'eurusd': 'GBPUSD', 'EUR/USD': 'GBPUSD', 'GOLD': 'XAUUSD'}.items():
+        store.record(key, value)
+    store.flush()
+
+    h = MT5Handler(account=1, password='', server='Sim-Test', path=None, symbol_cache_dir=str(tmp_path),
+                   symbol_check_interval=0, symbol_meta_refresh=0)
+    assert h.connect()
+    try:
+        assert h.map_symbol('EURUSD') == 'EURUSD'
+        assert h.map_symbol('eurusd') == 'EURUSD'
+        assert h.map_symbol('EUR/USD') == 'EURUSD'
+        assert h.map_symbol('GOLD') == 'XAUUSD'
+    finally:
+        h.disconnect()
+    assert SymbolCacheStore(str(tmp_path), 'Sim-Test', 1).load()['EURUSD'] == 'EURUSD'
+
+
+def test_background_pollers_only_run_behind_an_executor(sim):
+    def connected(executor):
+        h = MT5Handler(account=1, password='', server='Sim-Test', path=None, symbol_cache_dir=None,
+                       symbol_check_interval=0, quote_cache=True, symbol_meta_refresh=30)
+        h.executor = executor
+        assert h.connect()
+        return h
+
+    h = connected(None)
+    try:
+        assert h.quote_cache._thread is None and h.symbol_meta._thread is None
+        assert h.verify_symbol('EURUSD')
+    finally:
+        h.disconnect()
+
+    executor = MT5Executor()
+    executor.start()
+    h = connected(executor)
+    try:
+        assert h.quote_cache._thread.is_alive() and h.symbol_meta._thread.is_alive()
+    finally:
+        h.disconnect()
+        executor.stop()
+
+
+def test_description_match_does_not_ask_the_terminal(handler, monkeypatch):
+    asked = []
+    monkeypatch.setattr(sim_mt5, 'symbol_info', asked.append)
+    assert handler.description_match('Gold') == 'XAUUSD'
+    assert handler.description_match('Euro vs US Dollar') == 'EURUSD'
+    assert handler.description_match('no such description') is None
+    assert asked == []
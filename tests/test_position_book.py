@@ -0,0 +1,35 @@
+from app.position_book import PositionBook
+
+
+def position(ticket, **fields):
+    return {"ticket": ticket, "symbol": "EURUSD", "type": "BUY", "volume": 0.1, "profit": 0.0,
+            "open_price": 1.055, "sl": 0.0, "tp": 0.0, "magic": 123456, **fields}
+
+
+def test_profit_changes_move_revision_but_not_version():
+    book = PositionBook(lambda: [])
+    book.apply([position(1)])
+    version, revision = book.version, book.revision
+
+    book.apply([position(1, profit=12.5)])
+    assert book.version == version and book.revision == revision + 1
+    assert book.query()[0]["positions"][0]["profit"] == 12.5
+
+    book.apply([position(1, profit=12.5, sl=1.05)])
+    assert book.version == version + 1
+    book.apply([position(1, profit=12.5, sl=1.05), position(2)])
+    assert book.version == version + 2
+
+
+def test_etag_covers_the_whole_body():
+    book = PositionBook(lambda: [])
+    book.apply([position(1)])
+    with_profit, with_tag = book.query()
+    without_profit, without_tag = book.query(profit=False)
+    assert "profit" not in without_profit["positions"][0]
+    assert with_tag == book.etag() and without_tag == book.etag(profit=False) != with_tag
+
+    book.apply([position(1, profit=3.0)])
+    assert book.query(profit=False) == (without_profit, without_tag)
+    body, tag = book.query()
+    assert body != with_profit and tag != with_tag
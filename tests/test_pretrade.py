@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.pretrade import TRADE_MODE_LONGONLY, PreTradeError, check_order
+
+
+def eurusd(**fields):
+    info = dict(name='EURUSD', volume_min=0.01, volume_step=0.01, volume_max=100.0, point=0.00001,
+                trade_tick_size=0.00001, digits=5, trade_stops_level=20, trade_freeze_level=0, trade_mode=4)
+    return SimpleNamespace(**{**info, **fields})
+
+
+BID, ASK = 1.10000, 1.10010
+
+
+def test_volume_rounds_down_to_step():
+    checked = check_order('BUY', True, 0.129, ASK, 0, 0, eurusd(), BID, ASK)
+    assert checked.volume == 0.12
+    assert checked.adjustments == ['volume 0.129 -> 0.12']
+    with pytest.raises(PreTradeError) as e:
+        check_order('BUY', True, 0.009, ASK, 0, 0, eurusd(), BID, ASK)
+    assert e.value.reason == 'volume'
+
+
+def test_market_order_without_stops_skips_price_checks():
+    # An off-grid fill price and a huge stops level don't matter when there is no SL/TP
+    info = eurusd(trade_stops_level=100000)
+    checked = check_order('SELL', True, 0.1, 1.100003, 0, 0, info, BID, ASK)
+    assert checked == (0.1, 1.100003, 0, 0, [])
+
+
+def test_too_close_stop_is_rejected_or_clamped():
+    # Stops level 20 points = 0.0002 from the bid for a market buy
+    with pytest.raises(PreTradeError) as e:
+        check_order('BUY', True, 0.1, ASK, 1.09990, 0, eurusd(), BID, ASK)
+    assert e.value.reason == 'stops'
+
+    checked = check_order('BUY', True, 0.1, ASK, 1.09990, 1.10100, eurusd(), BID, ASK, clamp_stops=True)
+    assert checked.sl == 1.09980 and checked.tp == 1.10100
+    assert checked.adjustments == ['sl 1.0999 -> 1.0998']
+
+
+def test_stop_on_the_wrong_side_is_rejected_even_when_clamping():
+    with pytest.raises(PreTradeError):
+        check_order('SELL', True, 0.1, BID, 1.09000, 0, eurusd(), BID, ASK, clamp_stops=True)
+
+
+def test_pending_price_must_clear_stops_level():
+    checked = check_order('BUY_LIMIT', False, 0.1, 1.099801, 0, 0, eurusd(), BID, ASK)
+    assert checked.price == 1.0998
+    with pytest.raises(PreTradeError) as e:
+        check_order('BUY_LIMIT', False, 0.1, 1.10000, 0, 0, eurusd(), BID, ASK)
+    assert e.value.reason == 'price'
+
+
+def test_freeze_level_does_not_widen_new_order_stops():
+    info = eurusd(trade_freeze_level=500)
+    checked = check_order('BUY', True, 0.1, ASK, 1.09970, 0, info, BID, ASK)
+    assert checked.sl == 1.09970
+
+
+def test_trade_mode_restricts_side():
+    with pytest.raises(PreTradeError) as e:
+        check_order('SELL', True, 0.1, BID, 0, 0, eurusd(trade_mode=TRADE_MODE_LONGONLY), BID, ASK)
+    assert e.value.reason == 'trade_mode'
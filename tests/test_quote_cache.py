@@ -0,0 +1,76 @@
+from app import quote_cache, sim_mt5
+from app.mt5_handler import MT5Handler
+from app.quote_cache import QuoteCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_poll_refreshes_tracked_symbols_until_stale(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(quote_cache.time, 'monotonic', clock)
+    polled = []
+    cache = QuoteCache(lambda symbol: polled.append(symbol) or f"tick {symbol} {len(polled)}", max_age=1.0)
+
+    assert cache.get('EURUSD') is None
+    cache.track('EURUSD')
+    cache.poll()
+    assert cache.get('EURUSD') == 'tick EURUSD 1'
+    clock.now += 1.5
+    assert cache.get('EURUSD') is None
+    assert cache.get('EURUSD', max_age=2.0) == 'tick EURUSD 1'
+    assert cache.stats() == {'tracked_symbols': 1, 'cached_quotes': 1, 'hits': 2, 'stale': 2}
+
+
+def test_idle_and_overflowing_symbols_stop_being_polled(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(quote_cache.time, 'monotonic', clock)
+    polled = []
+    cache = QuoteCache(lambda symbol: polled.append(symbol) or symbol, idle_timeout=60, max_symbols=2)
+
+    cache.track('EURUSD')
+    clock.now += 1
+    cache.track('GBPUSD')
+    clock.now += 1
+    cache.track('XAUUSD')  # evicts EURUSD, the least recently traded
+    cache.poll()
+    assert sorted(polled) == ['GBPUSD', 'XAUUSD']
+
+    clock.now += 30
+    cache.track('XAUUSD')
+    clock.now += 40
+    polled.clear()
+    cache.poll()
+    assert polled == ['XAUUSD']
+    assert cache.get('GBPUSD') is None
+
+
+def test_failed_poll_keeps_last_quote():
+    def fetch(symbol):
+        raise RuntimeError("terminal busy")
+
+    cache = QuoteCache(fetch)
+    cache.track('EURUSD')
+    cache.update('EURUSD', 'tick')
+    cache.poll()
+    assert cache.get('EURUSD') == 'tick'
+
+
+def test_handler_prices_from_cache_and_falls_back_live(sim, monkeypatch):
+    h = MT5Handler(account=1, password='', server='Sim-Test', path=None, symbol_cache_dir=None,
+                   symbol_check_interval=0, symbol_meta_refresh=0, quote_cache=True, quote_max_age=60)
+    assert h.connect()
+    live = []
+    fetch = sim_mt5.symbol_info_tick
+    monkeypatch.setattr(sim_mt5, 'symbol_info_tick', lambda symbol: live.append(symbol) or fetch(symbol))
+    try:
+        first = h.get_tick('EURUSD')
+        assert h.get_tick('EURUSD') is first
+        assert live == ['EURUSD']
+    finally:
+        h.disconnect()
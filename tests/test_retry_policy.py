@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+from app import retry_policy, sim_mt5
+from app.retry_policy import RetryPolicy
+from app.signal import parse_signal
+
+
+def buy():
+    return parse_signal({"symbol": "EURUSD", "action": "buy", "volume": "0.01"})
+
+
+def test_only_repricing_retcodes_within_attempts_and_budget(monkeypatch):
+    monkeypatch.setattr(retry_policy.time, 'perf_counter', lambda: 10.0)
+    policy = RetryPolicy(max_attempts=3, budget=0.3)
+    assert policy.should_retry(sim_mt5.TRADE_RETCODE_REQUOTE, 1, started=9.9)
+    assert policy.should_retry(sim_mt5.TRADE_RETCODE_PRICE_OFF, 2, started=9.9)
+    assert not policy.should_retry(sim_mt5.TRADE_RETCODE_REQUOTE, 3, started=9.9)
+    assert not policy.should_retry(sim_mt5.TRADE_RETCODE_REQUOTE, 1, started=9.6)
+    assert not policy.should_retry(sim_mt5.TRADE_RETCODE_INVALID_STOPS, 1, started=9.9)
+    assert not RetryPolicy(max_attempts=0).should_retry(sim_mt5.TRADE_RETCODE_REQUOTE, 1, started=9.9)
+
+
+def test_persistent_requotes_stop_at_max_attempts(handler, sim):
+    sim.set_retcodes({sim_mt5.TRADE_RETCODE_REQUOTE: 1.0})
+    result = handler.send_order(buy())
+    assert result.retcode == sim_mt5.TRADE_RETCODE_REQUOTE
+    assert result.attempts == 3 and sim.orders_sent == 3
+
+
+def test_final_retcodes_and_pending_orders_are_sent_once(handler, sim):
+    sim.set_retcodes({sim_mt5.TRADE_RETCODE_MARKET_CLOSED: 1.0})
+    assert handler.send_order(buy()).attempts == 1
+
+    sim.set_retcodes({sim_mt5.TRADE_RETCODE_REQUOTE: 1.0})
+    sent = sim.orders_sent
+    pending = parse_signal({"symbol": "EURUSD", "action": "buy_limit", "volume": "0.01", "price": "1.0000"})
+    assert handler.send_order(pending).attempts == 1
+    assert sim.orders_sent == sent + 1
+
+
+def test_retry_resends_at_a_fresh_price(handler, monkeypatch):
+    requests = []
+    order_send, symbol_info_tick = sim_mt5.order_send, sim_mt5.symbol_info_tick
+
+    def requote_once(request):
+        requests.append(dict(request))
+        if len(requests) == 1:
+            return SimpleNamespace(retcode=sim_mt5.TRADE_RETCODE_REQUOTE, comment='Requote')
+        return order_send(request)
+
+    def moved_tick(symbol):
+        tick = symbol_info_tick(symbol)
+        # The market moves once the first send has been refused
+        return tick._replace(ask=round(tick.ask + 0.0002, 5)) if requests else tick
+
+    monkeypatch.setattr(sim_mt5, 'order_send', requote_once)
+    monkeypatch.setattr(sim_mt5, 'symbol_info_tick', moved_tick)
+    result = handler.send_order(buy())
+    assert result.success and result.attempts == 2
+    assert requests[1]["price"] == round(requests[0]["price"] + 0.0002, 5)
@@ -0,0 +1,133 @@
+import threading
+import time
+
+from app import sim_mt5
+from app.coalescer import SignalCoalescer
+from app.journal import pending_signals, read_journal
+from app.position_book import PositionBook
+from app.signal_status import EXECUTING, FAILED, FILLED, QUEUED
+
+
+def test_trade_is_journaled_with_executing_mark(trade_server):
+    client = trade_server.app.test_client()
+    response = client.post('/trade', json={"symbol": "EURUSD", "action": "buy", "volume": "0.01"})
+    assert response.status_code == 200
+
+    path = trade_server.signal_journal.path
+    trade_server.signal_journal.close()
+    assert [r['type'] for r in read_journal(path)] == ['signal', 'executing', 'result']
+    assert pending_signals(path) == []
+
+
+def wait_for_status(server, signal_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        record = server.signal_status.get(signal_id)
+        if record['status'] in (FILLED, FAILED):
+            return record
+        time.sleep(0.01)
+    raise AssertionError(f"signal {signal_id} did not finish: {record}")
+
+
+def test_close_after_coalesced_buy_closes_it(trade_server, sim):
+    trade_server.async_trade_mode = True
+    trade_server.coalescer = SignalCoalescer(trade_server.run_net_order, window=0.5)
+    trade_server.coalescer.start()
+    client = trade_server.app.test_client()
+
+    buy = client.post('/trade', json={"symbol": "XAUUSD", "action": "buy", "volume": "0.01"})
+    close = client.post('/trade', json={"symbol": "XAUUSD", "action": "close"})
+    assert buy.status_code == close.status_code == 202
+
+    assert wait_for_status(trade_server, buy.get_json()['signal_id'])['status'] == FILLED
+    assert wait_for_status(trade_server, close.get_json()['signal_id'])['status'] == FILLED
+    assert sim.positions_get(symbol='XAUUSD') == ()
+
+
+def test_trade_is_rejected_when_journal_cannot_commit(trade_server, sim, monkeypatch):
+    from app import journal as journal_module
+
+    def fsync(fd):
+        raise OSError(5, "Input/output error")
+
+    monkeypatch.setattr(journal_module.os, 'fsync', fsync)
+    trade_server.signal_journal.commit_timeout = 0.1
+    client = trade_server.app.test_client()
+    response = client.post('/trade', json={"symbol": "EURUSD", "action": "buy", "volume": "0.01"})
+    assert response.status_code == 503
+    assert sim.orders_sent == 0
+
+
+def test_positions_etag_tracks_profit_only_when_it_is_served(trade_server, monkeypatch):
+    book = PositionBook(lambda: [])
+    monkeypatch.setattr(trade_server, 'position_book', book)
+    book.apply([{"ticket": 1, "symbol": "EURUSD", "type": "BUY", "volume": 0.1, "profit": 0.0,
+                 "open_price": 1.055, "sl": 0.0, "tp": 0.0, "magic": 1}])
+    _, _, plain = trade_server.positions_response({'profit': 'false'})
+    _, _, full = trade_server.positions_response({})
+
+    book.apply([{"ticket": 1, "symbol": "EURUSD", "type": "BUY", "volume": 0.1, "profit": 9.0,
+                 "open_price": 1.055, "sl": 0.0, "tp": 0.0, "magic": 1}])
+    assert trade_server.positions_response({'profit': 'false'}, plain['ETag'])[1] == 304
+    body, status, _ = trade_server.positions_response({}, full['ETag'])
+    assert status == 200 and body['positions'][0]['profit'] == 9.0
+
+
+def test_positions_without_terminal_answer_is_empty(trade_server, monkeypatch):
+    monkeypatch.setattr(trade_server.mt5_handler, 'position_snapshot', lambda: None)
+    body, status, _ = trade_server.positions_response({})
+    assert status == 200 and body['positions'] == []
+
+
+def test_async_trade_status_moves_from_queued_to_filled(trade_server, monkeypatch):
+    trade_server.async_trade_mode = True
+    sending, release = threading.Event(), threading.Event()
+    order_send = sim_mt5.order_send
+
+    def held_order_send(request):
+        sending.set()
+        assert release.wait(5)
+        return order_send(request)
+
+    monkeypatch.setattr(sim_mt5, 'order_send', held_order_send)
+    gate = threading.Event()
+    trade_server.mt5_executor.submit(gate.wait, lane='control')
+    client = trade_server.app.test_client()
+
+    response = client.post('/trade', json={"symbol": "EURUSD", "action": "buy", "volume": "0.01"})
+    assert response.status_code == 202
+    signal_id = response.get_json()['signal_id']
+    assert response.get_json()['status_url'] == f"/trade/{signal_id}"
+    assert client.get(f"/trade/{signal_id}").get_json()['status'] == QUEUED
+
+    gate.set()
+    assert sending.wait(5)
+    assert client.get(f"/trade/{signal_id}").get_json()['status'] == EXECUTING
+
+    release.set()
+    record = wait_for_status(trade_server, signal_id)
+    assert record['status'] == FILLED and record['retcode'] == sim_mt5.TRADE_RETCODE_DONE and record['ticket']
+    assert client.get(f"/trade/{signal_id}").get_json() == record
+
+
+def test_async_trade_status_reports_failures(trade_server, sim):
+    trade_server.async_trade_mode = True
+    client = trade_server.app.test_client()
+
+    response = client.post('/trade', json={"symbol": "EURUSD", "action": "buy_limit", "volume": "0.01", "price": "99"})
+    assert response.status_code == 202
+    record = wait_for_status(trade_server, response.get_json()['signal_id'])
+    assert record['status'] == FAILED and record['error']
+    assert sim.orders_sent == 0
+
+    assert client.get('/trade/unknown').status_code == 404
+
+
+def test_async_trade_is_refused_when_the_queue_is_full(trade_server, monkeypatch):
+    trade_server.async_trade_mode = True
+    monkeypatch.setattr(trade_server.mt5_executor, 'max_queue', 0)
+    response = trade_server.app.test_client().post('/trade', json={"symbol": "EURUSD", "action": "sell", "volume": "0.01"})
+    assert response.status_code == 503
+    path = trade_server.signal_journal.path
+    trade_server.signal_journal.close()
+    assert pending_signals(path) == []
@@ -0,0 +1,67 @@
+import pickle
+
+import pytest
+
+from app.signal import CLOSE, MARKET, PENDING, Signal, SignalError, parse_signal
+
+
+def test_aliases_are_resolved_and_values_coerced():
+    signal = parse_signal({"ticker": "EURUSD", "side": "long", "volume": "0.1", "sl": "1.05", "take_profit": 1.2})
+    assert signal == Signal('BUY', 'EURUSD', 0.1, 0.0, 1.05, 1.2)
+    assert (signal.action, signal.kind, signal.stop_loss, signal.take_profit) == ('BUY', MARKET, 1.05, 1.2)
+    assert signal.is_market and not signal.is_pending
+
+    # The first alias listed wins when both are present
+    assert parse_signal({"symbol": "A", "ticker": "B", "action": "sell", "side": "buy", "volume": 1}).symbol == 'A'
+
+
+def test_pending_orders_need_a_price():
+    signal = parse_signal({"symbol": "XAUUSD", "action": "buy_limit", "volume": 0.01, "price": "2300.5"})
+    assert signal.kind == PENDING and signal.price == 2300.5
+    with pytest.raises(SignalError, match="price"):
+        parse_signal({"symbol": "XAUUSD", "action": "sell_stop", "volume": 0.01})
+
+
+def test_close_without_volume_closes_everything():
+    for volume in (None, '', 'all', ' ALL '):
+        signal = parse_signal({"symbol": "EURUSD", "action": "close", "volume": volume})
+        assert signal.kind == CLOSE and signal.close_all and signal.volume is None
+    partial = parse_signal({"symbol": "EURUSD", "action": "CLOSE", "volume": "0.5"})
+    assert partial.volume == 0.5 and not partial.close_all
+
+
+@pytest.mark.parametrize('data, message', [
+    (None, "Invalid JSON"),
+    ([], "Invalid JSON"),
+    ({"action": "buy", "volume": 1}, "symbol"),
+    ({"symbol": "EURUSD", "action": "buy"}, "volume"),
+    ({"symbol": "EURUSD", "action": "buy", "volume": "lots"}, "Invalid volume"),
+    ({"symbol": "EURUSD", "action": "buy", "volume": -1}, "Invalid volume"),
+    ({"symbol": "EURUSD", "action": "buy", "volume": "all"}, "Invalid volume"),
+    ({"symbol": "EURUSD", "action": "hold", "volume": 1}, "Unknown or unsupported action: 'hold'"),
+    ({"symbol": "EURUSD", "volume": 1}, "Unknown or unsupported action"),
+    ({"symbol": "EURUSD", "action": "buy", "volume": 1, "tp": "high"}, "take_profit"),
+    ({"symbol": "EURUSD", "action": "buy", "volume": 1, "sl": [1]}, "stop_loss"),
+    ({"symbol": "EURUSD", "action": "buy_limit", "volume": 1, "price": "x"}, "Invalid price"),
+])
+def test_invalid_payloads_are_rejected(data, message):
+    with pytest.raises(SignalError, match=message):
+        parse_signal(data)
+
+
+def test_signal_round_trips_through_dict_and_pickle():
+    signal = parse_signal({"symbol": "EURUSD", "action": "sell_limit", "volume": 0.2, "price": 1.2, "tp": 1.1})
+    assert parse_signal(signal.to_dict()) == signal
+    assert pickle.loads(pickle.dumps(signal)) == signal
+    assert hash(signal) == hash(Signal('SELL_LIMIT', 'EURUSD', 0.2, 1.2, 0.0, 1.1))
+    with pytest.raises(SignalError):
+        Signal('HOLD', 'EURUSD', 1.0)
+
+
+def test_utils_parser_is_the_shared_one():
+    from app.utils import parse_tradingview_webhook
+
+    data = {"symbol": "EURUSD", "action": "short", "volume": "0.3"}
+    assert parse_tradingview_webhook(data) == parse_signal(data)
+    with pytest.raises(ValueError):
+        parse_tradingview_webhook({"symbol": "EURUSD"})
@@ -0,0 +1,99 @@
+import pytest
+
+from app import sim_mt5
+from app.sim_mt5 import generate_symbols, parse_retcodes
+from scripts import bench_suite
+
+
+@pytest.fixture
+def terminal(sim):
+    assert sim_mt5.initialize() and sim_mt5.login(1, server='Sim-Test')
+    return sim
+
+
+def deal(symbol, order_type, volume, **fields):
+    info = sim_mt5.symbol_info(symbol)
+    fok = info is None or info.filling_mode & sim_mt5.SYMBOL_FILLING_FOK
+    filling = sim_mt5.ORDER_FILLING_FOK if fok else sim_mt5.ORDER_FILLING_IOC
+    return sim_mt5.order_send({"action": sim_mt5.TRADE_ACTION_DEAL, "symbol": symbol, "volume": volume,
+                               "type": order_type, "type_filling": filling, **fields})
+
+
+def test_universe_is_deterministic():
+    first, second = generate_symbols(500, suffix='m'), generate_symbols(500, suffix='m')
+    assert [s.name for s in first] == [s.name for s in second]
+    assert len({s.name for s in first}) == 500
+    assert 'XAUUSDm' in {s.name for s in first}
+
+
+def test_netting_book_nets_and_reverses(terminal):
+    assert deal('EURUSD', sim_mt5.ORDER_TYPE_BUY, 0.3).retcode == sim_mt5.TRADE_RETCODE_DONE
+    deal('EURUSD', sim_mt5.ORDER_TYPE_BUY, 0.1)
+    position, = sim_mt5.positions_get(symbol='EURUSD')
+    assert position.volume == 0.4 and position.type == sim_mt5.POSITION_TYPE_BUY
+
+    deal('EURUSD', sim_mt5.ORDER_TYPE_SELL, 0.5)
+    position, = sim_mt5.positions_get(symbol='EURUSD')
+    assert position.volume == 0.1 and position.type == sim_mt5.POSITION_TYPE_SELL
+
+
+def test_hedging_book_keeps_separate_tickets(terminal):
+    terminal.reset(symbols=200, hedging=True)
+    sim_mt5.initialize()
+    deal('EURUSD', sim_mt5.ORDER_TYPE_BUY, 0.1)
+    deal('EURUSD', sim_mt5.ORDER_TYPE_SELL, 0.1)
+    assert sorted(p.type for p in sim_mt5.positions_get(symbol='EURUSD')) == [0, 1]
+
+
+def test_broker_side_checks(terminal):
+    assert deal('EURUSD', sim_mt5.ORDER_TYPE_BUY, 0.015).retcode == sim_mt5.TRADE_RETCODE_INVALID_VOLUME
+    assert deal('NOPE', sim_mt5.ORDER_TYPE_BUY, 0.1).retcode == sim_mt5.TRADE_RETCODE_INVALID
+    tick = sim_mt5.symbol_info_tick('EURUSD')
+    assert deal('EURUSD', sim_mt5.ORDER_TYPE_BUY, 0.1, sl=tick.bid + 0.01).retcode == sim_mt5.TRADE_RETCODE_INVALID_STOPS
+
+    terminal.set_symbol('EURUSD', filling_mode=sim_mt5.SYMBOL_FILLING_IOC)
+    result = sim_mt5.order_send({"action": sim_mt5.TRADE_ACTION_DEAL, "symbol": "EURUSD", "volume": 0.1,
+                                 "type": sim_mt5.ORDER_TYPE_BUY, "type_filling": sim_mt5.ORDER_FILLING_FOK})
+    assert result.retcode == sim_mt5.TRADE_RETCODE_INVALID_FILL
+    assert sim_mt5.positions_get(symbol='EURUSD') == ()
+
+
+def test_pending_orders_are_placed_and_removed(terminal):
+    tick = sim_mt5.symbol_info_tick('EURUSD')
+    request = {"action": sim_mt5.TRADE_ACTION_PENDING, "symbol": "EURUSD", "volume": 0.1,
+               "type": sim_mt5.ORDER_TYPE_BUY_LIMIT, "price": round(tick.ask - 0.01, 5)}
+    placed = sim_mt5.order_send(request)
+    assert placed.retcode == sim_mt5.TRADE_RETCODE_DONE
+    assert [o.ticket for o in sim_mt5.orders_get(symbol='EURUSD')] == [placed.order]
+
+    wrong_side = sim_mt5.order_send(dict(request, price=round(tick.ask + 0.01, 5)))
+    assert wrong_side.retcode == sim_mt5.TRADE_RETCODE_INVALID_PRICE
+    removed = sim_mt5.order_send({"action": sim_mt5.TRADE_ACTION_REMOVE, "order": placed.order})
+    assert removed.retcode == sim_mt5.TRADE_RETCODE_DONE and sim_mt5.orders_get(symbol='EURUSD') == ()
+
+
+def test_injected_retcodes_and_disconnects(terminal):
+    assert parse_retcodes('10004:0.02, 10021') == {10004: 0.02, 10021: 1.0}
+    terminal.set_retcodes({sim_mt5.TRADE_RETCODE_REQUOTE: 1.0})
+    assert deal('EURUSD', sim_mt5.ORDER_TYPE_BUY, 0.1).retcode == sim_mt5.TRADE_RETCODE_REQUOTE
+    assert sim_mt5.positions_get() == ()
+
+    terminal.set_retcodes({})
+    terminal.set_connected(False)
+    assert deal('EURUSD', sim_mt5.ORDER_TYPE_BUY, 0.1) is None
+    assert sim_mt5.last_error()[0] == sim_mt5.RES_E_INTERNAL_FAIL_CONNECT
+
+
+def test_bench_queries_resolve_through_their_strategies():
+    handler, _ = bench_suite.build_handler(1000, 0.0)
+    try:
+        for query, expected in bench_suite.MAPPING_QUERIES:
+            assert handler._resolve_symbol(query)[1] == expected, query
+    finally:
+        handler.disconnect()
+
+
+def test_bench_compare_flags_slowdowns_over_tolerance(capsys):
+    baseline = {'a': 100.0, 'b': 100.0}
+    assert bench_suite.compare({'a': 125.0, 'b': 140.0, 'c': 1.0}, baseline, 0.3) == ['b']
+    assert 'REGRESSION' in capsys.readouterr().out
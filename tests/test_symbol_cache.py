@@ -0,0 +1,67 @@
+import os
+
+from app import symbol_cache
+from app.symbol_cache import SymbolCache, SymbolCacheStore
+
+
+def test_failed_flush_removes_temp_file(tmp_path, monkeypatch):
+    store = SymbolCacheStore(str(tmp_path), 'Sim-Test', 1)
+    store.record('XAUUSD', 'XAUUSDm')
+
+    def fail(src, dst):
+        raise OSError("read-only file system")
+
+    monkeypatch.setattr(symbol_cache.os, 'replace', fail)
+    store.flush()
+    assert os.listdir(tmp_path) == []
+
+    monkeypatch.undo()
+    store.flush()
+    assert store.load() == {'XAUUSD': 'XAUUSDm'}
+    assert os.listdir(tmp_path) == [os.path.basename(store.path)]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    cache = SymbolCache(max_size=2, ttl=0)
+    cache.put('EURUSD', 'EURUSD.m')
+    cache.put('XAUUSD', 'XAUUSDm')
+    assert cache.get('EURUSD') == 'EURUSD.m'
+    cache.put('BTCUSD', 'BTCUSD')
+    assert 'XAUUSD' not in cache
+    assert cache.get('EURUSD') == 'EURUSD.m' and cache.get('BTCUSD') == 'BTCUSD'
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entries_expire_after_their_ttl():
+    clock = FakeClock()
+    cache = SymbolCache(ttl=60, negative_ttl=5, clock=clock)
+    cache.put('EURUSD', 'EURUSD.m')
+    cache.put('NOPE', 'NOPE', negative=True)
+
+    clock.now += 5
+    assert cache.get('NOPE') is None
+    assert cache.get('EURUSD') == 'EURUSD.m'
+    clock.now += 55
+    assert cache.get('EURUSD') is None
+    stats = cache.stats()
+    assert stats['expirations'] == 2 and stats['hits'] == 1 and stats['misses'] == 2
+    assert len(cache) == 0
+
+
+def test_invalidate_drops_negative_stale_and_remapped_entries():
+    cache = SymbolCache()
+    cache.put('EURUSD', 'EURUSD.m')
+    cache.put('GOLD', 'XAUUSDm')
+    cache.put('BTC', 'BTCUSD')
+    cache.put('NOPE', 'NOPE', negative=True)
+    dropped = cache.invalidate({'XAUUSDm'}, stale_key=lambda key: key.startswith('EUR'))
+    assert sorted(dropped) == ['EURUSD', 'GOLD', 'NOPE']
+    assert cache.items() == [('BTC', 'BTCUSD')]
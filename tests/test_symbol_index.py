@@ -0,0 +1,141 @@
+import random
+import string
+from difflib import get_close_matches
+
+from app.sim_mt5 import generate_symbols
+from app.symbol_index import SymbolIndex
+
+
+def normalize(s):
+    return ''.join(c for c in s.upper() if c.isalnum())
+
+
+NAMES = ['EURUSD.m', 'GBPUSD.m', 'XAUUSD.m', 'US30.cash', 'BTCUSD']
+DESCRIPTIONS = ['Euro vs US Dollar', 'Pound vs US Dollar', 'Gold', 'Wall Street 30', 'Bitcoin']
+
+
+def assert_same_lookups(index, rebuilt, queries):
+    for q in queries:
+        assert index.case_match(q) == rebuilt.case_match(q), q
+        assert index.normalized_match(normalize(q)) == rebuilt.normalized_match(normalize(q)), q
+        assert index.prefix_match(q) == rebuilt.prefix_match(q), q
+        assert index.contains_match(q) == rebuilt.contains_match(q), q
+        assert index.description_match(q) == rebuilt.description_match(q), q
+        assert index.fuzzy_match(q) == rebuilt.fuzzy_match(q), q
+        assert (q in index) == (q in rebuilt), q
+
+
+def test_with_changes_matches_rebuild():
+    index = SymbolIndex(NAMES, normalize, DESCRIPTIONS)
+    changed = index.with_changes([('XAUUSD', 'Gold spot'), ('ETHUSD', 'Ethereum')], ['EURUSD.m', 'BTCUSD'])
+    rebuilt = SymbolIndex(
+        ['GBPUSD.m', 'XAUUSD.m', 'US30.cash', 'XAUUSD', 'ETHUSD'], normalize,
+        ['Pound vs US Dollar', 'Gold', 'Wall Street 30', 'Gold spot', 'Ethereum'],
+    )
+    queries = ['EURUSD', 'eurusd.m', 'XAUUSD', 'xauusd', 'BTCUSD', 'ETH', 'US30', 'Gold', 'Bitcoin', 'Euro', 'GBPUSX']
+    assert_same_lookups(changed, rebuilt, queries)
+    assert len(changed) == len(rebuilt)
+
+
+def test_with_changes_chains_and_readds():
+    index = SymbolIndex(NAMES, normalize, DESCRIPTIONS)
+    changed = index.with_changes([('XAUUSD', '')], ['BTCUSD']).with_changes([('BTCUSD', 'Bitcoin')], ['XAUUSD'])
+    rebuilt = SymbolIndex(['EURUSD.m', 'GBPUSD.m', 'XAUUSD.m', 'US30.cash', 'BTCUSD'], normalize,
+                          ['Euro vs US Dollar', 'Pound vs US Dollar', 'Gold', 'Wall Street 30', 'Bitcoin'])
+    assert_same_lookups(changed, rebuilt, ['XAUUSD', 'BTCUSD', 'btc', 'Bitcoin', 'Gold'])
+
+
+def difflib_match(names, query):
+    """Reference fuzzy match: get_close_matches over every distinct upper-cased name"""
+    upper = {}
+    for name in names:
+        upper.setdefault(name.upper(), name)
+    matches = get_close_matches(query.upper(), list(upper), n=3, cutoff=0.6)
+    return upper[matches[0]] if matches else None
+
+
+def typo(rng, text):
+    chars = list(text)
+    for _ in range(rng.randint(1, 3)):
+        op, i = rng.choice('dist'), rng.randrange(len(chars))
+        if op == 'd' and len(chars) > 1:
+            del chars[i]
+        elif op == 'i':
+            chars.insert(i, rng.choice(string.ascii_uppercase))
+        elif op == 's':
+            chars[i] = rng.choice(string.ascii_uppercase)
+        elif i + 1 < len(chars):
+            chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    return ''.join(chars)
+
+
+def test_fuzzy_match_without_shared_trigrams():
+    index = SymbolIndex(['ZDG', 'EURUSD'], normalize)
+    assert index.fuzzy_match('HZD') == difflib_match(['ZDG', 'EURUSD'], 'HZD') == 'ZDG'
+
+
+def test_fuzzy_match_equals_full_difflib_scan():
+    rng = random.Random(3)
+    names = [s.name for s in generate_symbols(1500, suffix='m')]
+    index = SymbolIndex(names, normalize)
+    changed = index.with_changes([('XAUUSD', ''), ('EURUSD.PRO', '')], names[:20])
+    remaining = names[20:] + ['XAUUSD', 'EURUSD.PRO']
+    queries = [typo(rng, rng.choice(names)) for _ in range(300)]
+    queries += [''.join(rng.choices(string.ascii_uppercase, k=rng.randint(2, 8))) for _ in range(100)]
+    for q in queries:
+        assert index.fuzzy_match(q) == difflib_match(names, q), q
+        assert changed.fuzzy_match(q) == difflib_match(remaining, q), q
+
+
+def linear_matches(names, query):
+    """The mapping strategies as the linear scans they replaced"""
+    upper = query.upper()
+    return (
+        next((s for s in names if s.upper() == upper), None),
+        next((s for s in names if normalize(s) == normalize(query)), None),
+        next((s for s in names if s.upper().startswith(upper)), None),
+        next((s for s in names if upper in s.upper()), None),
+    )
+
+
+def test_strategies_return_first_match_in_broker_order():
+    names = ['eurusd', 'EURUSD.m', 'EURUSD', 'XAUUSDm', 'XAUUSD.pro', 'US30.cash', 'BTCUSD', 'ABTC.NYSE']
+    index = SymbolIndex(names, normalize)
+    queries = ['EURUSD', 'eurusd.M', 'XAUUSD', 'xauusdpro', 'US30', '.cash', 'BTC', 'USD', 'NOPE', 'S']
+    for q in queries:
+        found = (index.case_match(q), index.normalized_match(normalize(q)), index.prefix_match(q), index.contains_match(q))
+        assert found == linear_matches(names, q), q
+    assert 'EURUSD' in index and 'eurUSD' not in index
+    assert len(index) == len(names)
+
+
+def test_strategies_match_linear_scans_on_a_broker_universe():
+    rng = random.Random(11)
+    names = [s.name for s in generate_symbols(800, suffix='m')]
+    index = SymbolIndex(names, normalize)
+    queries = [rng.choice(names)[:rng.randint(1, 6)] for _ in range(200)]
+    queries += [name[i:i + 3] for name in rng.sample(names, 100) for i in (1, 2)]
+    for q in queries:
+        found = (index.case_match(q), index.normalized_match(normalize(q)), index.prefix_match(q), index.contains_match(q))
+        assert found == linear_matches(names, q), q
+
+
+def linear_description_match(names, descriptions, query):
+    """description_match as the per-symbol scan it replaced"""
+    upper = query.upper()
+    return next((name for name, desc in zip(names, descriptions)
+                 if desc and (upper in desc.upper() or desc.upper() in upper)), None)
+
+
+def test_description_match_equals_linear_scan():
+    rng = random.Random(5)
+    symbols = generate_symbols(600)
+    names, descriptions = [s.name for s in symbols], [s.description for s in symbols]
+    index = SymbolIndex(names, normalize, descriptions)
+    queries = ['Gold', 'us dollar', 'Euro vs US Dollar spot', 'xx Bitcoin xx', 'Dow', 'NOPE', 'vs']
+    for desc in rng.sample(descriptions, 150):
+        start = rng.randrange(len(desc))
+        queries.append(desc[start:start + rng.randint(2, 10)])
+        queries.append('pre ' + desc.lower() + ' post')
+    for q in queries:
+        assert index.description_match(q) == linear_description_match(names, descriptions, q), q
@@ -0,0 +1,123 @@
+from collections import namedtuple
+
+import pytest
+
+from app import sim_mt5, symbol_meta
+from app.mt5_handler import MT5Handler
+from app.signal import parse_signal
+from app.symbol_meta import SymbolMetaCache
+
+Info = namedtuple('Info', ['name', 'time'])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(symbol_meta.time, 'monotonic', clock)
+    return clock
+
+
+@pytest.fixture
+def meta_handler(sim):
+    """Connected handler with the metadata cache but no refresher thread"""
+    h = MT5Handler(account=1, password='', server='Sim-Test', path=None, symbol_cache_dir=None,
+                   symbol_check_interval=0, symbol_meta_refresh=30.0)
+    assert h.connect()
+    yield h
+    h.disconnect()
+
+
+def test_entries_expire_after_max_age(clock):
+    cache = SymbolMetaCache(lambda symbol: None, max_age=10.0)
+    cache.put('EURUSD', Info('EURUSD', 1))
+    cache.put('GBPUSD', None)
+    assert cache.get('EURUSD') == Info('EURUSD', 1)
+    assert cache.get('GBPUSD') is None
+    clock.now += 11
+    assert cache.get('EURUSD') is None
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
+
+
+def test_least_recently_used_symbol_is_evicted(clock):
+    cache = SymbolMetaCache(lambda symbol: None, max_symbols=2)
+    cache.put('EURUSD', Info('EURUSD', 1))
+    cache.put('GBPUSD', Info('GBPUSD', 1))
+    clock.now += 1
+    cache.get('EURUSD')
+    cache.put('XAUUSD', Info('XAUUSD', 1))
+    assert cache.get('GBPUSD') is None
+    assert cache.get('EURUSD') and cache.get('XAUUSD')
+
+
+def test_failed_refresh_keeps_the_old_entry(clock):
+    answers = {'EURUSD': Info('EURUSD', 2)}
+    cache = SymbolMetaCache(answers.get, max_age=10.0)
+    cache.put('EURUSD', Info('EURUSD', 1))
+    cache.put('GBPUSD', Info('GBPUSD', 1))
+    clock.now += 5
+    cache.refresh()
+    clock.now += 6
+    assert cache.get('EURUSD') == Info('EURUSD', 2)
+    assert cache.get('GBPUSD') is None
+    assert cache.stats()['refreshes'] == 1 and cache.stats()['refresh_errors'] == 1
+
+
+def test_closed_market_lifts_on_a_newer_quote_or_after_ttl(clock):
+    answers = {'EURUSD': Info('EURUSD', 100)}
+    cache = SymbolMetaCache(answers.get, closed_ttl=5.0)
+    cache.put('EURUSD', Info('EURUSD', 100))
+    cache.mark_closed('EURUSD')
+    cache.refresh()
+    assert cache.is_closed('EURUSD')
+    answers['EURUSD'] = Info('EURUSD', 101)
+    cache.refresh()
+    assert not cache.is_closed('EURUSD')
+
+    cache.mark_closed('EURUSD')
+    clock.now += 5
+    assert not cache.is_closed('EURUSD')
+
+
+def test_verify_symbol_hits_the_cache_after_the_first_lookup(meta_handler, monkeypatch):
+    calls = []
+    symbol_info = sim_mt5.symbol_info
+    monkeypatch.setattr(sim_mt5, 'symbol_info', lambda symbol: calls.append(symbol) or symbol_info(symbol))
+    assert meta_handler.verify_symbol('EURUSD')
+    assert meta_handler.verify_symbol('EURUSD')
+    assert calls == ['EURUSD']
+
+
+def test_verify_symbol_rejects_close_only_and_closed_markets(meta_handler, sim):
+    sim.set_symbol('GBPUSD', trade_mode=sim_mt5.SYMBOL_TRADE_MODE_CLOSEONLY)
+    assert not meta_handler.verify_symbol('GBPUSD')
+
+    sim.set_retcodes({sim_mt5.TRADE_RETCODE_MARKET_CLOSED: 1.0})
+    result = meta_handler.send_order(parse_signal({"symbol": "EURUSD", "action": "buy", "volume": "0.01"}))
+    assert result.retcode == sim_mt5.TRADE_RETCODE_MARKET_CLOSED
+    sim.set_retcodes({})
+    sent = sim.orders_sent
+    assert not meta_handler.verify_symbol('EURUSD')
+    assert not meta_handler.send_order(parse_signal({"symbol": "EURUSD", "action": "buy", "volume": "0.01"})).success
+    assert sim.orders_sent == sent
+
+
+def test_watchlist_is_selected_and_cached_on_connect(sim):
+    hidden = next(s.name for s in sim_mt5.generate_symbols(200) if not s.visible)
+    h = MT5Handler(account=1, password='', server='Sim-Test', path=None, symbol_cache_dir=None,
+                   symbol_check_interval=0, symbol_meta_refresh=30.0, watchlist=[hidden, 'EURUSD', 'NOPE_XYZ'])
+    try:
+        assert h.connect()
+        assert sim_mt5.symbol_info(hidden).visible
+        assert h.symbol_meta.get(hidden).visible
+        assert h.symbol_meta.get('EURUSD') is not None
+        assert h.symbol_meta.stats()['symbols'] == 2
+    finally:
+        h.disconnect()